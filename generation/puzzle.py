@@ -1,6 +1,20 @@
-"""Helpers for ringram puzzles"""
+"""Helpers for ringram puzzles
+Puzzles can be any rows x cols (at least 3x3), but word lists are only shipped for 3
+and 4-letter words (see word_lengths), so only 3x3, 3x4, 4x3 and 4x4 puzzles can be
+generated or solved
+numpy is only imported by the batch functions (many puzzles at once, as arrays of
+letter codes), so scripts working on a few puzzles (e.g., puzzleyaml.py) start quickly
+"""
 
-from typing import Dict, List
+from __future__ import annotations
+
+import os
+from functools import cached_property, lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 morse = {
     "A": ".-",
@@ -31,6 +45,169 @@ morse = {
     "Z": "--..",
 }
 
+# word list for each word length, e.g., 4 -> "words_4-letters.txt"
+WORDLIST_FNAME = "words_{}-letters.txt"
+
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# letters as codes, e.g., "A" -> 0, "Z" -> 25
+LETTER_CODES = {letter: code for code, letter in enumerate(LETTERS)}
+LETTER_DOTS = {letter: morse[letter].count(".") for letter in LETTERS}
+LETTER_DASHES = {letter: morse[letter].count("-") for letter in LETTERS}
+
+
+def word_lengths() -> List[int]:
+    """Word lengths there are word lists for, e.g., [3, 4]"""
+    prefix, suffix = WORDLIST_FNAME.split("{}")
+    return sorted(
+        int(fname[len(prefix) : -len(suffix)])
+        for fname in os.listdir(os.path.dirname(os.path.abspath(__file__)))
+        if fname.startswith(prefix)
+        and fname.endswith(suffix)
+        and fname[len(prefix) : -len(suffix)].isdigit()
+    )
+
+
+def load_words(size: str = "4") -> List[str]:
+    """Load the word list for a word length (e.g., "3" or "4"), in capitals
+
+    Raises:
+        ValueError: if there is no word list for that length, see word_lengths
+    """
+    fname = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), WORDLIST_FNAME.format(size)
+    )
+    if not os.path.exists(fname):
+        raise ValueError(
+            f"No word list for {size}-letter words, only for "
+            f"{', '.join(map(str, word_lengths()))}-letter words"
+        )
+    with open(fname, encoding="utf-8") as f:
+        return [word.upper() for word in f.read().splitlines()]
+
+
+class RingGeometry:
+    """Where each letter of a ring puzzle with rows x cols letters is, i.e., for a 4x5
+      T T T T T     top word (cols letters)
+      L       R     left and right words (rows letters)
+      L       R
+      B B B B B     bottom word (cols letters)
+    as index maps between the cells of a flat puzzle (see flatten_puzzle)
+    and the letters of its words [top, left, right, bottom], e.g., for a 4x4
+      word_cells[1] -> [0, 4, 6, 8] (the left word is in cells 0, 4, 6 and 8)
+      cell_word[4], cell_letter[4] -> 1, 1 (cell 4 is the 2nd letter of the left word)
+    Made once for each size by ring_geometry, so conversions are just lookups
+    """
+
+    def __init__(self, rows: int, cols: int):
+        if rows < 3 or cols < 3:
+            raise ValueError("Puzzles must be at least 3x3")
+        self.rows = rows
+        self.cols = cols
+        self.n_cells = 2 * rows + 2 * cols - 4
+        # (row, col) of each cell, rightwards, then downwards
+        positions = [(0, col) for col in range(cols)]
+        for row in range(1, rows - 1):
+            positions += [(row, 0), (row, cols - 1)]
+        positions += [(rows - 1, col) for col in range(cols)]
+        cell_at = {position: cell for cell, position in enumerate(positions)}
+        # cells of each row of the inflated puzzle
+        self.row_slices = [slice(0, cols)]
+        self.row_slices += [slice(cols + 2 * i, cols + 2 * i + 2) for i in range(rows - 2)]
+        self.row_slices += [slice(self.n_cells - cols, self.n_cells)]
+        self.row_cells = [list(range(self.n_cells))[s] for s in self.row_slices]
+        self.col_cells = [
+            [cell for cell, (_, col) in enumerate(positions) if col == c]
+            for c in range(cols)
+        ]
+        # [top, left, right, bottom]
+        self.word_lengths = [cols, rows, rows, cols]
+        self.word_cells = [
+            [cell_at[(0, i)] for i in range(cols)],
+            [cell_at[(i, 0)] for i in range(rows)],
+            [cell_at[(i, cols - 1)] for i in range(rows)],
+            [cell_at[(rows - 1, i)] for i in range(cols)],
+        ]
+        # which word (and letter of it) each cell is read from, corners from top/bottom
+        self.cell_word = [0] * self.n_cells
+        self.cell_letter = [0] * self.n_cells
+        for word in [1, 2, 0, 3]:
+            for letter, cell in enumerate(self.word_cells[word]):
+                self.cell_word[cell] = word
+                self.cell_letter[cell] = letter
+        # where each cell is in the words of a puzzle written one after another
+        word_starts = [sum(self.word_lengths[:word]) for word in range(4)]
+        self.cell_letter_index = [
+            word_starts[word] + letter
+            for word, letter in zip(self.cell_word, self.cell_letter)
+        ]
+        # getters for the letters of the cells, and of each word, in one call
+        self.get_cell_letters = itemgetter(*self.cell_letter_index)
+        self.get_word_letters = [itemgetter(*cells) for cells in self.word_cells]
+
+    @cached_property
+    def row_matrix(self) -> np.ndarray:
+        """0/1 matrix of which cells are in each row, to add up metrics"""
+        return _cell_matrix(self.row_cells, self.n_cells)
+
+    @cached_property
+    def col_matrix(self) -> np.ndarray:
+        """0/1 matrix of which cells are in each column, to add up metrics"""
+        return _cell_matrix(self.col_cells, self.n_cells)
+
+    @staticmethod
+    def of_cells(n_cells: int) -> "RingGeometry":
+        """Geometry of a square puzzle with n_cells letters"""
+        if n_cells % 4 or n_cells < 8:
+            raise ValueError(f"No square puzzle has {n_cells} letters")
+        return ring_geometry(n_cells // 4 + 1)
+
+    @staticmethod
+    def of_puzzle(puzzle: List[List[str]]) -> "RingGeometry":
+        """Geometry of an (inflated) puzzle"""
+        return ring_geometry(len(puzzle), len(puzzle[0]))
+
+    @staticmethod
+    def of_words(words: List[str]) -> "RingGeometry":
+        """Geometry of a puzzle made from words [top, left, right, bottom]"""
+        if len(words) != 4:
+            raise ValueError("Puzzles must be exactly 4 words")
+        return _word_lengths_geometry(
+            (len(words[0]), len(words[1]), len(words[2]), len(words[3]))
+        )
+
+
+def _cell_matrix(cells_of_lines: List[List[int]], n_cells: int) -> np.ndarray:
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    matrix = np.zeros((len(cells_of_lines), n_cells), dtype=np.int32)
+    for line, cells in enumerate(cells_of_lines):
+        matrix[line, cells] = 1
+    return matrix
+
+
+@lru_cache(maxsize=None)
+def _morse_counts() -> Tuple[np.ndarray, np.ndarray]:
+    """Number of dots, and of dashes, in each letter, by letter code"""
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    dots = np.array([LETTER_DOTS[letter] for letter in LETTERS], dtype=np.int32)
+    dashes = np.array([LETTER_DASHES[letter] for letter in LETTERS], dtype=np.int32)
+    return dots, dashes
+
+
+@lru_cache(maxsize=None)
+def _word_lengths_geometry(word_lengths: Tuple[int, ...]) -> RingGeometry:
+    geometry = ring_geometry(word_lengths[1], word_lengths[0])
+    if list(word_lengths) != geometry.word_lengths:
+        raise ValueError("Top and bottom, and left and right, must be the same length")
+    return geometry
+
+
+@lru_cache(maxsize=None)
+def ring_geometry(rows: int, cols: int = None) -> RingGeometry:
+    """The (cached) geometry of puzzles with rows x cols letters, square if cols is None"""
+    return RingGeometry(rows, rows if cols is None else cols)
+
 
 def flatten_puzzle(puzzle_full: List[List[str]]) -> List[str]:
     """Flatten a puzzle to a list of strings,
@@ -51,8 +228,10 @@ def flatten_puzzle(puzzle_full: List[List[str]]) -> List[str]:
     return [letter for row in puzzle_full for letter in row]
 
 
-def inflate_puzzle(puzzle_flat: List[str]) -> List[List[str]]:
-    """Inflate a puzzle from a list of strings
+def inflate_puzzle(
+    puzzle_flat: List[str], geometry: RingGeometry = None
+) -> List[List[str]]:
+    """Inflate a puzzle from a list of strings, square unless geometry is given
     input
       ["B", "I", "R", "D", "O", "O", "R", "V", "N", "O", "S", "E"]
     output
@@ -63,13 +242,13 @@ def inflate_puzzle(puzzle_flat: List[str]) -> List[List[str]]:
         ["N", "O", "S", "E"],
       ]
     """
-    # 4x4
-    if len(puzzle_flat) == 12:
-        return [puzzle_flat[0:4], puzzle_flat[4:6], puzzle_flat[6:8], puzzle_flat[8:12]]
-    # 3x3
-    if len(puzzle_flat) == 8:
-        return [puzzle_flat[0:3], puzzle_flat[3:5], puzzle_flat[5:8]]
-    raise ValueError("Only 4x4 and 3x3 puzzles implemented")
+    if geometry is None:
+        geometry = RingGeometry.of_cells(len(puzzle_flat))
+    elif len(puzzle_flat) != geometry.n_cells:
+        raise ValueError(
+            f"A {geometry.rows}x{geometry.cols} puzzle has {geometry.n_cells} letters"
+        )
+    return [puzzle_flat[row] for row in geometry.row_slices]
 
 
 def words_to_puzzle_solved(words: List[str]) -> List[List[str]]:
@@ -89,37 +268,9 @@ def words_to_puzzle_solved(words: List[str]) -> List[List[str]]:
         ["N", "O", "S", "E"],
       ]
     """
-    if len(words[0]) == 4:
-        return inflate_puzzle(
-            [
-                words[0][0],
-                words[0][1],
-                words[0][2],
-                words[0][3],
-                words[1][1],
-                words[2][1],
-                words[1][2],
-                words[2][2],
-                words[3][0],
-                words[3][1],
-                words[3][2],
-                words[3][3],
-            ]
-        )
-    if len(words[0]) == 3:
-        return inflate_puzzle(
-            [
-                words[0][0],
-                words[0][1],
-                words[0][2],
-                words[1][1],
-                words[2][1],
-                words[3][0],
-                words[3][1],
-                words[3][2],
-            ]
-        )
-    raise ValueError("Only 4x4 and 3x3 puzzles implemented")
+    geometry = RingGeometry.of_words(words)
+    flat = list(geometry.get_cell_letters("".join(words)))
+    return [flat[row] for row in geometry.row_slices]
 
 
 def puzzle_solved_to_words(puzzle: List[List[str]]) -> List[str]:
@@ -139,21 +290,9 @@ def puzzle_solved_to_words(puzzle: List[List[str]]) -> List[str]:
     output
       ["BIRD", "BORN", "DOVE", "NOSE"]
     """
-    if len(puzzle) == 4:
-        return [
-            "".join([puzzle[0][0], puzzle[0][1], puzzle[0][2], puzzle[0][3]]),
-            "".join([puzzle[0][0], puzzle[1][0], puzzle[2][0], puzzle[3][0]]),
-            "".join([puzzle[0][3], puzzle[1][1], puzzle[2][1], puzzle[3][3]]),
-            "".join([puzzle[3][0], puzzle[3][1], puzzle[3][2], puzzle[3][3]]),
-        ]
-    if len(puzzle) == 3:
-        return [
-            "".join([puzzle[0][0], puzzle[0][1], puzzle[0][2]]),
-            "".join([puzzle[0][0], puzzle[1][0], puzzle[2][0]]),
-            "".join([puzzle[0][2], puzzle[1][1], puzzle[2][2]]),
-            "".join([puzzle[2][0], puzzle[2][1], puzzle[2][2]]),
-        ]
-    raise ValueError("Only 4x4 and 3x3 puzzles implemented")
+    geometry = RingGeometry.of_puzzle(puzzle)
+    flat = [letter for row in puzzle for letter in row]
+    return ["".join(get_letters(flat)) for get_letters in geometry.get_word_letters]
 
 
 def puzzle_to_puzzle_unsolved(
@@ -186,7 +325,7 @@ def puzzle_to_puzzle_unsolved(
             unsolved.append(letter)
         else:
             unsolved.append("")
-    return inflate_puzzle(unsolved)
+    return inflate_puzzle(unsolved, RingGeometry.of_puzzle(puzzle))
 
 
 def puzzle_to_str(puzzle: List[str], metrics: Dict[str, List[int]] = None) -> str:
@@ -210,10 +349,11 @@ def puzzle_to_str(puzzle: List[str], metrics: Dict[str, List[int]] = None) -> st
     5 - - - E 4
       6 3 1 5
     """
+    geometry = RingGeometry.of_puzzle(puzzle)
     maxindex = len(puzzle) - 1
     extrema = [0, maxindex]
     puzzle = inflate_puzzle(
-        [letter if letter else "-" for letter in flatten_puzzle(puzzle)]
+        [letter if letter else "-" for letter in flatten_puzzle(puzzle)], geometry
     )
     _str = ""
     pad_c = "  "  # corner padding
@@ -223,7 +363,7 @@ def puzzle_to_str(puzzle: List[str], metrics: Dict[str, List[int]] = None) -> st
             if row_i in extrema:
                 _str += f'{" ".join(puzzle[row_i])}\n'
             else:
-                _str += f"{puzzle[row_i][0]} {pad_m*(maxindex-1)}{puzzle[row_i][1]}\n"
+                _str += f"{puzzle[row_i][0]} {pad_m*(geometry.cols-2)}{puzzle[row_i][1]}\n"
     else:
         topdots = [str(n) for n in metrics["dots-top"]]
         ld = metrics["dots-left"]
@@ -234,7 +374,7 @@ def puzzle_to_str(puzzle: List[str], metrics: Dict[str, List[int]] = None) -> st
             if row_i in extrema:
                 _str += f'{ld[row_i]} {" ".join(puzzle[row_i])} {rd[row_i]}\n'
             else:
-                _str += f"{ld[row_i]} {puzzle[row_i][0]} {pad_m*(maxindex-1)}{puzzle[row_i][1]} {rd[1]}\n"
+                _str += f"{ld[row_i]} {puzzle[row_i][0]} {pad_m*(geometry.cols-2)}{puzzle[row_i][1]} {rd[row_i]}\n"
         _str += f'{pad_c}{" ".join(bottomdashes)}{pad_c}'
     return _str
 
@@ -265,17 +405,11 @@ def get_col(puzzle: List[List[str]], col: int) -> List[str]:
     get_col(puzzle, 0) -> ["B", "O", "R", "N]
     get_col(puzzle, 2) -> ["R", "S"]
     """
-    # have to be careful here since middle rows are shorter
-    # not sure intimately how this logic works, but the tests pass
-    maxindex = len(puzzle) - 1
-    extrema = [0, maxindex]
-    if col == 0:
-        return [puzzle[i][0] for i in range(maxindex + 1)]
-    if 0 < col < maxindex:
-        return [puzzle[i][col] for i in extrema]
-    if col == maxindex:
-        return [puzzle[i][maxindex if i in extrema else 1] for i in range(maxindex + 1)]
-    raise IndexError(f"Column must be between 0 and {maxindex}")
+    geometry = RingGeometry.of_puzzle(puzzle)
+    if not 0 <= col < geometry.cols:
+        raise IndexError(f"Column must be between 0 and {geometry.cols - 1}")
+    flat = flatten_puzzle(puzzle)
+    return [flat[cell] for cell in geometry.col_cells[col]]
 
 
 def list_to_morse(letters: List[str]) -> List[str]:
@@ -320,22 +454,165 @@ def get_puzzle_dashdot_metrics(puzzle: List[List[str]]) -> Dict[str, List[int]]:
         'dashes-bottom': [6, 3, 1, 5],
     }
     """
-    puzzle_size = len(puzzle)  # hopefully 3 or 4
-    dots_top = [
-        n_dots("".join(list_to_morse(get_col(puzzle, i)))) for i in range(puzzle_size)
-    ]
-    dots_left = [
-        n_dots("".join(list_to_morse(get_row(puzzle, i)))) for i in range(puzzle_size)
-    ]
-    dashes_right = [
-        n_dashes("".join(list_to_morse(get_row(puzzle, i)))) for i in range(puzzle_size)
-    ]
-    dashes_bottom = [
-        n_dashes("".join(list_to_morse(get_col(puzzle, i)))) for i in range(puzzle_size)
-    ]
+    geometry = RingGeometry.of_puzzle(puzzle)
+    letters = flatten_puzzle(puzzle)
+    dots = [LETTER_DOTS[letter] for letter in letters]
+    dashes = [LETTER_DASHES[letter] for letter in letters]
+    return {
+        "dots-top": [sum(dots[cell] for cell in cells) for cells in geometry.col_cells],
+        "dots-left": [sum(dots[cell] for cell in cells) for cells in geometry.row_cells],
+        "dashes-right": [
+            sum(dashes[cell] for cell in cells) for cells in geometry.row_cells
+        ],
+        "dashes-bottom": [
+            sum(dashes[cell] for cell in cells) for cells in geometry.col_cells
+        ],
+    }
+
+
+def letters_to_codes(letters: List[str]) -> np.ndarray:
+    """Convert a list of letters to letter codes
+    e.g., ["B", "I", "R", "D"] -> array([1, 8, 17, 3])
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    if isinstance(letters, str):
+        raise ValueError("letters should be a list")
+    return np.array([LETTER_CODES[letter] for letter in letters], dtype=np.int32)
+
+
+def words_to_codes(puzzles_wordy: List[List[str]]) -> np.ndarray:
+    """Convert many puzzles, as words, to an (M, cells) array of letter codes, e.g.,
+    input
+      [["BIRD", "BORN", "DOVE", "NOSE"]]
+    output
+      array([[1, 8, 17, 3, 14, 14, 17, 21, 13, 14, 18, 4]])
+    Puzzles must all be the same size
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    geometry = RingGeometry.of_words(puzzles_wordy[0])
+    letters = "".join(word for words in puzzles_wordy for word in words)
+    if len(letters) != len(puzzles_wordy) * sum(geometry.word_lengths):
+        raise ValueError("All puzzles must be four words, and the same size")
+    codes = np.frombuffer(letters.encode("ascii"), dtype=np.uint8) - ord("A")
+    if codes.max(initial=0) >= len(LETTERS):
+        raise ValueError("All words must be all caps and alphabetic")
+    return codes.reshape(len(puzzles_wordy), -1)[:, geometry.cell_letter_index]
+
+
+def codes_to_words(
+    codes: np.ndarray, geometry: RingGeometry = None
+) -> List[List[str]]:
+    """Convert an (M, cells) array of letter codes back to many puzzles, as words,
+    the reverse of words_to_codes. Puzzles are square unless geometry is given
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    codes = np.asarray(codes)
+    if geometry is None:
+        geometry = RingGeometry.of_cells(codes.shape[1])
+    words = []
+    for cells, length in zip(geometry.word_cells, geometry.word_lengths):
+        letters = np.ascontiguousarray(codes[:, cells] + ord("A"), dtype=np.uint8)
+        words.append(letters.view(f"S{length}").ravel().astype(str).tolist())
+    return [list(puzzle) for puzzle in zip(*words)]
+
+
+def get_puzzles_dashdot_metrics(
+    codes: np.ndarray, geometry: RingGeometry = None
+) -> Dict[str, np.ndarray]:
+    """Get top/left dots, and right/bottom dashes for many puzzles at once
+    Puzzles should be solved, as an (M, cells) array of letter codes (see words_to_codes),
+    and are square unless geometry is given
+    e.g., for the puzzle
+      B I R D
+      O     O
+      R     V
+      N O S E
+    get_puzzles_dashdot_metrics(array([[1, 8, 17, 3, 14, 14, 17, 21, 13, 14, 18, 4]])) -> {
+        'dots-top': array([[6, 2, 5, 6]]),
+        'dots-left': array([[9, 0, 5, 5]]),
+        'dashes-right': array([[3, 6, 2, 4]]),
+        'dashes-bottom': array([[6, 3, 1, 5]]),
+    }
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    codes = np.asarray(codes)
+    if geometry is None:
+        geometry = RingGeometry.of_cells(codes.shape[1])
+    rows, cols = geometry.row_matrix, geometry.col_matrix
+    dot_counts, dash_counts = _morse_counts()
+    dots = dot_counts[codes]
+    dashes = dash_counts[codes]
     return {
-        "dots-top": dots_top,
-        "dots-left": dots_left,
-        "dashes-right": dashes_right,
-        "dashes-bottom": dashes_bottom,
+        "dots-top": dots @ cols.T,
+        "dots-left": dots @ rows.T,
+        "dashes-right": dashes @ rows.T,
+        "dashes-bottom": dashes @ cols.T,
     }
+
+
+class WordList:
+    """Words, with the dots and dashes of each counted once,
+    so puzzle metrics can be added up from cached counts instead of Morse strings
+    Words not in the list are counted (and cached) when first needed
+    e.g.,
+      wordlist = WordList(["BIRD", "BORN", "DOVE", "NOSE"])
+      wordlist.dots_dashes("BIRD") -> (9, 3)
+      wordlist.get_metrics(["BIRD", "BORN", "DOVE", "NOSE"]) -> {
+          'dots-top': [6, 2, 5, 6],
+          'dots-left': [9, 0, 5, 5],
+          'dashes-right': [3, 6, 2, 4],
+          'dashes-bottom': [6, 3, 1, 5],
+      }
+    """
+
+    def __init__(self, words: List[str] = ()):
+        self.words = list(words)
+        # word -> (dots, dashes, dots per letter, dashes per letter)
+        self._counts = {}
+        for word in self.words:
+            self._count(word)
+
+    def _count(self, word: str) -> Tuple[int, int, Tuple[int, ...], Tuple[int, ...]]:
+        counts = self._counts.get(word)
+        if counts is None:
+            dots = tuple(LETTER_DOTS[letter] for letter in word)
+            dashes = tuple(LETTER_DASHES[letter] for letter in word)
+            counts = (sum(dots), sum(dashes), dots, dashes)
+            self._counts[word] = counts
+        return counts
+
+    def dots_dashes(self, word: str) -> Tuple[int, int]:
+        """(dots, dashes) in a word"""
+        return self._count(word)[:2]
+
+    def get_metrics(self, words: List[str]) -> Dict[str, List[int]]:
+        """Get top/left dots, and right/bottom dashes for a puzzle, as words
+        The same as get_puzzle_dashdot_metrics(words_to_puzzle_solved(words))
+        The outer rows/columns are whole words, and the middle ones are two letters,
+          the top and bottom words' letters (middle columns)
+          the left and right words' letters (middle rows)
+        """
+        top_dots, top_dashes, top_ldots, top_ldashes = self._count(words[0])
+        left_dots, left_dashes, left_ldots, left_ldashes = self._count(words[1])
+        right_dots, right_dashes, right_ldots, right_ldashes = self._count(words[2])
+        bottom_dots, bottom_dashes, bottom_ldots, bottom_ldashes = self._count(words[3])
+        middle_cols = range(1, len(top_ldots) - 1)
+        middle_rows = range(1, len(left_ldots) - 1)
+        return {
+            "dots-top": [left_dots]
+            + [top_ldots[i] + bottom_ldots[i] for i in middle_cols]
+            + [right_dots],
+            "dots-left": [top_dots]
+            + [left_ldots[i] + right_ldots[i] for i in middle_rows]
+            + [bottom_dots],
+            "dashes-right": [top_dashes]
+            + [left_ldashes[i] + right_ldashes[i] for i in middle_rows]
+            + [bottom_dashes],
+            "dashes-bottom": [left_dashes]
+            + [top_ldashes[i] + bottom_ldashes[i] for i in middle_cols]
+            + [right_dashes],
+        }
@@ -10,9 +10,19 @@ from puzzle import (
     n_dashes,
     n_dots,
     puzzle_solved_to_words,
+    puzzle_to_str,
     puzzle_to_puzzle_unsolved,
     words_to_puzzle_solved,
     list_to_morse,
+    letters_to_codes,
+    words_to_codes,
+    codes_to_words,
+    RingGeometry,
+    ring_geometry,
+    get_puzzles_dashdot_metrics,
+    load_words,
+    word_lengths,
+    WordList,
 )
 
 
@@ -381,3 +391,167 @@ class TestMetrics(unittest.TestCase):
         computed_metrics = get_puzzle_dashdot_metrics(puzzle)
 
         self.assertEqual(computed_metrics, expected_metrics)
+
+    def test_get_puzzles_dashdot_metrics(self):
+        """get_puzzles_dashdot_metrics should get the same metrics as
+        get_puzzle_dashdot_metrics, for many puzzles at once"""
+        for puzzles_wordy in [
+            [["BIRD", "BORN", "DOVE", "NOSE"], ["BIRD", "BEAN", "DOVE", "NOSE"]],
+            [["HIT", "HUM", "TOP", "MAP"], ["HAT", "HOP", "TIP", "PUP"]],
+        ]:
+            with self.subTest(puzzles_wordy=puzzles_wordy):
+                expected = [
+                    get_puzzle_dashdot_metrics(words_to_puzzle_solved(words))
+                    for words in puzzles_wordy
+                ]
+
+                computed_metrics = get_puzzles_dashdot_metrics(
+                    words_to_codes(puzzles_wordy)
+                )
+
+                for i, metrics in enumerate(expected):
+                    for name, values in metrics.items():
+                        self.assertEqual(computed_metrics[name][i].tolist(), values)
+
+    def test_puzzle_to_str(self):
+        """puzzle_to_str should put each row's dots on its left, and its dashes on its
+        right"""
+        puzzle = words_to_puzzle_solved(["BIRD", "BORN", "DOVE", "NOSE"])
+
+        computed_str = puzzle_to_str(puzzle, get_puzzle_dashdot_metrics(puzzle))
+
+        self.assertEqual(
+            computed_str.split("\n"),
+            [
+                "  6 2 5 6  ",
+                "9 B I R D 3",
+                "0 O     O 6",
+                "5 R     V 2",
+                "5 N O S E 4",
+                "  6 3 1 5  ",
+            ],
+        )
+
+
+class TestWordList(unittest.TestCase):
+    """Tests for metrics from cached per-word dot/dash counts"""
+
+    def test_dots_dashes(self):
+        """dots_dashes should count the dots and dashes in a word"""
+        wordlist = WordList(["BIRD"])
+
+        self.assertEqual(wordlist.dots_dashes("BIRD"), (9, 3))
+        self.assertEqual(wordlist.dots_dashes("TOM"), (0, 6))
+
+    def test_get_metrics(self):
+        """WordList.get_metrics should get the same metrics as get_puzzle_dashdot_metrics"""
+        wordlist = WordList(["BIRD", "BORN", "DOVE", "NOSE", "HIT"])
+        for words in [
+            ["BIRD", "BORN", "DOVE", "NOSE"],
+            ["HIT", "HUM", "TOP", "MAP"],
+        ]:
+            with self.subTest(words=words):
+                expected = get_puzzle_dashdot_metrics(words_to_puzzle_solved(words))
+
+                computed_metrics = wordlist.get_metrics(words)
+
+                self.assertEqual(computed_metrics, expected)
+
+
+class TestCodes(unittest.TestCase):
+    """Tests for converting letters to letter codes"""
+
+    def test_letters_to_codes(self):
+        """letters_to_codes should convert a list of letters to codes from 0 to 25"""
+        self.assertEqual(letters_to_codes(["B", "I", "R", "D"]).tolist(), [1, 8, 17, 3])
+        with self.assertRaises(KeyError):
+            letters_to_codes(["B", "I", "", ""])
+        with self.assertRaises(ValueError):
+            letters_to_codes("BIRD")
+
+    def test_words_to_codes(self):
+        """words_to_codes should convert puzzles, as words, to flat puzzles of codes"""
+        puzzles_wordy = [["BIRD", "BORN", "DOVE", "NOSE"], ["BIRD", "BEAN", "DOVE", "NOSE"]]
+        expected = [
+            letters_to_codes(flatten_puzzle(words_to_puzzle_solved(words))).tolist()
+            for words in puzzles_wordy
+        ]
+
+        codes = words_to_codes(puzzles_wordy)
+
+        self.assertEqual(codes.tolist(), expected)
+        with self.assertRaises(ValueError):
+            words_to_codes([["BIRD", "BORN", "DOVE", "nose"]])
+        with self.assertRaises(ValueError):
+            words_to_codes([["BIRD", "BORN", "DOVE"]])
+
+    def test_codes_to_words(self):
+        """codes_to_words should convert codes back to the words of each puzzle"""
+        puzzles_wordy = [["BIRD", "BORN", "DOVE", "NOSE"], ["BIRD", "BEAN", "DOVE", "NOSE"]]
+
+        self.assertEqual(codes_to_words(words_to_codes(puzzles_wordy)), puzzles_wordy)
+        self.assertEqual(
+            codes_to_words(words_to_codes([["HIT", "HUM", "TOP", "MAP"]])),
+            [["HIT", "HUM", "TOP", "MAP"]],
+        )
+        self.assertEqual(
+            codes_to_words(
+                words_to_codes([["BIRDS", "BAT", "SIT", "TRACT"]]), ring_geometry(3, 5)
+            ),
+            [["BIRDS", "BAT", "SIT", "TRACT"]],
+        )
+
+
+class TestRingGeometry(unittest.TestCase):
+    """Tests for the index maps of puzzles of any size"""
+
+    def test_word_cells(self):
+        """word_cells should give the flat cells of each word"""
+        self.assertEqual(ring_geometry(4).word_cells[1], [0, 4, 6, 8])
+        self.assertEqual(
+            ring_geometry(4, 5).word_cells,
+            [[0, 1, 2, 3, 4], [0, 5, 7, 9], [4, 6, 8, 13], [9, 10, 11, 12, 13]],
+        )
+
+    def test_rectangle(self):
+        """conversions and metrics should work for rectangles, e.g., 5x3 and 3x5"""
+        for words in [
+            ["BIRDS", "BAT", "SIT", "TRACT"],
+            ["BAT", "BIRDS", "TRACT", "SIT"],
+        ]:
+            with self.subTest(words=words):
+                puzzle = words_to_puzzle_solved(words)
+                geometry = RingGeometry.of_words(words)
+
+                self.assertEqual(puzzle_solved_to_words(puzzle), words)
+                self.assertEqual(
+                    inflate_puzzle(flatten_puzzle(puzzle), geometry), puzzle
+                )
+                self.assertEqual(get_col(puzzle, 0), list(words[1]))
+                self.assertEqual(get_col(puzzle, geometry.cols - 1), list(words[2]))
+                self.assertEqual(
+                    get_puzzle_dashdot_metrics(puzzle), WordList().get_metrics(words)
+                )
+                self.assertEqual(
+                    codes_to_words(words_to_codes([words]), geometry), [words]
+                )
+
+    def test_bad_sizes(self):
+        """puzzles should be at least 3x3, with opposite words the same length"""
+        with self.assertRaises(ValueError):
+            ring_geometry(2, 4)
+        with self.assertRaises(ValueError):
+            words_to_puzzle_solved(["BIRD", "BORN", "DOVES", "NOSE"])
+        with self.assertRaises(ValueError):
+            inflate_puzzle(["A"] * 13)
+
+
+class TestWordLists(unittest.TestCase):
+    """Tests for loading word lists"""
+
+    def test_word_lengths(self):
+        """only the shipped word lists should load, and others fail clearly"""
+        self.assertEqual(word_lengths(), [3, 4])
+        self.assertTrue(all(len(word) == 3 for word in load_words("3")))
+        with self.assertRaisesRegex(ValueError, "3, 4-letter words"):
+            load_words("5")
@@ -0,0 +1,319 @@
+"""Benchmark the hot paths (generating, ranking, metrics and YAML) on the shipped word
+lists, and on made-up word lists of more words, e.g.,
+  python puzzlebench.py --sizes shipped 5000 20000 100000 -o bench.json
+saves, for each benchmark and word list, the wall time (the fastest of --repeat runs),
+peak memory and puzzles per second, as JSON. Then compare two results files, e.g.,
+before and after a change
+  python puzzlebench.py --compare bench_before.json bench.json --threshold 0.1
+which marks anything more than 10% slower (or bigger) as a regression
+Made-up words follow the letter pairs of the shipped word list (a Markov chain), so
+letters are as common, and follow each other, as in real words. With more words there
+are far more puzzles (about n^4), so generation is timed for the first --limit puzzles,
+and those are what is ranked, measured and turned into YAML
+Peak memory is the most traced (tracemalloc) by the benchmarked call alone, in a run
+after the timed ones (tracing makes allocating slower), so it leaves out the setup, e.g.,
+generating the puzzles to rank. Each benchmark runs in a new process, so nothing is
+left over from the one before
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from itertools import islice
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from puzzle import get_puzzle_dashdot_metrics, load_words, words_to_puzzle_solved
+from puzzlegen import iter_puzzles
+from puzzlerank import main as rank_main
+from puzzleyaml import dump
+from puzzleyaml import main as yaml_main
+
+SHIPPED = "shipped"
+SIZES = [SHIPPED, "5000", "20000", "100000"]
+LIMIT = 200000
+YAML_LIMIT = 10000
+THRESHOLD = 0.1
+# timed runs of each benchmark, keeping the fastest, so one slow run is not a regression
+REPEAT = 5
+# how much of each letter pair count is added to every pair, so any word can be made
+SMOOTHING = 0.1
+
+
+def synthetic_words(n_words: int, length: int = 4, seed: int = 0) -> List[str]:
+    """n_words made-up words of length letters, in alphabetical order,
+    with letters following each other as they do in the shipped word list
+
+    Raises:
+        ValueError: if there are not that many words of that length
+    """
+    if n_words > 26**length // 2:
+        raise ValueError(f"Too many words to make of length {length}")
+    letters = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)
+    words = np.frombuffer("".join(load_words(str(length))).encode(), dtype=np.uint8)
+    words = words.reshape(-1, length) - ord("A")
+    first = np.bincount(words[:, 0], minlength=26) + SMOOTHING
+    pairs = np.full((26, 26), SMOOTHING)
+    np.add.at(pairs, (words[:, :-1], words[:, 1:]), 1)
+    # cumulative probabilities of the first letter, and of each letter after another
+    first_cum = np.cumsum(first / first.sum())
+    pairs_cum = np.cumsum(pairs / pairs.sum(axis=1, keepdims=True), axis=1)
+    rng = np.random.default_rng(seed)
+    made = {}
+    while len(made) < n_words:
+        batch = np.empty((n_words, length), dtype=np.uint8)
+        batch[:, 0] = np.searchsorted(first_cum, rng.random(n_words), side="right")
+        for i in range(1, length):
+            u = rng.random(n_words)[:, None]
+            batch[:, i] = (pairs_cum[batch[:, i - 1]] <= u).sum(axis=1)
+        # rounding can leave a cumulative probability just under 1
+        text = letters[np.minimum(batch, 25)].tobytes().decode()
+        for j in range(0, len(text), length):
+            made[text[j : j + length]] = None
+            if len(made) == n_words:
+                break
+    return sorted(made)
+
+
+def word_list(size: str, length: int = 4) -> List[str]:
+    """The shipped word list, or a made-up one of size words"""
+    if size == SHIPPED:
+        return load_words(str(length))
+    return synthetic_words(int(size), length)
+
+
+def bench_generate(all_words: List[str], limit: int) -> int:
+    """Generate the first limit puzzles"""
+    return sum(1 for _ in islice(iter_puzzles(all_words), limit))
+
+
+def bench_rank(puzzles: List[List[str]]) -> int:
+    """Rank puzzles by unique letters, writing them nowhere"""
+    rank_main(puzzles, "unique", out_file=os.devnull)
+    return len(puzzles)
+
+
+def bench_metrics(puzzles: List[List[List[str]]]) -> int:
+    """Count the dots and dashes of solved puzzles"""
+    for puzzle in puzzles:
+        get_puzzle_dashdot_metrics(puzzle)
+    return len(puzzles)
+
+
+def bench_yaml(puzzles: List[List[str]]) -> int:
+    """Make the YAML document of puzzles"""
+    n_letters = 2 * len(puzzles[0][0]) + 2 * len(puzzles[0][1]) - 4 if puzzles else 0
+    dump([yaml_main(words, [1, n_letters]) for words in puzzles])
+    return len(puzzles)
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "generate": bench_generate,
+    "rank": bench_rank,
+    "metrics": bench_metrics,
+    "yaml": bench_yaml,
+}
+
+
+def _run(bench: str, size: str, limit: int, repeat: int) -> Dict:
+    """Run one benchmark, in this process, as a result row"""
+    all_words = word_list(size)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(
+        devnull
+    ), contextlib.redirect_stderr(devnull):
+        if bench == "generate":
+            args = (all_words, limit)
+        else:
+            puzzles = list(islice(iter_puzzles(all_words), limit))
+            if bench == "metrics":
+                puzzles = [words_to_puzzle_solved(words) for words in puzzles]
+            elif bench == "yaml":
+                puzzles = puzzles[:YAML_LIMIT]
+            args = (puzzles,)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            n_puzzles = BENCHMARKS[bench](*args)
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        BENCHMARKS[bench](*args)
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        tracemalloc.stop()
+    seconds = min(times)
+    return {
+        "bench": bench,
+        "words": len(all_words),
+        "size": size,
+        "puzzles": n_puzzles,
+        "seconds": seconds,
+        "puzzles_per_second": n_puzzles / seconds if seconds else None,
+        "peak_mb": peak_mb,
+    }
+
+
+def run(
+    benches: List[str],
+    sizes: List[str],
+    limit: int = LIMIT,
+    repeat: int = REPEAT,
+) -> Dict:
+    """Run every benchmark on every word list, each in a new process (so its peak memory
+    is its own), as the results to save
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for size in sizes:
+        for bench in benches:
+            pool = context.Pool(1)
+            result = pool.apply(_run, (bench, size, limit, repeat))
+            pool.close()
+            pool.join()
+            print(
+                f"{bench:<10}{size:>8} words  {result['seconds']:8.3f}s  "
+                f"{result['peak_mb']:8.1f}MB  "
+                f"{result['puzzles_per_second'] or 0:12.0f} puzzles/s",
+                file=sys.stderr,
+            )
+            results.append(result)
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "limit": limit,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(old: Dict, new: Dict, threshold: float = THRESHOLD) -> List[Dict]:
+    """Compare the results of two runs, for each benchmark in both, as rows of
+    (bench, size, old and new puzzles per second and peak memory, how much slower
+    and bigger new is, regression)
+    where regression is whether new is more than threshold slower or bigger
+    Speed is compared per puzzle, so runs with different --limit can be compared
+    """
+    old_results = {(r["bench"], r["size"]): r for r in old["results"]}
+    rows = []
+    for result in new["results"]:
+        before = old_results.get((result["bench"], result["size"]))
+        if before is None or not result["puzzles_per_second"]:
+            continue
+        slower = before["puzzles_per_second"] / result["puzzles_per_second"] - 1
+        bigger = result["peak_mb"] / before["peak_mb"] - 1 if before["peak_mb"] else 0
+        rows.append(
+            {
+                "bench": result["bench"],
+                "size": result["size"],
+                "puzzles_per_second": (
+                    before["puzzles_per_second"],
+                    result["puzzles_per_second"],
+                ),
+                "peak_mb": (before["peak_mb"], result["peak_mb"]),
+                "slower": slower,
+                "bigger": bigger,
+                "regression": slower > threshold or bigger > threshold,
+            }
+        )
+    return rows
+
+
+def main_compare(old_fname: str, new_fname: str, threshold: float = THRESHOLD) -> bool:
+    """print the comparison of two results files
+
+    Returns:
+        bool: whether anything regressed
+    """
+    with open(old_fname, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_fname, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    rows = compare(old, new, threshold)
+    print(f"{'bench':<10}{'size':>8}  {'puzzles/s':>23}  {'slower':>7}  {'bigger':>7}")
+    for row in rows:
+        before, after = row["puzzles_per_second"]
+        print(
+            f"{row['bench']:<10}{row['size']:>8}  {before:10.0f} -> {after:10.0f}  "
+            f"{row['slower']:+7.1%}  {row['bigger']:+7.1%}"
+            f"{'  REGRESSION' if row['regression'] else ''}"
+        )
+    return any(row["regression"] for row in rows)
+
+
+def main(
+    out_file: str,
+    benches: List[str] = None,
+    sizes: List[str] = None,
+    limit: int = LIMIT,
+    repeat: int = REPEAT,
+):
+    """main"""
+    results = run(benches or list(BENCHMARKS), sizes or SIZES, limit, repeat)
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="bench.json",
+        help="File to save results to",
+    )
+    parser.add_argument(
+        "-b",
+        "--bench",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        help="Benchmarks to run. Defaults to all",
+    )
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        nargs="+",
+        help=f"Word lists to run on, {SHIPPED} or a number of made-up words. "
+        f"Defaults to {' '.join(SIZES)}",
+    )
+    parser.add_argument(
+        "-l",
+        "--limit",
+        type=int,
+        default=LIMIT,
+        help="Most puzzles to generate, and to rank, measure and make YAML of",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=REPEAT,
+        help="Times to run each benchmark, keeping the fastest",
+    )
+    parser.add_argument(
+        "-c",
+        "--compare",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Compare two results files instead",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="Fraction slower (or bigger) to count as a regression, with --compare",
+    )
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(1 if main_compare(*args.compare, args.threshold) else 0)
+    main(args.output, args.bench, args.sizes, args.limit, args.repeat)
@@ -0,0 +1,67 @@
+"""Tests for puzzlebench.py"""
+
+import unittest
+from puzzle import load_words
+from puzzlebench import compare, run, synthetic_words
+
+
+class TestBench(unittest.TestCase):
+    """Tests for benchmarking and comparing results"""
+
+    def test_synthetic_words(self):
+        """made-up words should be unique, sorted, and the same for the same seed"""
+        words = synthetic_words(2000)
+
+        self.assertEqual(len(words), 2000)
+        self.assertEqual(words, sorted(set(words)))
+        self.assertTrue(all(len(word) == 4 and word.isalpha() for word in words))
+        self.assertEqual(words, synthetic_words(2000))
+        self.assertNotEqual(words, synthetic_words(2000, seed=1))
+        with self.assertRaises(ValueError):
+            synthetic_words(20000, 3)
+
+    def test_common_letters(self):
+        """letters should be about as common as in the shipped word list"""
+        real = "".join(load_words("4"))
+        made = "".join(synthetic_words(5000))
+
+        for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+            self.assertAlmostEqual(
+                made.count(letter) / len(made), real.count(letter) / len(real), delta=0.02
+            )
+
+    def test_run(self):
+        """every benchmark should record its time, memory and speed"""
+        results = run(["generate", "yaml"], ["shipped", "1000"], limit=100)
+
+        self.assertEqual(len(results["results"]), 4)
+        for result in results["results"]:
+            self.assertEqual(result["puzzles"], 100)
+            self.assertGreater(result["seconds"], 0)
+            self.assertGreater(result["peak_mb"], 0)
+            self.assertGreater(result["puzzles_per_second"], 0)
+
+    def test_compare(self):
+        """only changes beyond the threshold should be regressions"""
+
+        def results(*rows):
+            return {
+                "results": [
+                    {
+                        "bench": bench,
+                        "size": "shipped",
+                        "puzzles_per_second": speed,
+                        "peak_mb": memory,
+                    }
+                    for bench, speed, memory in rows
+                ]
+            }
+
+        old = results(("generate", 100, 10), ("rank", 100, 10), ("yaml", 100, 10))
+        new = results(("generate", 95, 10), ("rank", 50, 10), ("yaml", 100, 20))
+
+        rows = compare(old, new, threshold=0.1)
+
+        self.assertEqual([row["regression"] for row in rows], [False, True, True])
+        self.assertAlmostEqual(rows[1]["slower"], 1)
+        self.assertAlmostEqual(rows[2]["bigger"], 1)
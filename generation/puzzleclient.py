@@ -0,0 +1,170 @@
+"""Ask a running puzzle server (see puzzleserver.py) for puzzles, instead of loading the
+word lists and puzzle lists again, e.g.,
+  python puzzleclient.py pick -i puzzles_4x4_sorted.txt --min-score 10 --date 2024-06-01
+  python puzzleclient.py solve -w BIRD BORN DOVE NOSE -r 1 12
+  python puzzleclient.py yaml -i ../next.txt -r auto > ../website/_data/puzzles.yaml
+Only imports the standard library, so it starts quickly (it is still a Python process,
+but a much lighter one than the scripts, which import numpy and load the word lists and
+puzzle lists, and it exits with 1 if there is no server, so callers can fall back)
+Requests are one JSON object per line, e.g.,
+  {"op": "solve", "words": ["BIRD", "BORN", "DOVE", "NOSE"], "reveal": [1, 12]}
+and responses are {"result": ...} or {"error": "..."}, so any client which can write to
+a Unix socket works, e.g., `nc -U puzzleserver.sock`
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, List, Union
+
+SOCKET_FNAME = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "puzzleserver.sock"
+)
+TIMEOUT = 60
+
+
+class ServerError(Exception):
+    """A request the server could not answer, e.g., for words which are not a puzzle"""
+
+
+def request(
+    payload: Dict[str, Any], socket_fname: str = SOCKET_FNAME, timeout: float = TIMEOUT
+) -> Any:
+    """Send one request to the server, and return its result
+
+    Raises:
+        ServerError: if the server answers with an error
+        OSError: if there is no server listening on socket_fname
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_fname)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ServerError("Server closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise ServerError(response["error"])
+    return response["result"]
+
+
+def parse_reveal(reveal: List[str]) -> Union[List[int], str]:
+    """Parse reveal from the command line, as indices, or "auto" (see puzzleyaml)"""
+    if reveal == ["auto"]:
+        return "auto"
+    return [int(index) for index in reveal]
+
+
+def main(args: argparse.Namespace) -> int:
+    """main, prints the result the same way as the script for each request would
+    Returns:
+        int: exit code
+    """
+    reveal = None if args.reveal is None else parse_reveal(args.reveal)
+    if reveal == "auto" and args.op in ("pick", "solve"):
+        print(f"Give indices to reveal, auto is not for {args.op}", file=sys.stderr)
+        return 2
+    if args.op == "yaml":
+        if args.input == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.input, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        payload = {
+            "op": "yaml",
+            "lines": lines,
+            "reveal": reveal,
+            "timings": args.timings or None,
+        }
+    elif args.op == "pick":
+        payload = {
+            "op": "pick",
+            "input": os.path.abspath(args.input),
+            "top": args.top,
+            "min_score": args.min_score,
+            "date": args.date,
+            "reveal": reveal,
+        }
+    elif args.op == "ping":
+        payload = {"op": "ping"}
+    else:
+        payload = {"op": args.op, "words": args.words, "reveal": reveal}
+
+    try:
+        # leave out what wasn't given, for the server's defaults
+        result = request(
+            {key: value for key, value in payload.items() if value is not None},
+            args.socket,
+        )
+    except ServerError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"No puzzle server on {args.socket}: {e}", file=sys.stderr)
+        return 1
+
+    if args.op == "pick":
+        print(",".join(result))
+    elif args.op == "solve":
+        for words in result:
+            print(",".join(words))
+        print(f"{len(result)} solution(s)", file=sys.stderr)
+    elif args.op == "validate":
+        if not result["valid"]:
+            print(result["error"], file=sys.stderr)
+            return 1
+    elif args.op == "yaml" and args.timings:
+        print(result["yaml"])
+        # as puzzleyaml.print_timings
+        timings = result["timings"]
+        width = max(len(stage) for stage in [*timings, "total"]) + 2
+        for stage, seconds in timings.items():
+            print(f"{stage:<{width}}{seconds:.4f}s", file=sys.stderr)
+        print(f"{'total':<{width}}{sum(timings.values()):.4f}s", file=sys.stderr)
+    elif args.op == "yaml":
+        print(result)
+    else:
+        print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--socket",
+        default=SOCKET_FNAME,
+        help="Unix socket the server listens on",
+    )
+    ops = parser.add_subparsers(dest="op", required=True)
+    ops.add_parser("ping", help="Check the server is running")
+    pick_parser = ops.add_parser("pick", help="Pick a puzzle, see puzzlepick.py")
+    pick_parser.add_argument("-i", "--input", required=True, help="Ranked puzzles")
+    pick_parser.add_argument("-t", "--top", type=int)
+    pick_parser.add_argument("-s", "--min-score", type=int)
+    pick_parser.add_argument("-d", "--date")
+    pick_parser.add_argument("-r", "--reveal", nargs="+")
+    for op, op_help in [
+        ("metrics", "Dots and dashes of a puzzle"),
+        ("validate", "Check words (and reveal) make a puzzle"),
+        ("solve", "Every solution of a puzzle, see puzzlesolve.py"),
+    ]:
+        op_parser = ops.add_parser(op, help=op_help)
+        op_parser.add_argument("-w", "--words", nargs="+", required=True)
+        op_parser.add_argument("-r", "--reveal", nargs="+", required=op == "solve")
+    yaml_parser = ops.add_parser("yaml", help="YAML of many puzzles, see puzzleyaml.py")
+    yaml_parser.add_argument(
+        "-i", "--input", required=True, help="File (or - for stdin) of puzzles"
+    )
+    yaml_parser.add_argument("-r", "--reveal", nargs="+")
+    yaml_parser.add_argument(
+        "-t",
+        "--timings",
+        action="store_true",
+        help="Print the time the server spent in each stage to stderr",
+    )
+    parser.set_defaults(reveal=None)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,334 @@
+"""Short codes for puzzles and their solutions, e.g., to share custom puzzles, or as keys
+a puzzle code is what a player sees (the dots, dashes and revealed letters), e.g., for
+  ["BIRD", "BORN", "DOVE", "NOSE"] with 1 and 12 revealed -> "FEMIpkgKUZhEMMJYAQk"
+and a solution code is the letters, e.g., -> "FECiI3OjVrpE"
+Both are bits, written as URL-safe base64 (without padding), of
+  puzzle:   version, rows, cols (4 bits each, so up to 15x15 puzzles)
+            dots-top, dots-left, dashes-right, dashes-bottom (enough bits for a whole word)
+            which letters are revealed (1 bit per letter)
+            the revealed letters (5 bits each)
+  solution: version, rows, cols (4 bits each)
+            the letters (5 bits each)
+Codes for many puzzles are made (and read) at once with numpy, e.g., for a whole corpus
+  python puzzlecodec.py -i puzzles_4x4.bin -r 1 12 > codes_4x4.txt
+"""
+
+import argparse
+from itertools import islice
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from puzzle import (
+    RingGeometry,
+    codes_to_words,
+    get_puzzles_dashdot_metrics,
+    inflate_puzzle,
+    ring_geometry,
+    words_to_codes,
+)
+from puzzlecorpus import read_puzzles
+from puzzlesolve import reveal_mask
+
+VERSION = 1
+# version, rows, cols
+HEADER_BITS = 4
+LETTER_BITS = 5
+LETTER_LIMIT = 26
+METRICS = ["dots-top", "dots-left", "dashes-right", "dashes-bottom"]
+CHUNK_SIZE = 100000
+ALPHABET = np.frombuffer(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_", dtype=np.uint8
+)
+# value of each (ASCII) character in ALPHABET, or 255 if not in it
+_CHAR_VALUES = np.full(256, 255, dtype=np.uint8)
+_CHAR_VALUES[ALPHABET] = np.arange(len(ALPHABET))
+
+
+def _to_bits(values: np.ndarray, n_bits: int) -> np.ndarray:
+    """(M, K) integers as (M, K * n_bits) bits, most significant first"""
+    shifts = np.arange(n_bits - 1, -1, -1)
+    bits = (np.asarray(values)[..., np.newaxis] >> shifts) & 1
+    return bits.reshape(len(bits), -1).astype(np.uint8)
+
+
+def _from_bits(bits: np.ndarray, n_bits: int) -> np.ndarray:
+    """(M, K * n_bits) bits as (M, K) integers, the reverse of _to_bits"""
+    weights = 1 << np.arange(n_bits - 1, -1, -1)
+    return bits.reshape(len(bits), -1, n_bits).astype(np.int64) @ weights
+
+
+def _to_text(bits: np.ndarray) -> np.ndarray:
+    """(M, N) bits as M URL-safe base64 strings, 6 bits per character"""
+    pad = -bits.shape[1] % 6
+    bits = np.pad(bits, ((0, 0), (0, pad)))
+    chars = ALPHABET[_from_bits(bits, 6)]
+    return chars.view(f"S{chars.shape[1]}").ravel().astype(str)
+
+
+def _from_text(codes: Sequence[str]) -> np.ndarray:
+    """M URL-safe base64 strings of the same length as (M, 6 * length) bits
+
+    Raises:
+        ValueError: if the codes are not all the same length, or not base64
+    """
+    lengths = {len(code) for code in codes}
+    if len(lengths) != 1:
+        raise ValueError("Codes must all be the same length")
+    chars = np.frombuffer("".join(codes).encode("ascii"), dtype=np.uint8)
+    values = _CHAR_VALUES[chars]
+    if (values == 255).any():
+        raise ValueError("Codes must be URL-safe base64")
+    return _to_bits(values.reshape(len(codes), -1), 6)
+
+
+def metric_bits(rows: int, cols: int) -> int:
+    """Bits for each dot/dash count, enough for a whole word of dashes (4 per letter)"""
+    return (4 * max(rows, cols)).bit_length()
+
+
+def _check_letters(codes: np.ndarray) -> np.ndarray:
+    if (codes >= LETTER_LIMIT).any():
+        raise ValueError("Codes have letters which are not A-Z")
+    return codes
+
+
+def _header(n_codes: int, rows: int, cols: int) -> np.ndarray:
+    """Header bits of n_codes codes of rows x cols puzzles
+
+    Raises:
+        ValueError: if rows or cols does not fit in HEADER_BITS, so could not be read
+    """
+    if max(rows, cols) >= 1 << HEADER_BITS:
+        raise ValueError(
+            f"No code for a {rows}x{cols} puzzle, "
+            f"rows and cols must be less than {1 << HEADER_BITS}"
+        )
+    header = np.tile([VERSION, rows, cols], (n_codes, 1))
+    return _to_bits(header, HEADER_BITS)
+
+
+def _read_header(bits: np.ndarray) -> RingGeometry:
+    """The geometry (rows, cols) from the header bits of codes
+
+    Raises:
+        ValueError: if the codes are of another version, or different sizes
+    """
+    header = _from_bits(bits[:, : 3 * HEADER_BITS], HEADER_BITS)
+    if (header != header[0]).any():
+        raise ValueError("Codes must all be for the same size of puzzle")
+    version, rows, cols = header[0].tolist()
+    if version != VERSION:
+        raise ValueError(f"Unknown code version {version}")
+    if rows < 3 or cols < 3:
+        raise ValueError(f"No puzzle is {rows}x{cols}")
+    return ring_geometry(rows, cols)
+
+
+def encode_solutions(codes: np.ndarray, geometry: RingGeometry = None) -> np.ndarray:
+    """Solution codes of many puzzles, given as an (M, cells) array of letter codes
+    (see words_to_codes), which are square unless geometry is given
+    """
+    codes = np.asarray(codes)
+    if geometry is None:
+        geometry = RingGeometry.of_cells(codes.shape[1])
+    bits = np.concatenate(
+        [
+            _header(len(codes), geometry.rows, geometry.cols),
+            _to_bits(codes, LETTER_BITS),
+        ],
+        axis=1,
+    )
+    return _to_text(bits)
+
+
+def _decode_solutions(
+    solution_codes: Sequence[str],
+) -> Tuple[np.ndarray, RingGeometry]:
+    """(letter codes, geometry) of many puzzles from their solution codes"""
+    bits = _from_text(solution_codes)
+    geometry = _read_header(bits)
+    start = 3 * HEADER_BITS
+    stop = start + geometry.n_cells * LETTER_BITS
+    if bits.shape[1] < stop:
+        raise ValueError("Solution codes are too short")
+    return _check_letters(_from_bits(bits[:, start:stop], LETTER_BITS)), geometry
+
+
+def decode_solutions(solution_codes: Sequence[str]) -> np.ndarray:
+    """Letter codes of many puzzles, as an (M, cells) array, from their solution codes"""
+    return _decode_solutions(solution_codes)[0]
+
+
+def encode_puzzles(
+    codes: np.ndarray, reveal: List[int], geometry: RingGeometry = None
+) -> np.ndarray:
+    """Puzzle codes of many puzzles, given as an (M, cells) array of letter codes
+    (see words_to_codes), with the letters in reveal revealed,
+    which are square unless geometry is given
+    """
+    codes = np.asarray(codes)
+    if geometry is None:
+        geometry = RingGeometry.of_cells(codes.shape[1])
+    n_cells = geometry.n_cells
+    n_bits = metric_bits(geometry.rows, geometry.cols)
+    metrics = get_puzzles_dashdot_metrics(codes, geometry)
+    mask = reveal_mask(reveal, n_cells)
+    mask_bits = [mask >> cell & 1 for cell in range(n_cells)]
+    revealed = [cell for cell in range(n_cells) if mask_bits[cell]]
+    bits = np.concatenate(
+        [_header(len(codes), geometry.rows, geometry.cols)]
+        + [_to_bits(metrics[name], n_bits) for name in METRICS]
+        + [
+            np.tile(np.array(mask_bits, dtype=np.uint8), (len(codes), 1)),
+            _to_bits(codes[:, revealed], LETTER_BITS),
+        ],
+        axis=1,
+    )
+    return _to_text(bits)
+
+
+def decode_puzzles(
+    puzzle_codes: Sequence[str],
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """The clues of many puzzles, from their puzzle codes, as
+    (metrics, as (M, rows or cols) arrays, revealed letter codes, as an (M, cells) array,
+    which is -1 for letters which are not revealed)
+    Puzzles must all have the same number of letters revealed
+    """
+    bits = _from_text(puzzle_codes)
+    geometry = _read_header(bits)
+    n_cells = geometry.n_cells
+    n_bits = metric_bits(geometry.rows, geometry.cols)
+    start = 3 * HEADER_BITS
+    metrics = {}
+    # dots-top, dots-left, dashes-right, dashes-bottom have a number per col/row/row/col
+    for name, length in zip(METRICS, geometry.word_lengths):
+        stop = start + length * n_bits
+        metrics[name] = _from_bits(bits[:, start:stop], n_bits)
+        start = stop
+    mask = bits[:, start : start + n_cells].astype(bool)
+    start += n_cells
+    n_revealed = mask.sum(axis=1)
+    if (n_revealed != n_revealed[0]).any():
+        raise ValueError("Puzzles must all have the same number of letters revealed")
+    stop = start + int(n_revealed[0]) * LETTER_BITS
+    if bits.shape[1] < stop:
+        raise ValueError("Puzzle codes are too short")
+    revealed = np.full((len(bits), n_cells), -1, dtype=np.int64)
+    revealed[mask] = _check_letters(_from_bits(bits[:, start:stop], LETTER_BITS)).ravel()
+    return metrics, revealed
+
+
+def check_solutions(
+    puzzle_codes: Sequence[str], solution_codes: Sequence[str]
+) -> np.ndarray:
+    """Whether each solution code solves each puzzle code, i.e., has the same dots and
+    dashes, and the revealed letters, as an array of bools
+    """
+    metrics, revealed = decode_puzzles(puzzle_codes)
+    letters, geometry = _decode_solutions(solution_codes)
+    if revealed.shape != letters.shape or any(
+        metrics[name].shape[1] != length
+        for name, length in zip(METRICS, geometry.word_lengths)
+    ):
+        return np.zeros(len(letters), dtype=bool)
+    solved = get_puzzles_dashdot_metrics(letters, geometry)
+    valid = ((revealed == -1) | (revealed == letters)).all(axis=1)
+    for name in METRICS:
+        valid &= (solved[name] == metrics[name]).all(axis=1)
+    return valid
+
+
+def encode_puzzle(words: List[str], reveal: List[int]) -> str:
+    """Puzzle code of the puzzle made from words, with the letters in reveal revealed"""
+    geometry = RingGeometry.of_words(words)
+    return str(encode_puzzles(words_to_codes([words]), reveal, geometry)[0])
+
+
+def encode_solution(words: List[str]) -> str:
+    """Solution code of the puzzle made from words"""
+    geometry = RingGeometry.of_words(words)
+    return str(encode_solutions(words_to_codes([words]), geometry)[0])
+
+
+def decode_puzzle(puzzle_code: str) -> Tuple[Dict[str, List[int]], List[List[str]]]:
+    """The clues of a puzzle from its puzzle code, as (metrics, unsolved puzzle),
+    the same as puzzlesolve.puzzle_clues
+    """
+    metrics, revealed = decode_puzzles([puzzle_code])
+    letters = ["" if code < 0 else chr(ord("A") + code) for code in revealed[0]]
+    metrics = {name: values[0].tolist() for name, values in metrics.items()}
+    geometry = ring_geometry(len(metrics["dots-left"]), len(metrics["dots-top"]))
+    return metrics, inflate_puzzle(letters, geometry)
+
+
+def decode_solution(solution_code: str) -> List[str]:
+    """The words of a puzzle from its solution code"""
+    return codes_to_words(*_decode_solutions([solution_code]))[0]
+
+
+def check_solution(puzzle_code: str, solution_code: str) -> bool:
+    """Whether solution_code solves puzzle_code"""
+    try:
+        return bool(check_solutions([puzzle_code], [solution_code])[0])
+    except ValueError:
+        return False
+
+
+def main(fname: str, reveal: List[int], chunk_size: int = CHUNK_SIZE):
+    """print the puzzle code and solution code of every puzzle in fname"""
+    puzzles = read_puzzles(fname)
+    while True:
+        chunk = list(islice(puzzles, chunk_size))
+        if not chunk:
+            break
+        codes = words_to_codes(chunk)
+        geometry = RingGeometry.of_words(chunk[0])
+        pairs = zip(
+            encode_puzzles(codes, reveal, geometry), encode_solutions(codes, geometry)
+        )
+        print("\n".join(f"{puzzle} {solution}" for puzzle, solution in pairs))
+
+
+def main_decode(fname: str, chunk_size: int = CHUNK_SIZE):
+    """print the words of every solution code in fname (the last code on each line)"""
+    with open(fname, "r", encoding="utf-8") as f:
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                break
+            solution_codes = [line.split()[-1] for line in lines]
+            puzzles = codes_to_words(*_decode_solutions(solution_codes))
+            print("\n".join(",".join(words) for words in puzzles))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-i",
+        "--input",
+        help="Puzzles, as a binary corpus or comma-separated words, "
+        "or codes with --decode",
+        required=True,
+    )
+    parser.add_argument(
+        "-r",
+        "--reveal",
+        nargs="+",
+        type=int,
+        help="List of indices to reveal in puzzle codes. -1 for all. 0 for none.",
+    )
+    parser.add_argument(
+        "-d",
+        "--decode",
+        action="store_true",
+        help="Print the words of each solution code instead",
+    )
+    args = parser.parse_args()
+    if args.decode:
+        main_decode(args.input)
+    elif args.reveal is None:
+        parser.error("the following arguments are required: -r/--reveal")
+    else:
+        main(args.input, args.reveal)
@@ -0,0 +1,114 @@
+"""Tests for puzzlecodec.py"""
+
+import unittest
+import numpy as np
+from puzzle import RingGeometry, codes_to_words, words_to_codes
+from puzzlecodec import (
+    check_solution,
+    check_solutions,
+    decode_puzzle,
+    decode_puzzles,
+    decode_solution,
+    decode_solutions,
+    encode_puzzle,
+    encode_puzzles,
+    encode_solution,
+    encode_solutions,
+)
+from puzzlegen import generate
+from puzzlegen_test import TestGenerate
+from puzzlesolve import puzzle_clues
+
+
+class TestCodec(unittest.TestCase):
+    """Tests for puzzle and solution codes"""
+
+    puzzles = generate(TestGenerate.words_4) + generate(TestGenerate.words_3)
+
+    def test_example(self):
+        """codes should be short, URL-safe, and the same as in the docstring"""
+        words = ["BIRD", "BORN", "DOVE", "NOSE"]
+
+        self.assertEqual(encode_puzzle(words, [1, 12]), "FEMIpkgKUZhEMMJYAQk")
+        self.assertEqual(encode_solution(words), "FECiI3OjVrpE")
+
+    def test_round_trip(self):
+        """decoding codes should give back the words, and the clues"""
+        for words in self.puzzles:
+            for reveal in [[0], [1, 12], [2, 3, 7], [-1]]:
+                with self.subTest(words=words, reveal=reveal):
+                    puzzle_code = encode_puzzle(words, reveal)
+                    solution_code = encode_solution(words)
+
+                    self.assertEqual(decode_solution(solution_code), words)
+                    self.assertEqual(
+                        decode_puzzle(puzzle_code), puzzle_clues(words, reveal)
+                    )
+                    self.assertTrue(check_solution(puzzle_code, solution_code))
+
+    def test_rectangles(self):
+        """codes should keep the size of rectangular puzzles, e.g., 3x4 and 4x3"""
+        for words in [["ABLE", "AND", "EFT", "DUST"], ["AND", "ABLE", "DUST", "EFT"]]:
+            with self.subTest(words=words):
+                puzzle_code = encode_puzzle(words, [1, 10])
+                solution_code = encode_solution(words)
+
+                self.assertEqual(decode_solution(solution_code), words)
+                self.assertEqual(decode_puzzle(puzzle_code), puzzle_clues(words, [1, 10]))
+                self.assertTrue(check_solution(puzzle_code, solution_code))
+                self.assertFalse(
+                    check_solution(puzzle_code, encode_solution(["BIRD", "BORN", "DOVE", "NOSE"]))
+                )
+
+    def test_size_limit(self):
+        """codes should be read back for the biggest size the header holds, and not be
+        made for bigger puzzles"""
+        rng = np.random.default_rng(0)
+        geometry, too_big = RingGeometry(4, 15), RingGeometry(4, 16)
+        codes = rng.integers(0, 26, (3, geometry.n_cells))
+        big_codes = rng.integers(0, 26, (3, too_big.n_cells))
+
+        self.assertEqual(
+            decode_solutions(encode_solutions(codes, geometry)).tolist(), codes.tolist()
+        )
+        with self.assertRaises(ValueError):
+            encode_solutions(big_codes, too_big)
+        with self.assertRaises(ValueError):
+            encode_puzzles(big_codes, [1], too_big)
+
+    def test_bulk(self):
+        """encoding and decoding many puzzles at once should be the same as one by one"""
+        puzzles = generate(TestGenerate.words_4)
+        codes = words_to_codes(puzzles)
+
+        puzzle_codes = encode_puzzles(codes, [1, 12])
+        solution_codes = encode_solutions(codes)
+
+        self.assertEqual(
+            list(puzzle_codes), [encode_puzzle(words, [1, 12]) for words in puzzles]
+        )
+        self.assertEqual(list(solution_codes), [encode_solution(w) for w in puzzles])
+        self.assertEqual(codes_to_words(decode_solutions(solution_codes)), puzzles)
+        metrics, revealed = decode_puzzles(puzzle_codes)
+        self.assertEqual(metrics["dots-top"].shape, (len(puzzles), 4))
+        self.assertEqual((revealed >= 0).sum(axis=1).tolist(), [2] * len(puzzles))
+        self.assertTrue(check_solutions(puzzle_codes, solution_codes).all())
+
+    def test_wrong_solutions(self):
+        """solutions with different dots/dashes, revealed letters, or size, should not
+        solve a puzzle, and bad codes should not be valid"""
+        puzzle_code = encode_puzzle(["BIRD", "BORN", "DOVE", "NOSE"], [1, 12])
+
+        for solution_code in [
+            encode_solution(["BIRD", "BORN", "DOVE", "NOSY"]),
+            encode_solution(["HIT", "HUM", "TOP", "MAP"]),
+            "FECiI3OjVr",
+            "FECiI3OjVr+E",
+            "",
+        ]:
+            with self.subTest(solution_code=solution_code):
+                self.assertFalse(check_solution(puzzle_code, solution_code))
+        with self.assertRaises(ValueError):
+            decode_solution("AECiI3OjVrpE")
+        with self.assertRaises(ValueError):
+            decode_solutions(["FECiI3OjVrpE", "FECiI3OjVr"])
@@ -0,0 +1,239 @@
+"""Binary ringram puzzle corpus
+Instead of four words per line, e.g.,
+  BIRD,BORN,DOVE,NOSE
+each puzzle is four word ids into a word table stored once in the file, as
+  header      magic, version, word length, number of words, number of puzzles,
+              metadata length, sha256 of the word list
+  word table  every word, back to back
+  padding     so puzzles start on a multiple of 8 bytes
+  puzzles     4 little-endian uint16 word ids per puzzle
+  metadata    JSON, e.g., what the puzzles are sorted by
+The file is memory-mapped to read it, so opening it costs nothing and any
+puzzle can be read directly by its index.
+"""
+
+import copy
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+
+import numpy as np
+
+MAGIC = b"RGRM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQI32s")
+RECORD = struct.Struct("<4H")
+MAX_WORDS = 1 << 16
+BATCH_SIZE = 10000
+
+
+def wordlist_hash(words: List[str]) -> bytes:
+    """sha256 of a word list, to check a corpus was made from it"""
+    return hashlib.sha256("\n".join(words).encode("ascii")).digest()
+
+
+def is_corpus(fname: str) -> bool:
+    """Whether a file is a binary corpus (rather than comma-separated words)"""
+    with open(fname, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _records_offset(n_words: int, word_length: int) -> int:
+    """Offset of the first puzzle in the file"""
+    offset = HEADER.size + n_words * word_length
+    return (offset + 7) // 8 * 8
+
+
+class Corpus(Sequence):
+    """A binary corpus, read lazily from a memory-mapped file
+    Indexing gives a puzzle as four words, and slicing gives another Corpus
+    e.g.,
+      with Corpus("puzzles_4x4.bin") as corpus:
+          corpus[0] -> ["ABLE", "ACID", "EARN", "DAWN"]
+          corpus[10:20] -> Corpus of the 11th to 20th puzzles
+    """
+
+    def __init__(self, fname: str):
+        with open(fname, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self.word_length,
+            n_words,
+            n_puzzles,
+            meta_length,
+            self.wordlist_hash,
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{fname} is not a puzzle corpus")
+        if version != VERSION:
+            raise ValueError(f"Unsupported corpus version {version} in {fname}")
+        table = self._mmap[HEADER.size : HEADER.size + n_words * self.word_length]
+        self.words = [
+            table[i : i + self.word_length].decode("ascii")
+            for i in range(0, len(table), self.word_length)
+        ]
+        self._offset = _records_offset(n_words, self.word_length)
+        meta_offset = self._offset + n_puzzles * RECORD.size
+        self.metadata = json.loads(self._mmap[meta_offset : meta_offset + meta_length])
+        self._n_records = n_puzzles
+        self._range = range(n_puzzles)
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def ids(self, index: int) -> tuple:
+        """Word ids of a puzzle"""
+        return RECORD.unpack_from(
+            self._mmap, self._offset + self._range[index] * RECORD.size
+        )
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[List[str], "Corpus"]:
+        if isinstance(index, slice):
+            # shares the memory map with self
+            view = copy.copy(self)
+            view._range = self._range[index]
+            return view
+        return [self.words[i] for i in self.ids(index)]
+
+    def iter_ids(self) -> Iterator[tuple]:
+        """Iterate over the word ids of every puzzle"""
+        if self._range.step != 1:
+            for i in range(len(self)):
+                yield self.ids(i)
+            return
+        start = self._offset + self._range.start * RECORD.size
+        stop = start + len(self) * RECORD.size
+        for batch_start in range(start, stop, BATCH_SIZE * RECORD.size):
+            batch_stop = min(batch_start + BATCH_SIZE * RECORD.size, stop)
+            yield from RECORD.iter_unpack(self._mmap[batch_start:batch_stop])
+
+    def id_array(self) -> np.ndarray:
+        """Word ids of every puzzle, as an (M, 4) array (a copy, so it outlives the file)"""
+        records = np.frombuffer(
+            self._mmap, dtype="<u2", count=self._n_records * 4, offset=self._offset
+        ).reshape(-1, 4)
+        r = self._range
+        return records[np.arange(r.start, r.stop, r.step)].astype(np.uint16)
+
+    def __iter__(self) -> Iterator[List[str]]:
+        words = self.words
+        for ids in self.iter_ids():
+            yield [words[i] for i in ids]
+
+    def close(self):
+        """Unmap the file (and so close every slice of it)"""
+        self._mmap.close()
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CorpusWriter:
+    """Write puzzles to a binary corpus, in batches
+    e.g.,
+      with CorpusWriter("puzzles_4x4.bin", all_words) as writer:
+          writer.write(["BIRD", "BORN", "DOVE", "NOSE"])
+          writer.metadata["sorted-by"] = "unique"
+    """
+
+    def __init__(self, fname: str, words: List[str], metadata: Dict = None):
+        if len(words) > MAX_WORDS:
+            raise ValueError(f"Corpus word list can have at most {MAX_WORDS} words")
+        if len(set(len(word) for word in words)) > 1:
+            raise ValueError("All words must be the same length")
+        self.words = words
+        self.word_ids = {word: i for i, word in enumerate(words)}
+        self.metadata = {} if metadata is None else metadata
+        self.n_puzzles = 0
+        self._word_length = len(words[0]) if words else 0
+        self._hash = wordlist_hash(words)
+        self._batch = array("H")
+        self._f = open(fname, "wb")  # pylint: disable=consider-using-with
+        self._f.write(self._header(0))
+        self._f.write("".join(words).encode("ascii"))
+        self._f.write(
+            b"\0" * (_records_offset(len(words), self._word_length) - self._f.tell())
+        )
+
+    def _header(self, meta_length: int) -> bytes:
+        return HEADER.pack(
+            MAGIC,
+            VERSION,
+            self._word_length,
+            len(self.words),
+            self.n_puzzles,
+            meta_length,
+            self._hash,
+        )
+
+    def write_ids(self, ids: Iterable[int]):
+        """Write a puzzle as four word ids"""
+        self._batch.extend(ids)
+        self.n_puzzles += 1
+        if len(self._batch) >= BATCH_SIZE * 4:
+            self._flush()
+
+    def write_id_array(self, ids: np.ndarray):
+        """Write many puzzles at once, as an (M, 4) array of word ids"""
+        self._flush()
+        self._f.write(np.ascontiguousarray(ids, dtype="<u2").tobytes())
+        self.n_puzzles += len(ids)
+
+    def write(self, puzzle: List[str]):
+        """Write a puzzle as four words"""
+        self.write_ids([self.word_ids[word] for word in puzzle])
+
+    def _flush(self):
+        if sys.byteorder == "big":
+            self._batch.byteswap()
+        self._f.write(self._batch.tobytes())
+        self._batch = array("H")
+
+    def close(self):
+        """Write the metadata and the header, and close the file"""
+        self._flush()
+        meta = json.dumps(self.metadata).encode("utf-8")
+        self._f.write(meta)
+        self._f.seek(0)
+        self._f.write(self._header(len(meta)))
+        self._f.close()
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_puzzles(fname: str) -> Iterator[List[str]]:
+    """Read puzzles from a binary corpus, or from comma-separated words, one per line"""
+    if is_corpus(fname):
+        with Corpus(fname) as corpus:
+            yield from corpus
+        return
+    with open(fname, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.strip().split(",")
+
+
+def write_corpus(
+    puzzles: Iterable[List[str]], fname: str, words: List[str], metadata: Dict = None
+) -> int:
+    """Write puzzles to a binary corpus
+
+    Returns:
+        int: number of puzzles written
+    """
+    with CorpusWriter(fname, words, metadata) as writer:
+        for puzzle in puzzles:
+            writer.write(puzzle)
+    return writer.n_puzzles
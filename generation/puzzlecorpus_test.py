@@ -0,0 +1,109 @@
+"""Tests for puzzlecorpus.py"""
+
+import os
+import tempfile
+import unittest
+from puzzlecorpus import (
+    MAX_WORDS,
+    Corpus,
+    CorpusWriter,
+    is_corpus,
+    read_puzzles,
+    wordlist_hash,
+    write_corpus,
+)
+
+
+class TestCorpus(unittest.TestCase):
+    """Tests for writing and reading binary corpora"""
+
+    words = ["BIRD", "BORN", "DOVE", "NOSE", "BEAN", "NEED", "DEAN"]
+    puzzles = [
+        ["BIRD", "BORN", "DOVE", "NOSE"],
+        ["BORN", "BIRD", "NOSE", "DOVE"],
+        ["BIRD", "BEAN", "DOVE", "NOSE"],
+        ["BEAN", "BIRD", "NEED", "DEAN"],
+        ["BIRD", "BORN", "DEAN", "NEED"],
+    ]
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.fname = os.path.join(self.tmpdir.name, "puzzles.bin")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """puzzles written to a corpus should be read back the same"""
+        n_puzzles = write_corpus(self.puzzles, self.fname, self.words, {"a": 1})
+
+        with Corpus(self.fname) as corpus:
+            self.assertEqual(n_puzzles, len(self.puzzles))
+            self.assertEqual(len(corpus), len(self.puzzles))
+            self.assertEqual(list(corpus), self.puzzles)
+            self.assertEqual(corpus.words, self.words)
+            self.assertEqual(corpus.metadata, {"a": 1})
+            self.assertEqual(corpus.wordlist_hash, wordlist_hash(self.words))
+        self.assertEqual(list(read_puzzles(self.fname)), self.puzzles)
+
+    def test_indexing_and_slicing(self):
+        """a corpus should be indexable and sliceable like a list"""
+        write_corpus(self.puzzles, self.fname, self.words)
+
+        with Corpus(self.fname) as corpus:
+            self.assertEqual(corpus[1], self.puzzles[1])
+            self.assertEqual(corpus[-1], self.puzzles[-1])
+            self.assertEqual(corpus.ids(0), (0, 1, 2, 3))
+            for index in [slice(1, 4), slice(None, None, 2), slice(3, 0, -1)]:
+                with self.subTest(index=index):
+                    self.assertEqual(list(corpus[index]), self.puzzles[index])
+            self.assertEqual(list(corpus[1:][1:3]), self.puzzles[2:4])
+            with self.assertRaises(IndexError):
+                corpus[len(self.puzzles)]  # pylint: disable=pointless-statement
+
+    def test_id_arrays(self):
+        """id arrays should match the puzzles, for slices too, and write back the same"""
+        write_corpus(self.puzzles, self.fname, self.words)
+        copy_fname = os.path.join(self.tmpdir.name, "copy.bin")
+
+        with Corpus(self.fname) as corpus:
+            ids = corpus.id_array()
+            for index in [slice(1, 4), slice(None, None, 2), slice(3, 0, -1)]:
+                with self.subTest(index=index):
+                    self.assertEqual(
+                        corpus[index].id_array().tolist(), ids[index].tolist()
+                    )
+            with CorpusWriter(copy_fname, self.words) as writer:
+                writer.write(self.puzzles[0])
+                writer.write_id_array(ids)
+
+        self.assertEqual(ids.shape, (len(self.puzzles), 4))
+        self.assertEqual(list(read_puzzles(copy_fname)), self.puzzles[:1] + self.puzzles)
+
+    def test_batches(self):
+        """metadata can be set while writing, and puzzles are written in batches"""
+        with CorpusWriter(self.fname, self.words) as writer:
+            for _ in range(25000):
+                writer.write(self.puzzles[0])
+            writer.metadata["sorted-by"] = "unique"
+
+        with Corpus(self.fname) as corpus:
+            self.assertEqual(len(corpus), 25000)
+            self.assertEqual(corpus[24999], self.puzzles[0])
+            self.assertEqual(corpus.metadata, {"sorted-by": "unique"})
+
+    def test_text_files(self):
+        """read_puzzles should also read comma-separated words"""
+        fname = os.path.join(self.tmpdir.name, "puzzles.txt")
+        with open(fname, "w", encoding="utf-8") as f:
+            f.writelines(f"{','.join(puzzle)}\n" for puzzle in self.puzzles)
+
+        self.assertFalse(is_corpus(fname))
+        self.assertEqual(list(read_puzzles(fname)), self.puzzles)
+
+    def test_bad_word_lists(self):
+        """corpora can only be made from word lists with at most MAX_WORDS same-length words"""
+        with self.assertRaises(ValueError):
+            CorpusWriter(self.fname, ["BIRD", "HIT"])
+        with self.assertRaises(ValueError):
+            CorpusWriter(self.fname, [str(i) for i in range(MAX_WORDS + 1)])
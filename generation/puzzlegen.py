@@ -2,22 +2,39 @@
 Optionally with some initial words set
 """
 
-import os
 import argparse
+import json
+import os
 import random
-from typing import List, Tuple
+import shutil
+import sys
+from array import array
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from multiprocessing import Pool
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 from tqdm import tqdm
 
 from puzzle import (
+    WordList,
     flatten_puzzle,
-    get_puzzle_dashdot_metrics,
+    load_words,
     puzzle_to_str,
     words_to_puzzle_solved,
 )
 from puzzleyaml import main as yaml_main
+from puzzlecorpus import read_puzzles, wordlist_hash, write_corpus
+from puzzleprofile import Profile, profiled, tracked
 
-WORDLISTS = {"4x4": "words_4-letters.txt", "3x3": "words_3-letters.txt"}
 SAVE_TOS = {"4x4": "puzzles_4x4.txt", "3x3": "puzzles_3x3.txt"}
+BATCH_SIZE = 10000
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+def save_to(rows: str, cols: str) -> str:
+    """File to save rows x cols puzzles to, e.g., "4", "5" -> "puzzles_4x5.txt" """
+    size = f"{rows}x{cols}"
+    return SAVE_TOS.get(size, f"puzzles_{size}.txt")
 
 
 def size_to_num(size: str) -> str:
@@ -25,11 +42,14 @@ def size_to_num(size: str) -> str:
     return size[0]
 
 
-def validate_words(all_words: List[str], words: List[str]) -> Tuple[bool, str]:
+def validate_words(
+    all_words: List[str], words: List[str], size: int = 4
+) -> Tuple[bool, str]:
     """Validate words used in puzzle
 
     Args:
         words (List[str]): List of words
+        size (int, optional): Length the words should be. Defaults to 4.
 
     Returns:
         Tuple[bool, str]: (valid, error)
@@ -37,9 +57,9 @@ def validate_words(all_words: List[str], words: List[str]) -> Tuple[bool, str]:
     # if non-alphanumeric characters
     if any(not word.isalpha() for word in words):
         return False, "All words must be alphabetic"
-    # if not 4 letters
-    if any(len(word) != 4 for word in words):
-        return False, "All words must be exactly 4 letters long"
+    # if not the right length
+    if any(len(word) != size for word in words):
+        return False, f"All words must be exactly {size} letters long"
     # if not all caps
     if any(word != word.upper() for word in words):
         return False, "All words must be all caps"
@@ -70,70 +90,587 @@ def start_end(word1: str, word2: str):
     return word1[0] == word2[-1]
 
 
-def generate(all_words: List[str], repeats: bool = False) -> List[str]:
-    """Puzzle generator
+def index_words(
+    all_words: List[str],
+) -> Tuple[Dict[str, List[str]], Dict[Tuple[str, str], List[str]]]:
+    """Bucket a word list by first letter, and by (first, last) letter
+    Buckets keep the order of the word list
 
     Args:
-        repeats (bool, optional): Allow word repeats. Defaults to False.
+        all_words (List[str]): List of words
 
     Returns:
-        List[str]: List of puzzles
+        Tuple[Dict[str, List[str]], Dict[Tuple[str, str], List[str]]]:
+            (words_by_first, words_by_first_last)
     """
-    puzzles = []
-    for word1 in tqdm(all_words):
-        for word2 in all_words:
-            if not repeats and word2 == word1:
-                continue
-            if not start_start(word1, word2):
+    words_by_first = defaultdict(list)
+    words_by_first_last = defaultdict(list)
+    for word in all_words:
+        words_by_first[word[0]].append(word)
+        words_by_first_last[(word[0], word[-1])].append(word)
+    return words_by_first, words_by_first_last
+
+
+def pin(candidates: List[str], pinned_word: Optional[str]) -> List[str]:
+    """Narrow candidates down to pinned_word, if one is pinned
+    e.g., pin(["BIRD", "BORN"], "BORN") -> ["BORN"]
+          pin(["BIRD", "BORN"], "DOVE") -> []
+          pin(["BIRD", "BORN"], None) -> ["BIRD", "BORN"]
+    """
+    if pinned_word is None:
+        return candidates
+    return [pinned_word] if pinned_word in candidates else []
+
+
+def transpose(puzzle: List[str]) -> List[str]:
+    """The same grid mirrored along its diagonal, i.e., top and left words swapped,
+    and right and bottom words swapped
+    e.g., transpose(["BIRD", "BORN", "DOVE", "NOSE"]) -> ["BORN", "BIRD", "NOSE", "DOVE"]
+    """
+    return [puzzle[1], puzzle[0], puzzle[3], puzzle[2]]
+
+
+def is_canonical(puzzle: List[str]) -> bool:
+    """Whether a (square) puzzle is the one of it and its transpose which is generated
+    with canonical, i.e., it does not come after its transpose
+    e.g., is_canonical(["BIRD", "BORN", "DOVE", "NOSE"]) -> True
+          is_canonical(["BORN", "BIRD", "NOSE", "DOVE"]) -> False
+    """
+    return puzzle <= transpose(puzzle)
+
+
+def puzzles_from_word1(
+    word1: str,
+    words_by_first: Dict[str, List[str]],
+    words_by_first_last: Dict[Tuple[str, str], List[str]],
+    repeats: bool = False,
+    pinned: List[Optional[str]] = None,
+    side_words_by_first: Dict[str, List[str]] = None,
+    counts: Counter = None,
+    canonical: bool = False,
+) -> Iterator[List[str]]:
+    """Yield all puzzles with word1 as the first (top) word
+    Only ever looks at words which already fit the letters chosen so far, i.e.,
+      word2 starts with the first letter of word1
+      word3 starts with the last letter of word1
+      word4 starts with the last letter of word2 and ends with the last letter of word3
+    and, if pinned has words for word2/word3/word4, only looks at those, e.g., with
+    word4 pinned, only word2s ending with its first letter, and word3s with its last
+    word2/word3 come from side_words_by_first if given (e.g., for 4x5 puzzles),
+    else from words_by_first
+    with counts, the candidates examined (and pruned) for each word are counted,
+    e.g., counts["word4_examined"]
+    with canonical, only puzzles which come before their transpose are yielded, i.e.,
+    word2 is not before word1 (see is_canonical), so each grid is only made once
+    """
+    if pinned is None:
+        pinned = [None, None, None, None]
+    if side_words_by_first is None:
+        side_words_by_first = words_by_first
+    word2s = pin(side_words_by_first.get(word1[0], []), pinned[1])
+    word3s = pin(side_words_by_first.get(word1[-1], []), pinned[2])
+    if pinned[3] is not None:
+        word2s = [word2 for word2 in word2s if word2[-1] == pinned[3][0]]
+        word3s = [word3 for word3 in word3s if word3[-1] == pinned[3][-1]]
+    if counts is not None:
+        counts["word2_examined"] += len(word2s)
+    for word2 in word2s:
+        if (not repeats and word2 == word1) or (canonical and word2 < word1):
+            if counts is not None:
+                counts["word2_pruned"] += 1
+            continue
+        # a grid with the same top and left words is canonical if word3 <= word4
+        tie = canonical and word2 == word1
+
+        if counts is not None:
+            counts["word3_examined"] += len(word3s)
+        for word3 in word3s:
+            if not repeats and (word3 == word1 or word3 == word2):
+                if counts is not None:
+                    counts["word3_pruned"] += 1
                 continue
 
-            for word3 in all_words:
-                if not repeats and (word3 == word1 or word3 == word2):
+            word4s = pin(words_by_first_last.get((word2[-1], word3[-1]), []), pinned[3])
+            if counts is not None:
+                counts["word4_examined"] += len(word4s)
+            for word4 in word4s:
+                if not repeats and (word4 == word1 or word4 == word2 or word4 == word3):
+                    if counts is not None:
+                        counts["word4_pruned"] += 1
                     continue
-                if not start_end(word3, word1):
+                if tie and word4 < word3:
                     continue
 
-                for word4 in all_words:
-                    if not repeats and (
-                        word4 == word1 or word4 == word2 or word4 == word3
-                    ):
-                        continue
-                    if not start_end(word4, word2) or not end_end(word4, word3):
-                        continue
+                yield [word1, word2, word3, word4]
+
+
+def puzzles_with_word(
+    word: str,
+    position: int,
+    words_by_first: Dict[str, List[str]],
+    words_by_last: Dict[str, List[str]],
+    words_by_first_last: Dict[Tuple[str, str], List[str]],
+    repeats: bool = False,
+) -> Iterator[List[str]]:
+    """Yield all (square) puzzles with word at position (0 top, 1 left, 2 right,
+    3 bottom), only looking at words which fit it, e.g., for the bottom word,
+      word2 ends with its first letter, word3 ends with its last letter
+      word1 starts with the first letter of word2 and ends with the first of word3
+    so the puzzles with one word (e.g., one added to the word list) can be made
+    without generating all of them. Puzzles are not in generation order
+    """
+    if position == 0:
+        yield from puzzles_from_word1(word, words_by_first, words_by_first_last, repeats)
+        return
+    if position == 1:
+        candidates = (
+            [word1, word, word3, word4]
+            for word1 in words_by_first.get(word[0], [])
+            for word3 in words_by_first.get(word1[-1], [])
+            for word4 in words_by_first_last.get((word[-1], word3[-1]), [])
+        )
+    elif position == 2:
+        candidates = (
+            [word1, word2, word, word4]
+            for word1 in words_by_last.get(word[0], [])
+            for word2 in words_by_first.get(word1[0], [])
+            for word4 in words_by_first_last.get((word2[-1], word[-1]), [])
+        )
+    else:
+        candidates = (
+            [word1, word2, word3, word]
+            for word2 in words_by_last.get(word[0], [])
+            for word3 in words_by_last.get(word[-1], [])
+            for word1 in words_by_first_last.get((word2[0], word3[0]), [])
+        )
+    for puzzle in candidates:
+        if repeats or len(set(puzzle)) == 4:
+            yield puzzle
+
+
+# state for generation worker processes, set once per process by _init_shard_worker
+_shard_state = {}
+
+
+def _init_shard_worker(
+    all_words: List[str],
+    repeats: bool,
+    pinned: List[Optional[str]],
+    side_words: List[str],
+    count: bool = False,
+    canonical: bool = False,
+):
+    """Build the word buckets once in each worker process"""
+    _shard_state["all_words"] = all_words
+    _shard_state["word_ids"] = {word: i for i, word in enumerate(all_words)}
+    _shard_state["side_word_ids"] = {word: i for i, word in enumerate(side_words)}
+    _shard_state["index"] = index_words(all_words)
+    _shard_state["side_index"] = index_words(side_words)[0]
+    _shard_state["repeats"] = repeats
+    _shard_state["pinned"] = pinned
+    _shard_state["count"] = count
+    _shard_state["canonical"] = canonical
+
+
+def _generate_shard(word1_id: int) -> Tuple[array, Dict[str, int]]:
+    """Generate all puzzles for one word1, as a flat array of (word2, word3, word4) ids,
+    word2 and word3 in the side words, word4 in all words,
+    and the candidates counted (if counting, see puzzles_from_word1)
+    """
+    word_ids = _shard_state["word_ids"]
+    side_word_ids = _shard_state["side_word_ids"]
+    counts = Counter() if _shard_state["count"] else None
+    batch = array("I")
+    for puzzle in puzzles_from_word1(
+        _shard_state["all_words"][word1_id],
+        *_shard_state["index"],
+        _shard_state["repeats"],
+        _shard_state["pinned"],
+        _shard_state["side_index"],
+        counts,
+        _shard_state["canonical"],
+    ):
+        batch.extend(
+            [side_word_ids[puzzle[1]], side_word_ids[puzzle[2]], word_ids[puzzle[3]]]
+        )
+    return batch, dict(counts or {})
+
+
+def iter_puzzles(
+    all_words: List[str],
+    repeats: bool = False,
+    jobs: int = 1,
+    pinned: List[Optional[str]] = None,
+    side_words: List[str] = None,
+    counts: Counter = None,
+    start: int = 0,
+    canonical: bool = False,
+) -> Iterator[List[str]]:
+    """Puzzle generator, yielding puzzles one at a time so the corpus is never held in memory
+    With jobs > 1, each word1 is a shard generated by a pool of worker processes,
+    and shards are yielded in word list order, so the output is the same as with one job
+    Puzzles come in word1 order, so all of a word1's puzzles are done once the next starts
+
+    Args:
+        repeats (bool, optional): Allow word repeats. Defaults to False.
+        jobs (int, optional): Number of worker processes. Defaults to 1.
+        pinned (List[Optional[str]], optional): Words to fix as
+            [word1, word2, word3, word4], None for any word. Defaults to None.
+        side_words (List[str], optional): Words for the left and right (word2, word3),
+            e.g., 4-letter words for 4x5 puzzles. Defaults to all_words.
+        counts (Counter, optional): Count the candidates examined and pruned for each
+            word in, see puzzles_from_word1. Defaults to None.
+        start (int, optional): Index in all_words of the first word1,
+            e.g., to resume. Defaults to 0.
+        canonical (bool, optional): Only generate one of each puzzle and its
+            transpose (for square puzzles), see is_canonical. Defaults to False.
+
+    Yields:
+        List[str]: puzzle, as four words
+    """
+    if pinned is None:
+        pinned = [None, None, None, None]
+    if side_words is None:
+        side_words = all_words
+    if canonical and side_words != all_words:
+        raise ValueError("Only square puzzles have transposes to leave out")
+    # only word1s which fit the pinned words can start a puzzle, e.g., with word4
+    # pinned, word1 starts like a word2 ending with its first letter
+    firsts = lasts = None
+    if pinned[3] is not None:
+        firsts = {word[0] for word in side_words if word[-1] == pinned[3][0]}
+        lasts = {word[0] for word in side_words if word[-1] == pinned[3][-1]}
+    word1_ids = [
+        i
+        for i, word1 in enumerate(all_words[start:], start)
+        if (pinned[0] is None or word1 == pinned[0])
+        and (pinned[1] is None or word1[0] == pinned[1][0])
+        and (pinned[2] is None or word1[-1] == pinned[2][0])
+        and (firsts is None or (word1[0] in firsts and word1[-1] in lasts))
+    ]
+    if counts is not None:
+        counts["word1_examined"] += len(all_words) - start
+        counts["word1_pruned"] += len(all_words) - start - len(word1_ids)
+
+    if jobs <= 1:
+        words_by_first, words_by_first_last = index_words(all_words)
+        side_words_by_first = index_words(side_words)[0]
+        for word1_id in tqdm(word1_ids):
+            yield from puzzles_from_word1(
+                all_words[word1_id],
+                words_by_first,
+                words_by_first_last,
+                repeats,
+                pinned,
+                side_words_by_first,
+                counts,
+                canonical,
+            )
+        return
+
+    with Pool(
+        jobs,
+        _init_shard_worker,
+        (all_words, repeats, pinned, side_words, counts is not None, canonical),
+    ) as pool:
+        shards = pool.imap(_generate_shard, word1_ids, chunksize=4)
+        for word1_id, (batch, shard_counts) in zip(
+            word1_ids, tqdm(shards, total=len(word1_ids))
+        ):
+            if counts is not None:
+                counts.update(shard_counts)
+            word1 = all_words[word1_id]
+            for i in range(0, len(batch), 3):
+                yield [
+                    word1,
+                    side_words[batch[i]],
+                    side_words[batch[i + 1]],
+                    all_words[batch[i + 2]],
+                ]
+
+
+def generate(
+    all_words: List[str],
+    repeats: bool = False,
+    jobs: int = 1,
+    pinned: List[Optional[str]] = None,
+    side_words: List[str] = None,
+    canonical: bool = False,
+) -> List[str]:
+    """Puzzle generator, see iter_puzzles
+
+    Args:
+        repeats (bool, optional): Allow word repeats. Defaults to False.
+        jobs (int, optional): Number of worker processes. Defaults to 1.
+        pinned (List[Optional[str]], optional): Words to fix as
+            [word1, word2, word3, word4], None for any word. Defaults to None.
+        side_words (List[str], optional): Words for the left and right (word2, word3).
+            Defaults to all_words.
+        canonical (bool, optional): Only generate one of each puzzle and its
+            transpose. Defaults to False.
+
+    Returns:
+        List[str]: List of puzzles
+    """
+    return list(
+        iter_puzzles(
+            all_words, repeats, jobs, pinned, side_words, canonical=canonical
+        )
+    )
 
-                    puzzles.append([word1, word2, word3, word4])
-    return puzzles
+
+def reservoir_sample(
+    puzzles: Iterable[List[str]], sample: List[List[str]], k: int
+) -> Iterator[List[str]]:
+    """Pass puzzles through unchanged, keeping a uniformly random sample of k of them
+    in sample (reservoir sampling), so a stream can be sampled without a list of it
+    """
+    for i, puzzle in enumerate(puzzles):
+        if i < k:
+            sample.append(puzzle)
+        else:
+            j = random.randint(0, i)
+            if j < k:
+                sample[j] = puzzle
+        yield puzzle
+
+
+def write_puzzles(
+    puzzles: Iterable[List[str]], save_fname: str, batch_size: int = BATCH_SIZE
+) -> int:
+    """Write puzzles to a file as comma-separated words, one puzzle per line,
+    in batches of batch_size lines
+
+    Returns:
+        int: number of puzzles written
+    """
+    n_puzzles = 0
+    with open(save_fname, "w", encoding="utf-8") as f:
+        batch = []
+        for puzzle in puzzles:
+            batch.append(f"{','.join(puzzle)}\n")
+            if len(batch) >= batch_size:
+                f.writelines(batch)
+                n_puzzles += len(batch)
+                batch = []
+        f.writelines(batch)
+        n_puzzles += len(batch)
+    return n_puzzles
+
+
+class Checkpoint:
+    """Puzzles generated so far, saved next to the output after each word1 (shard),
+    so a run which is stopped can be resumed, losing only the word1 it was on
+    e.g., for puzzles_4x4.txt, in puzzles_4x4.txt.checkpoint/
+      puzzles.txt     puzzles of the word1s done, as comma-separated words
+      manifest.json   {"inputs": {...}, "start": 132, "offset": 4981536, "puzzles": 237,
+                       "complete": false}
+    where start is the index of the next word1 to generate, offset the length of
+    puzzles.txt up to it, and inputs the word lists (as hashes) and parameters,
+    which must be the same to resume
+    e.g.,
+      checkpoint = Checkpoint("puzzles_4x4.txt", inputs)
+      puzzles = iter_puzzles(all_words, start=checkpoint.start)
+      checkpoint.write(puzzles, word_ids)
+      checkpoint.finish()  # moves puzzles.txt to puzzles_4x4.txt
+    """
+
+    def __init__(self, save_fname: str, inputs: Dict):
+        self.save_fname = save_fname
+        self.dir = save_fname + CHECKPOINT_SUFFIX
+        self.manifest_fname = os.path.join(self.dir, "manifest.json")
+        self.parts_fname = os.path.join(self.dir, "puzzles.txt")
+        self.inputs = inputs
+        self.state = {"start": 0, "offset": 0, "puzzles": 0, "complete": False}
+        if os.path.exists(self.manifest_fname):
+            with open(self.manifest_fname, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.pop("inputs") == inputs:
+                self.state = manifest
+            else:
+                print(
+                    f"Starting again, {self.dir} is for other inputs", file=sys.stderr
+                )
+
+    @property
+    def start(self) -> int:
+        """Index of the next word1 to generate"""
+        return self.state["start"]
+
+    def _save(self):
+        """Save the manifest, replacing the old one all at once"""
+        tmp_fname = f"{self.manifest_fname}.tmp"
+        with open(tmp_fname, "w", encoding="utf-8") as f:
+            json.dump({"inputs": self.inputs, **self.state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_fname, self.manifest_fname)
+
+    def write(
+        self,
+        puzzles: Iterable[List[str]],
+        word_ids: Dict[str, int],
+        batch_size: int = BATCH_SIZE,
+    ) -> int:
+        """Add puzzles (from word1 self.start onwards) to the checkpoint,
+        saving it after each word1, and once all are written
+
+        Args:
+            word_ids (Dict[str, int]): index of each word1 in the word list
+
+        Returns:
+            int: number of puzzles in the checkpoint
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        with open(self.parts_fname, "ab") as f:
+            # anything after the last word1 done is from one not finished
+            f.truncate(self.state["offset"])
+            batch = []
+            n_puzzles = 0
+            word1 = None
+            for puzzle in puzzles:
+                if puzzle[0] != word1:
+                    if word1 is not None:
+                        self._done(f, batch, n_puzzles, word_ids[word1] + 1)
+                        n_puzzles = 0
+                    word1 = puzzle[0]
+                batch.append(f"{','.join(puzzle)}\n")
+                n_puzzles += 1
+                if len(batch) >= batch_size:
+                    f.write("".join(batch).encode("utf-8"))
+                    batch.clear()
+            self._done(f, batch, n_puzzles, len(word_ids))
+        self.state["complete"] = True
+        self._save()
+        return self.state["puzzles"]
+
+    def _done(self, f: BinaryIO, batch: List[str], n_puzzles: int, start: int):
+        """Save the checkpoint, with every word1 before start done"""
+        f.write("".join(batch).encode("utf-8"))
+        batch.clear()
+        f.flush()
+        os.fsync(f.fileno())
+        self.state["start"] = start
+        self.state["offset"] = f.tell()
+        self.state["puzzles"] += n_puzzles
+        self._save()
+
+    def finish(self, all_words: List[str] = None, metadata: Dict = None):
+        """Move the puzzles to save_fname (or, if it ends in .bin, write them there
+        as a binary corpus of all_words), and remove the checkpoint
+        """
+        if self.save_fname.endswith(".bin"):
+            puzzles = read_puzzles(self.parts_fname)
+            write_corpus(puzzles, self.save_fname, all_words, metadata)
+        else:
+            os.replace(self.parts_fname, self.save_fname)
+        shutil.rmtree(self.dir)
 
 
 def main(
     size: str = "4",
     words: List[str] = None,
     verbose: bool = False,
+    jobs: int = 1,
+    output: str = None,
+    cols: str = None,
+    profile: Profile = None,
+    checkpoint: bool = True,
+    transposes: bool = False,
 ):
-    """main"""
+    """main
+    puzzles are size x cols (square if cols is not given), i.e., the top and bottom words
+    are cols letters long, and the left and right words size letters long
+    puzzles are saved to output (by default SAVE_TOS), as a binary corpus if it ends in .bin
+    with checkpoint, puzzles are saved after each word1, and a run with the same inputs
+    resumes from there, see Checkpoint
+    with profile, each stage (load, generate, write) is profiled, and candidates counted
+    square puzzles are saved without their transposes (see is_canonical), unless
+    transposes, or some words are fixed
+    """
     if words is None:
         words = [None, None, None, None]
+    if cols is None:
+        cols = size
     if verbose:
         print(f"Words: {words}")
 
-    fname = WORDLISTS[f"{size}x{size}"]
-    with open(os.path.join(os.path.dirname(__file__), fname), encoding="utf-8") as f:
-        all_words = f.read().splitlines()
-        all_words = [word.upper() for word in all_words]
-
-    valid, error = validate_words(all_words, [w for w in words if w])
-    if not valid:
-        raise ValueError(error)
-
-    puzzles = generate(all_words)
+    with profiled(profile, "load"):
+        all_words = load_words(cols)
+        side_words = load_words(size) if cols != size else all_words
+
+        for pinned, word_list, length in [
+            ([words[0], words[3]], all_words, cols),
+            ([words[1], words[2]], side_words, size),
+        ]:
+            valid, error = validate_words(
+                word_list, [w for w in pinned if w], int(length)
+            )
+            if not valid:
+                raise ValueError(error)
+
+    save_fname = None
+    if not any(words):
+        save_fname = output or save_to(size, cols)
+        if save_fname.endswith(".bin") and cols != size:
+            raise ValueError("Binary corpora are only for square puzzles")
+    canonical = not transposes and not any(words) and cols == size
+    if save_fname and checkpoint:
+        checkpoint = Checkpoint(
+            save_fname,
+            {
+                "words": wordlist_hash(all_words).hex(),
+                "side-words": wordlist_hash(side_words).hex(),
+                "rows": size,
+                "cols": cols,
+                "repeats": False,
+                "canonical": canonical,
+            },
+        )
+    else:
+        checkpoint = None
+
+    counts = None if profile is None else profile.counts
+    puzzles = iter_puzzles(
+        all_words,
+        jobs=jobs,
+        pinned=words,
+        side_words=side_words,
+        counts=counts,
+        start=checkpoint.start if checkpoint else 0,
+        canonical=canonical,
+    )
+    puzzles = tracked(profile, puzzles, "generate", "puzzles")
+    sample = []
+    if verbose:
+        puzzles = reservoir_sample(puzzles, sample, 4)
+
+    with profiled(profile, "write"):
+        if any(words):
+            # only some puzzles, so print them rather than overwrite the full list
+            n_puzzles = 0
+            for puzzle in puzzles:
+                print(",".join(puzzle))
+                n_puzzles += 1
+        elif checkpoint:
+            word_ids = {word: i for i, word in enumerate(all_words)}
+            n_puzzles = checkpoint.write(puzzles, word_ids)
+            checkpoint.finish(all_words, {"size": f"{size}x{size}"})
+        elif save_fname.endswith(".bin"):
+            n_puzzles = write_corpus(
+                puzzles, save_fname, all_words, {"size": f"{size}x{size}"}
+            )
+        else:
+            # save as "flatten_puzzle" to SAVE_TO
+            n_puzzles = write_puzzles(puzzles, save_fname)
 
     if verbose:
-        print(f"Generated {len(puzzles)} puzzles")
+        print(f"Generated {n_puzzles} puzzles")
         # print three random puzzles, one with morse
-        for i in range(4):
-            puzzle = random.choice(puzzles)
+        wordlist = WordList(all_words + side_words if cols != size else all_words)
+        for i, puzzle in enumerate(sample):
             pz = words_to_puzzle_solved(puzzle)
-            metrics = get_puzzle_dashdot_metrics(pz)
+            metrics = wordlist.get_metrics(puzzle)
             if i < 2:
                 print(puzzle_to_str(pz))
                 print()
@@ -141,24 +678,24 @@ def main(
                 print(puzzle_to_str(pz, metrics=metrics))
                 print()
             elif i < 4:
-                reveal = [random.randint(0, 11) for _ in range(4)]
-                yaml = yaml_main(puzzle, reveal)
+                n_letters = len(flatten_puzzle(pz))
+                reveal = [random.randint(0, n_letters - 1) for _ in range(4)]
+                yaml = yaml_main(puzzle, reveal, wordlist=wordlist)
                 print(yaml)
 
-    # save as "flatten_puzzle" to SAVE_TO
-    save_fname = SAVE_TOS[f"{size}x{size}"]
-    with open(save_fname, "w", encoding="utf-8") as f:
-        for puzzle in puzzles:
-            f.write(f"{','.join(puzzle)}\n")
-
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "-n",
-        help="Dimension of puzzle, either 3 or 4",
+        help="Dimension of puzzle (rows, and the length of the left/right words)",
         default="4",
     )
+    parser.add_argument(
+        "-c",
+        "--cols",
+        help="Columns of puzzle (the length of the top/bottom words), if not square",
+    )
     parser.add_argument(
         "-w1",
         "--word1",
@@ -185,5 +722,51 @@ if __name__ == "__main__":
         action="store_true",
         help="Print verbose output",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes to generate with",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to save puzzles to, a binary corpus if it ends in .bin",
+    )
+    parser.add_argument(
+        "--transposes",
+        action="store_true",
+        help="Also save each square puzzle's transpose (mirrored along its diagonal)",
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        action="store_false",
+        dest="checkpoint",
+        help="Don't save puzzles after each first word (to resume from if stopped)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print progress, and the time and memory of each stage, as JSON to stderr",
+    )
+    parser.add_argument(
+        "--cprofile",
+        help="File to save cProfile stats to (implies --profile)",
+    )
     args = parser.parse_args()
-    main(args.n, [args.word1, args.word2, args.word3, args.word4], args.verbose)
+    profile = None
+    if args.profile or args.cprofile:
+        profile = Profile(cprofile_fname=args.cprofile)
+    with profile or nullcontext():
+        main(
+            args.n,
+            [args.word1, args.word2, args.word3, args.word4],
+            args.verbose,
+            args.jobs,
+            args.output,
+            args.cols,
+            profile,
+            args.checkpoint,
+            args.transposes,
+        )
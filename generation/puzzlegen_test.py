@@ -0,0 +1,294 @@
+"""Tests for puzzlegen.py"""
+
+import os
+import tempfile
+import unittest
+from collections import Counter
+from itertools import islice
+from puzzlegen import (
+    Checkpoint,
+    end_end,
+    generate,
+    index_words,
+    is_canonical,
+    iter_puzzles,
+    puzzles_with_word,
+    reservoir_sample,
+    start_end,
+    start_start,
+    transpose,
+    validate_words,
+    write_puzzles,
+)
+
+
+def generate_slow(all_words, repeats=False):
+    """The original four-nested-loop generator, to check generate against"""
+    puzzles = []
+    for word1 in all_words:
+        for word2 in all_words:
+            if not repeats and word2 == word1:
+                continue
+            if not start_start(word1, word2):
+                continue
+            for word3 in all_words:
+                if not repeats and word3 in (word1, word2):
+                    continue
+                if not start_end(word3, word1):
+                    continue
+                for word4 in all_words:
+                    if not repeats and word4 in (word1, word2, word3):
+                        continue
+                    if not start_end(word4, word2) or not end_end(word4, word3):
+                        continue
+                    puzzles.append([word1, word2, word3, word4])
+    return puzzles
+
+
+class TestGenerate(unittest.TestCase):
+    """Tests for puzzle generation"""
+
+    words_4 = [
+        "BIRD", "BORN", "DOVE", "NOSE", "BEAN", "BARE", "DEAN", "NEED",
+        "DOOR", "RIDE", "EASE", "NAME", "BEND", "DARE", "EDGE", "BOND",
+    ]  # fmt: skip
+    words_3 = [
+        "HIT", "HUM", "TOP", "MAP", "HAT", "TIP", "MOP", "HOP",
+        "PAT", "TAP", "PIT", "HAM", "MUM", "PUP", "TOT", "AIM",
+    ]  # fmt: skip
+
+    def test_generate_same_as_slow(self):
+        """generate should give the same puzzles, in the same order, as the slow generator"""
+        for words in [self.words_4, self.words_3]:
+            for repeats in [False, True]:
+                with self.subTest(words=words, repeats=repeats):
+                    expected = generate_slow(words, repeats)
+
+                    puzzles = generate(words, repeats)
+
+                    self.assertEqual(puzzles, expected)
+
+    def test_generate_jobs_same_order(self):
+        """generate with a process pool should give the same puzzles in the same order"""
+        for words in [self.words_4, self.words_3]:
+            with self.subTest(words=words):
+                expected = generate(words)
+
+                puzzles = generate(words, jobs=2)
+
+                self.assertEqual(puzzles, expected)
+
+    def test_generate_rectangles(self):
+        """generate with side words should give the same puzzles as the slow generator,
+        with only side words on the left and right"""
+        side_words = ["BAN", "BED", "BEN", "DEN", "DOE", "DON", "DYE", "NOD", "RED"]
+        expected = [
+            puzzle
+            for puzzle in generate_slow(self.words_4 + side_words)
+            if [len(word) for word in puzzle] == [4, 3, 3, 4]
+        ]
+
+        puzzles = generate(self.words_4, side_words=side_words)
+        puzzles_jobs = generate(self.words_4, jobs=2, side_words=side_words)
+
+        self.assertTrue(expected)
+        self.assertEqual(puzzles, expected)
+        self.assertEqual(puzzles_jobs, expected)
+
+    def test_generate_contains_example(self):
+        """generate should find the example puzzle"""
+        puzzles = generate(self.words_4)
+
+        self.assertIn(["BIRD", "BORN", "DOVE", "NOSE"], puzzles)
+
+    def test_no_repeats(self):
+        """generate should not repeat words unless asked to"""
+        puzzles = generate(self.words_4)
+
+        for puzzle in puzzles:
+            self.assertEqual(len(set(puzzle)), 4)
+
+    def test_canonical(self):
+        """generate with canonical should give the puzzles which come before their
+        transpose, in the same order, and their transposes should give back the rest"""
+        for repeats in [False, True]:
+            for jobs in [1, 2]:
+                with self.subTest(repeats=repeats, jobs=jobs):
+                    expected = generate(self.words_4, repeats)
+
+                    puzzles = generate(self.words_4, repeats, jobs, canonical=True)
+
+                    self.assertEqual(puzzles, [p for p in expected if is_canonical(p)])
+                    self.assertLess(len(puzzles), len(expected))
+                    self.assertCountEqual(
+                        set(map(tuple, puzzles + [transpose(p) for p in puzzles])),
+                        set(map(tuple, expected)),
+                    )
+
+    def test_canonical_square_only(self):
+        """rectangles have no transposes in the same list to leave out"""
+        with self.assertRaises(ValueError):
+            generate(self.words_4, side_words=["BAN", "BED"], canonical=True)
+
+
+class TestPinnedWords(unittest.TestCase):
+    """Tests for generating puzzles with some words fixed"""
+
+    def test_pinned_same_as_filtered(self):
+        """generate with pinned words should give only the puzzles with those words"""
+        for words, pinned in [
+            (TestGenerate.words_4, ["BIRD", None, None, None]),
+            (TestGenerate.words_4, [None, "BORN", None, None]),
+            (TestGenerate.words_4, [None, None, "DOVE", None]),
+            (TestGenerate.words_4, [None, "BORN", None, "NOSE"]),
+            (TestGenerate.words_4, [None, None, None, "NOSE"]),
+            (TestGenerate.words_4, ["BIRD", "BORN", "DOVE", "NOSE"]),
+            (TestGenerate.words_3, [None, None, None, "MAP"]),
+            (TestGenerate.words_3, ["HIT", None, "TOP", None]),
+        ]:
+            with self.subTest(pinned=pinned):
+                expected = [
+                    puzzle
+                    for puzzle in generate(words)
+                    if all(pin in (None, word) for pin, word in zip(pinned, puzzle))
+                ]
+
+                puzzles = generate(words, pinned=pinned)
+                puzzles_jobs = generate(words, jobs=2, pinned=pinned)
+
+                self.assertTrue(expected)
+                self.assertEqual(puzzles, expected)
+                self.assertEqual(puzzles_jobs, expected)
+
+    def test_pinned_bottom_word(self):
+        """pinning only the bottom word should only look at words which fit it"""
+        pinned_counts, counts = Counter(), Counter()
+
+        list(iter_puzzles(TestGenerate.words_4, counts=counts))
+        list(
+            iter_puzzles(
+                TestGenerate.words_4,
+                pinned=[None, None, None, "NOSE"],
+                counts=pinned_counts,
+            )
+        )
+
+        for word in ["word2", "word3", "word4"]:
+            self.assertLess(
+                pinned_counts[f"{word}_examined"], counts[f"{word}_examined"]
+            )
+
+    def test_pinned_impossible(self):
+        """generate with pinned words which can not make a puzzle should give nothing"""
+        puzzles = generate(TestGenerate.words_4, pinned=["BIRD", "DOVE", None, None])
+
+        self.assertEqual(puzzles, [])
+
+    def test_validate_words_size(self):
+        """validate_words should check words are the length of the puzzle size"""
+        self.assertTrue(validate_words(["HIT", "HUM"], ["HIT"], 3)[0])
+        self.assertFalse(validate_words(["HIT", "HUM"], ["HIT"], 4)[0])
+        self.assertTrue(validate_words(["BIRD", "BORN"], ["BIRD"])[0])
+
+
+class TestStreaming(unittest.TestCase):
+    """Tests for generating and writing puzzles as a stream"""
+
+    words = TestGenerate.words_4
+
+    def test_iter_puzzles_is_lazy(self):
+        """iter_puzzles should yield the same puzzles as generate, one at a time"""
+        puzzles = iter_puzzles(self.words)
+
+        self.assertEqual(next(puzzles), generate(self.words)[0])
+        self.assertEqual([next(puzzles)] + list(puzzles), generate(self.words)[1:])
+
+    def test_reservoir_sample(self):
+        """reservoir_sample should pass puzzles through and keep k of them"""
+        puzzles = generate(self.words)
+        sample = []
+
+        passed = list(reservoir_sample(iter(puzzles), sample, 4))
+
+        self.assertEqual(passed, puzzles)
+        self.assertEqual(len(sample), 4)
+        for puzzle in sample:
+            self.assertIn(puzzle, puzzles)
+
+    def test_write_puzzles(self):
+        """write_puzzles should write one comma-separated puzzle per line, in batches"""
+        puzzles = generate(self.words)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "puzzles.txt")
+
+            n_puzzles = write_puzzles(iter(puzzles), fname, batch_size=7)
+
+            with open(fname, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        self.assertEqual(n_puzzles, len(puzzles))
+        self.assertEqual([line.split(",") for line in lines], puzzles)
+
+    def test_checkpoint_resume(self):
+        """a run stopped part way should resume from the last word1 done,
+        and give the same puzzles as one which was never stopped"""
+        puzzles = generate(self.words)
+        word_ids = {word: i for i, word in enumerate(self.words)}
+        inputs = {"words": "abc"}
+
+        def stopped(puzzles, n):
+            yield from islice(puzzles, n)
+            raise KeyboardInterrupt
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "puzzles.txt")
+            checkpoint = Checkpoint(fname, inputs)
+            with self.assertRaises(KeyboardInterrupt):
+                checkpoint.write(stopped(iter_puzzles(self.words), 20), word_ids, 7)
+
+            resumed = Checkpoint(fname, inputs)
+            self.assertGreater(resumed.start, 0)
+            self.assertLess(resumed.state["puzzles"], 20)
+            n_puzzles = resumed.write(
+                iter_puzzles(self.words, start=resumed.start), word_ids
+            )
+            resumed.finish()
+
+            with open(fname, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertFalse(os.path.exists(resumed.dir))
+        self.assertEqual(n_puzzles, len(puzzles))
+        self.assertEqual([line.split(",") for line in lines], puzzles)
+
+    def test_checkpoint_other_inputs(self):
+        """a checkpoint for other inputs should not be resumed from"""
+        word_ids = {word: i for i, word in enumerate(self.words)}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "puzzles.txt")
+            Checkpoint(fname, {"words": "abc"}).write(
+                islice(iter_puzzles(self.words), 20), word_ids
+            )
+
+            self.assertGreater(Checkpoint(fname, {"words": "abc"}).start, 0)
+            self.assertEqual(Checkpoint(fname, {"words": "xyz"}).start, 0)
+
+    def test_puzzles_with_word(self):
+        """puzzles_with_word should give the puzzles with a word at a position"""
+        puzzles = generate(self.words)
+        words_by_first, words_by_first_last = index_words(self.words)
+        words_by_last = {}
+        for word in self.words:
+            words_by_last.setdefault(word[-1], []).append(word)
+
+        for word in self.words:
+            for position in range(4):
+                with self.subTest(word=word, position=position):
+                    self.assertCountEqual(
+                        puzzles_with_word(
+                            word,
+                            position,
+                            words_by_first,
+                            words_by_last,
+                            words_by_first_last,
+                        ),
+                        [puzzle for puzzle in puzzles if puzzle[position] == word],
+                    )
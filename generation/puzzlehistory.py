@@ -0,0 +1,325 @@
+"""Every puzzle that has run, kept in an append-only SQLite database, e.g.,
+  python puzzlehistory.py add -d 2024-06-01 -i ../current.txt -r auto
+records the puzzles in current.txt (one per line, like puzzleyaml.py's input) as run on
+2024-06-01, with their words, the letters revealed, and their puzzle code (see
+puzzlecodec.py). Puzzles are never changed or deleted, only added, so the history is
+in the order puzzles ran, and archive pages made from it never change once full (see
+puzzleyaml.write_archive). There are indexes on date, puzzle code, each word, and grid
+(a puzzle or its transpose), so checking whether a pick has run before, e.g.,
+  python puzzlehistory.py check -w BIRD BORN DOVE NOSE
+is one index lookup, however many years of puzzles there are
+Puzzles whose day is over are made into archive pages for the website, e.g.,
+  python puzzlehistory.py archive -o ../website/_data/archive
+(see puzzleyaml.write_archive), leaving out puzzles from today on, so no answer to a
+puzzle still being played is published
+"""
+
+import argparse
+import datetime
+import sqlite3
+import sys
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from puzzlecodec import encode_puzzle
+from puzzlegen import transpose
+from puzzlesolve import minimal_reveals
+from puzzleyaml import (
+    AUTO_REVEAL,
+    PAGE_SIZE,
+    parse_reveal,
+    print_timings,
+    read_jobs,
+    write_archive,
+)
+
+HISTORY_FILE = "history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    words TEXT NOT NULL,
+    reveal TEXT NOT NULL,
+    code TEXT NOT NULL,
+    grid TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS puzzles_date_words ON puzzles (date, words);
+CREATE INDEX IF NOT EXISTS puzzles_code ON puzzles (code);
+CREATE INDEX IF NOT EXISTS puzzles_grid ON puzzles (grid);
+CREATE TABLE IF NOT EXISTS puzzle_words (
+    word TEXT NOT NULL,
+    puzzle INTEGER NOT NULL REFERENCES puzzles (id),
+    PRIMARY KEY (word, puzzle)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS puzzles_no_update BEFORE UPDATE ON puzzles
+BEGIN SELECT RAISE(ABORT, 'puzzle history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS puzzles_no_delete BEFORE DELETE ON puzzles
+BEGIN SELECT RAISE(ABORT, 'puzzle history is append-only'); END;
+"""
+COLUMNS = "id, date, words, reveal, code"
+
+
+def grid_key(words: List[str]) -> str:
+    """The same key for a puzzle and its transpose (the same grid), e.g.,
+    grid_key(["BORN", "BIRD", "NOSE", "DOVE"]) -> "BIRD,BORN,DOVE,NOSE"
+    """
+    return ",".join(min(list(words), transpose(words)))
+
+
+def _row_dict(row: Tuple) -> Dict:
+    """A puzzles row as {"id", "date", "words", "reveal", "code"}"""
+    puzzle_id, date, words, reveal, code = row
+    return {
+        "id": puzzle_id,
+        "date": date,
+        "words": words.split(","),
+        "reveal": [int(i) for i in reveal.split()],
+        "code": code,
+    }
+
+
+class History:
+    """Append-only history of the puzzles that have run
+    e.g.,
+      with History("history.db") as history:
+          history.add("2024-06-01", ["BIRD", "BORN", "DOVE", "NOSE"], [1, 12])
+          history.has_run(["BORN", "BIRD", "NOSE", "DOVE"]) -> True
+    """
+
+    def __init__(self, fname: str = HISTORY_FILE):
+        self.fname = fname
+        self._db = sqlite3.connect(fname)
+        self._db.executescript(SCHEMA)
+
+    def add(self, date: str, words: List[str], reveal: List[int]) -> bool:
+        """Record a puzzle as run on date (an ISO date), with reveal revealed
+
+        Returns:
+            bool: whether it was added, i.e., it was not already recorded on date
+        """
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO puzzles (date, words, reveal, code, grid) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    date,
+                    ",".join(words),
+                    " ".join(map(str, reveal)),
+                    encode_puzzle(words, reveal),
+                    grid_key(words),
+                ),
+            )
+            if not cursor.rowcount:
+                return False
+            self._db.executemany(
+                "INSERT OR IGNORE INTO puzzle_words (word, puzzle) VALUES (?, ?)",
+                [(word, cursor.lastrowid) for word in words],
+            )
+        return True
+
+    def has_run(self, words: List[str]) -> bool:
+        """Whether a puzzle (or its transpose) has run"""
+        return (
+            self._db.execute(
+                "SELECT 1 FROM puzzles WHERE grid = ? LIMIT 1", (grid_key(words),)
+            ).fetchone()
+            is not None
+        )
+
+    def on_date(self, date: str) -> List[Dict]:
+        """The puzzles which ran on date"""
+        rows = self._db.execute(
+            f"SELECT {COLUMNS} FROM puzzles WHERE date = ? ORDER BY id", (date,)
+        )
+        return [_row_dict(row) for row in rows]
+
+    def with_word(self, word: str) -> List[Dict]:
+        """The puzzles with word in them, in the order they ran"""
+        rows = self._db.execute(
+            f"SELECT {COLUMNS} FROM puzzles WHERE id IN "
+            "(SELECT puzzle FROM puzzle_words WHERE word = ?) ORDER BY id",
+            (word,),
+        )
+        return [_row_dict(row) for row in rows]
+
+    def with_code(self, code: str) -> List[Dict]:
+        """The puzzles with a puzzle code (the same clues)"""
+        rows = self._db.execute(
+            f"SELECT {COLUMNS} FROM puzzles WHERE code = ? ORDER BY id", (code,)
+        )
+        return [_row_dict(row) for row in rows]
+
+    def last_used(self, words: Iterable[str]) -> Dict[str, str]:
+        """The last date each of words ran, for those which have"""
+        words = list(words)
+        rows = self._db.execute(
+            "SELECT puzzle_words.word, MAX(puzzles.date) FROM puzzle_words "
+            "JOIN puzzles ON puzzles.id = puzzle_words.puzzle "
+            f"WHERE puzzle_words.word IN ({','.join('?' * len(words))}) "
+            "GROUP BY puzzle_words.word",
+            words,
+        )
+        return dict(rows)
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    def n_before(self, date: str) -> int:
+        """How many puzzles ran before the first on or after date (an ISO date)"""
+        first = self._db.execute(
+            "SELECT MIN(id) FROM puzzles WHERE date >= ?", (date,)
+        ).fetchone()[0]
+        return len(self) if first is None else first - 1
+
+    def puzzles(self, start: int, stop: int) -> List[Dict]:
+        """The start-th to (stop - 1)-th puzzles to run
+        (ids are 1, 2, 3, ..., as nothing is ever deleted)
+        """
+        rows = self._db.execute(
+            f"SELECT {COLUMNS} FROM puzzles WHERE id > ? AND id <= ? ORDER BY id",
+            (start, stop),
+        )
+        return [_row_dict(row) for row in rows]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in self._db.execute(f"SELECT {COLUMNS} FROM puzzles ORDER BY id"):
+            yield _row_dict(row)
+
+    def close(self):
+        """Close the database"""
+        self._db.close()
+
+    def __enter__(self) -> "History":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main_add(
+    fname: str,
+    date: str,
+    jobs: List[Tuple[List[str], List[int]]],
+) -> int:
+    """add each (words, reveal) of jobs to the history in fname as run on date,
+    revealing as few letters as make the solution unique for reveal "auto"
+    (as puzzleyaml.py does)
+
+    Returns:
+        int: how many were added (not already recorded on date)
+    """
+    with History(fname) as history:
+        n_added = 0
+        for words, reveal in jobs:
+            if reveal == AUTO_REVEAL:
+                reveal = minimal_reveals(words)[0]
+            n_added += history.add(date, words, reveal)
+    return n_added
+
+
+def main_archive(
+    fname: str,
+    out_dir: str,
+    page_size: int = PAGE_SIZE,
+    until: str = None,
+    timings: Dict[str, float] = None,
+) -> List[int]:
+    """write the archive pages (see puzzleyaml.write_archive) of the puzzles in the
+    history in fname which ran before until (an ISO date, by default today)
+
+    Returns:
+        List[int]: the pages written
+    """
+    if until is None:
+        until = datetime.date.today().isoformat()
+    with History(fname) as history:
+        return write_archive(
+            history.n_before(until), history.puzzles, out_dir, page_size, timings
+        )
+
+
+def main_check(fname: str, words: List[str]) -> bool:
+    """print when each word last ran, and whether the puzzle has run
+
+    Returns:
+        bool: whether the puzzle (or its transpose) has run
+    """
+    with History(fname) as history:
+        for word, date in sorted(history.last_used(words).items()):
+            print(f"{word} last ran on {date}")
+        has_run = history.has_run(words)
+    print(f"{','.join(words)} has {'' if has_run else 'not '}run before")
+    return has_run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-f",
+        "--history",
+        default=HISTORY_FILE,
+        help="History database",
+    )
+    ops = parser.add_subparsers(dest="op", required=True)
+    add_parser = ops.add_parser("add", help="Record puzzles as run on a date")
+    add_parser.add_argument("-d", "--date", required=True, help="e.g., 2024-06-01")
+    add_parser.add_argument(
+        "-i",
+        "--input",
+        required=True,
+        help="File (or - for stdin) of puzzles, one per line, as comma-separated "
+        "words and, optionally, indices to reveal (see puzzleyaml.py)",
+    )
+    add_parser.add_argument(
+        "-r",
+        "--reveal",
+        nargs="+",
+        help="Indices to reveal, or auto, for lines without their own",
+    )
+    check_parser = ops.add_parser(
+        "check", help="Whether a puzzle has run, exiting with 1 if it has"
+    )
+    check_parser.add_argument("-w", "--words", nargs=4, required=True)
+    archive_parser = ops.add_parser(
+        "archive", help="Write archive pages of the puzzles whose day is over"
+    )
+    archive_parser.add_argument(
+        "-o", "--output", required=True, help="Directory to write the pages to"
+    )
+    archive_parser.add_argument(
+        "--page-size", type=int, default=PAGE_SIZE, help="Puzzles per page"
+    )
+    archive_parser.add_argument(
+        "--until",
+        help="Only puzzles before this date, e.g., 2024-06-01. Defaults to today",
+    )
+    archive_parser.add_argument(
+        "-t",
+        "--timings",
+        action="store_true",
+        help="Print the time spent in each stage to stderr",
+    )
+    args = parser.parse_args()
+
+    if args.op == "add":
+        try:
+            reveal = None if args.reveal is None else parse_reveal(args.reveal)
+        except ValueError:
+            parser.error(f"argument -r/--reveal: invalid reveal: {args.reveal}")
+        if args.input == "-":
+            batch = read_jobs(sys.stdin, reveal)
+        else:
+            with open(args.input, "r", encoding="utf-8") as f:
+                batch = read_jobs(f, reveal)
+        n = main_add(args.history, args.date, batch)
+        print(f"{n} puzzles added, {len(batch) - n} already recorded")
+    elif args.op == "archive":
+        stage_timings = {} if args.timings else None
+        written = main_archive(
+            args.history, args.output, args.page_size, args.until, stage_timings
+        )
+        print(f"{len(written)} archive pages written", file=sys.stderr)
+        if stage_timings is not None:
+            print_timings(stage_timings)
+    else:
+        sys.exit(1 if main_check(args.history, args.words) else 0)
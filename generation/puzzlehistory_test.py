@@ -0,0 +1,94 @@
+"""Tests for puzzlehistory.py"""
+
+import os
+import sqlite3
+import yaml
+import tempfile
+import unittest
+from puzzlecodec import encode_puzzle
+from puzzlegen import transpose
+from puzzlehistory import History, main_add, main_archive
+from puzzleschedule import read_history
+
+BIRD = ["BIRD", "BORN", "DOVE", "NOSE"]
+HIT = ["HIT", "HUM", "TOP", "MAP"]
+
+
+class TestHistory(unittest.TestCase):
+    """Tests for the append-only history of puzzles that have run"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.fname = os.path.join(self.tmpdir.name, "history.db")
+        self.history = History(self.fname)
+        self.history.add("2024-06-01", HIT, [1, 8])
+        self.history.add("2024-06-01", BIRD, [1, 12])
+        self.history.add("2024-06-02", ["FELT", "FORD", "TANK", "DISK"], [1, 12])
+
+    def tearDown(self):
+        self.history.close()
+        self.tmpdir.cleanup()
+
+    def test_lookups(self):
+        """puzzles should be found by date, word and puzzle code"""
+        on_date = self.history.on_date("2024-06-01")
+        with_code = self.history.with_code(encode_puzzle(BIRD, [1, 12]))
+        with_word = self.history.with_word("DOVE")
+        last_used = self.history.last_used(["BIRD", "TANK", "EASE"])
+
+        self.assertEqual([entry["words"] for entry in on_date], [HIT, BIRD])
+        self.assertEqual(on_date[1]["reveal"], [1, 12])
+        self.assertEqual([entry["date"] for entry in with_word], ["2024-06-01"])
+        self.assertEqual([entry["words"] for entry in with_code], [BIRD])
+        self.assertEqual(last_used, {"BIRD": "2024-06-01", "TANK": "2024-06-02"})
+
+    def test_has_run(self):
+        """a puzzle should have run if it, or its transpose, is in the history"""
+        self.assertTrue(self.history.has_run(BIRD))
+        self.assertTrue(self.history.has_run(transpose(BIRD)))
+        self.assertFalse(self.history.has_run(["BEAN", "BARE", "NEED", "EASE"]))
+
+    def test_append_only(self):
+        """the same puzzle on the same date should only be added once,
+        and nothing should ever be changed or deleted"""
+        self.assertFalse(self.history.add("2024-06-01", BIRD, [1, 12]))
+        self.assertTrue(self.history.add("2024-06-03", BIRD, [1, 12]))
+        self.assertEqual(len(self.history), 4)
+        db = sqlite3.connect(self.fname)
+        for statement in ["DELETE FROM puzzles", "UPDATE puzzles SET date = 'x'"]:
+            with self.subTest(statement=statement):
+                with self.assertRaises(sqlite3.DatabaseError):
+                    db.execute(statement)
+        db.close()
+
+    def test_puzzles_in_order(self):
+        """puzzles should be in the order they were added, as read by puzzleschedule"""
+        self.history.close()
+        main_add(self.fname, "2024-06-03", [(["BEAN", "BARE", "NEED", "EASE"], "auto")])
+        self.history = History(self.fname)
+
+        self.assertEqual(
+            [entry["words"][0] for entry in self.history.puzzles(1, 3)],
+            ["BIRD", "FELT"],
+        )
+        history = read_history([self.fname])
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history[-1], ["BEAN", "BARE", "NEED", "EASE"])
+
+    def test_archive_only_days_over(self):
+        """the archive should only have puzzles from before until, so no answer to a
+        puzzle still being played is published"""
+        out_dir = os.path.join(self.tmpdir.name, "archive")
+        self.history.close()
+
+        main_archive(self.fname, out_dir, until="2024-06-02")
+        main_add(self.fname, "2024-06-03", [(HIT, [1, 8])])
+        main_archive(self.fname, out_dir, until="2024-06-03")
+
+        with open(os.path.join(out_dir, "page_1.yaml"), encoding="utf-8") as f:
+            page = yaml.safe_load(f)
+        self.history = History(self.fname)
+        self.assertEqual(self.history.n_before("2024-06-02"), 2)
+        self.assertEqual(self.history.n_before("2025-01-01"), 4)
+        dates = [entry["date"] for entry in page]
+        self.assertEqual(dates, ["2024-06-01", "2024-06-01", "2024-06-02"])
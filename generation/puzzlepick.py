@@ -0,0 +1,246 @@
+"""Pick a puzzle uniformly at random from the top of a ranked puzzle list
+e.g., to pick from all 4x4 puzzles with at least 10 unique letters, the same way every
+time for the same date
+  python puzzlepick.py -i puzzles_4x4_sorted.bin --min-score 10 --date 2024-06-01
+Puzzles are read directly by index, from a binary corpus (see puzzlecorpus.py), or
+from comma-separated words via an index of line offsets, which is built once and
+saved next to the file as <file>.idx
+--min-score uses the scores a corpus was ranked by (see puzzlerank.py), or for
+comma-separated words, unique letters, only if the file is sorted by them
+"""
+
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from puzzle import words_to_puzzle_solved
+from puzzlecorpus import Corpus, is_corpus
+from puzzlerank import by_unique_letters
+from puzzlesolve import Solver, default_solver
+
+INDEX_META_LENGTH = struct.Struct("<Q")
+INDEX_OFFSET = struct.Struct("<Q")
+# picks to try before giving up on finding a puzzle with one solution
+MAX_PICKS = 1000
+
+
+def build_index(fname: str) -> str:
+    """Index the line offsets of a comma-separated puzzle file, and, if it is sorted by
+    unique letters (most first), count how many puzzles have each number of them
+
+    Returns:
+        str: file name of the index
+    """
+    offsets = array("Q")
+    score_counts = Counter()
+    is_sorted = True
+    last_score = None
+    with open(fname, "rb") as f:
+        offset = 0
+        for line in f:
+            offsets.append(offset)
+            offset += len(line)
+            words = line.decode("utf-8").strip().split(",")
+            score = by_unique_letters(words_to_puzzle_solved(words))
+            is_sorted = is_sorted and (last_score is None or score <= last_score)
+            last_score = score
+            score_counts[score] += 1
+        offsets.append(offset)
+    stat = os.stat(fname)
+    meta = {
+        "source-size": stat.st_size,
+        "source-mtime": stat.st_mtime_ns,
+        "sorted-by": "unique" if is_sorted else None,
+    }
+    if is_sorted:
+        meta["score-counts"] = {
+            str(score): n for score, n in sorted(score_counts.items())
+        }
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    index_fname = f"{fname}.idx"
+    with open(index_fname, "wb") as f:
+        f.write(INDEX_META_LENGTH.pack(len(meta_bytes)))
+        f.write(meta_bytes)
+        f.write(offsets.tobytes())
+    return index_fname
+
+
+class IndexedPuzzles(Sequence):
+    """Comma-separated puzzles, read lazily by line via an index of line offsets
+    The index is (re)built if it is missing or older than the file
+    """
+
+    def __init__(self, fname: str):
+        index_fname = f"{fname}.idx"
+        stat = os.stat(fname)
+        if os.path.exists(index_fname):
+            with open(index_fname, "rb") as f:
+                (meta_length,) = INDEX_META_LENGTH.unpack(f.read(INDEX_META_LENGTH.size))
+                meta = json.loads(f.read(meta_length))
+            # indexes from before "sorted-by" may have counts for unsorted files
+            if (meta["source-size"], meta["source-mtime"]) != (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ) or "sorted-by" not in meta:
+                build_index(fname)
+        else:
+            build_index(fname)
+
+        with open(index_fname, "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (meta_length,) = INDEX_META_LENGTH.unpack_from(self._index, 0)
+        start = INDEX_META_LENGTH.size
+        self.metadata = json.loads(self._index[start : start + meta_length])
+        self._offsets_start = start + meta_length
+        self._len = (len(self._index) - self._offsets_start) // INDEX_OFFSET.size - 1
+        with open(fname, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: int) -> List[str]:
+        if not -self._len <= index < self._len:
+            raise IndexError("puzzle index out of range")
+        index %= self._len
+        start, stop = struct.unpack_from(
+            "<2Q", self._index, self._offsets_start + index * INDEX_OFFSET.size
+        )
+        return self._mmap[start:stop].decode("utf-8").strip().split(",")
+
+    def close(self):
+        """Unmap the files"""
+        self._index.close()
+        self._mmap.close()
+
+    def __enter__(self) -> "IndexedPuzzles":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_puzzles(fname: str):
+    """Open a binary corpus, or comma-separated puzzles, for reading by index"""
+    if is_corpus(fname):
+        return Corpus(fname)
+    return IndexedPuzzles(fname)
+
+
+def select_top(metadata: Dict, n_puzzles: int, min_score: int = None) -> int:
+    """Number of puzzles at the top of a ranked list which score at least min_score,
+    from the "score-counts" in its metadata
+    """
+    if min_score is None:
+        return n_puzzles
+    if "score-counts" not in metadata:
+        raise ValueError(
+            "Puzzles have no score counts (e.g., they are not sorted by unique "
+            "letters), rank them with puzzlerank, or pick from the --top instead"
+        )
+    return sum(
+        n for score, n in metadata["score-counts"].items() if int(score) >= min_score
+    )
+
+
+def pick(puzzles: Sequence, top: int, rng: random.Random = random) -> List[str]:
+    """Pick one of the first top puzzles, uniformly at random"""
+    if top < 1:
+        raise ValueError("No puzzles to pick from")
+    return puzzles[rng.randrange(min(top, len(puzzles)))]
+
+
+def pick_unique(
+    puzzles: Sequence,
+    top: int,
+    reveal: List[int],
+    solver: Solver,
+    rng: random.Random = random,
+) -> List[str]:
+    """Pick one of the first top puzzles which has only one solution with reveal revealed,
+    uniformly at random (by picking again until one does)
+    """
+    for _ in range(MAX_PICKS):
+        words = pick(puzzles, top, rng)
+        if solver.is_unique(words, reveal):
+            return words
+    raise ValueError(f"No puzzle with one solution found in {MAX_PICKS} picks")
+
+
+def pick_puzzle(
+    puzzles: Sequence,
+    fname: str,
+    top: int = None,
+    min_score: int = None,
+    date: str = None,
+    reveal: List[int] = None,
+) -> List[str]:
+    """Pick a puzzle from puzzles (opened from fname, with open_puzzles)
+    with reveal, only picks puzzles which have one solution with those letters revealed
+    """
+    # the same date always picks the same puzzle (from the same file)
+    rng = random.Random(f"{date} {os.path.basename(fname)}") if date else random
+    if top is None:
+        top = select_top(puzzles.metadata, len(puzzles), min_score)
+    if reveal is None:
+        return pick(puzzles, top, rng)
+    solver = default_solver(len(puzzles[0][0]), len(puzzles[0][1]))
+    return pick_unique(puzzles, top, reveal, solver, rng)
+
+
+def main(
+    fname: str,
+    top: int = None,
+    min_score: int = None,
+    date: str = None,
+    reveal: List[int] = None,
+) -> List[str]:
+    """main, see pick_puzzle"""
+    with open_puzzles(fname) as puzzles:
+        return pick_puzzle(puzzles, fname, top, min_score, date, reveal)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-i",
+        "--input",
+        help="Ranked puzzles, as a binary corpus or comma-separated words",
+        required=True,
+    )
+    parser.add_argument(
+        "-t",
+        "--top",
+        type=int,
+        help="Pick from this many puzzles at the top of the list",
+    )
+    parser.add_argument(
+        "-s",
+        "--min-score",
+        type=int,
+        help="Pick from puzzles with at least this many unique letters "
+        "(or the score a corpus was ranked by)",
+    )
+    parser.add_argument(
+        "-d",
+        "--date",
+        help="Date to pick for, e.g., 2024-06-01. The same date gives the same puzzle",
+    )
+    parser.add_argument(
+        "-r",
+        "--reveal",
+        nargs="+",
+        type=int,
+        help="Only pick puzzles with one solution when these indices are revealed",
+    )
+    args = parser.parse_args()
+    print(",".join(main(args.input, args.top, args.min_score, args.date, args.reveal)))
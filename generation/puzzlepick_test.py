@@ -0,0 +1,78 @@
+"""Tests for puzzlepick.py"""
+
+import os
+import tempfile
+import unittest
+from puzzlecorpus import write_corpus
+from puzzlepick import main as puzzlepick
+from puzzlepick import open_puzzles, select_top
+
+
+class TestPick(unittest.TestCase):
+    """Tests for picking puzzles from ranked puzzle files"""
+
+    words = ["BIRD", "BORN", "DOVE", "NOSE", "BEAN", "NEED", "DEAN"]
+    # sorted by unique letters: 10, 9, 8, 7
+    puzzles = [
+        ["BIRD", "BEAN", "DOVE", "NOSE"],
+        ["BIRD", "BORN", "DOVE", "NOSE"],
+        ["BIRD", "BORN", "DEAN", "NEED"],
+        ["BEAN", "BORN", "NEED", "NOSE"],
+    ]
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.txt = os.path.join(self.tmpdir.name, "sorted.txt")
+        with open(self.txt, "w", encoding="utf-8") as f:
+            f.writelines(f"{','.join(puzzle)}\n" for puzzle in self.puzzles)
+        self.bin = os.path.join(self.tmpdir.name, "sorted.bin")
+        write_corpus(
+            self.puzzles,
+            self.bin,
+            self.words,
+            {"score-counts": {"7": 1, "8": 1, "9": 1, "10": 1}},
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_open_puzzles(self):
+        """open_puzzles should read text and binary files by index"""
+        for fname in [self.txt, self.bin]:
+            with self.subTest(fname=fname), open_puzzles(fname) as puzzles:
+                self.assertEqual(len(puzzles), len(self.puzzles))
+                self.assertEqual(puzzles[2], self.puzzles[2])
+                self.assertEqual(puzzles[-1], self.puzzles[-1])
+                with self.assertRaises(IndexError):
+                    puzzles[len(self.puzzles)]  # pylint: disable=pointless-statement
+
+    def test_select_top(self):
+        """the top of a ranked file should come from the score counts in its metadata"""
+        for fname in [self.txt, self.bin]:
+            with self.subTest(fname=fname), open_puzzles(fname) as puzzles:
+                self.assertEqual(select_top(puzzles.metadata, len(puzzles), 9), 2)
+                self.assertEqual(select_top(puzzles.metadata, len(puzzles), 8), 3)
+                self.assertEqual(select_top(puzzles.metadata, len(puzzles)), 4)
+
+    def test_unsorted_text(self):
+        """text not sorted by unique letters should have no score counts to pick the
+        top by, but can still be picked from"""
+        with open(self.txt, "w", encoding="utf-8") as f:
+            f.writelines(f"{','.join(puzzle)}\n" for puzzle in self.puzzles[::-1])
+
+        with self.assertRaises(ValueError):
+            puzzlepick(self.txt, min_score=9)
+        self.assertIn(puzzlepick(self.txt, top=2), self.puzzles[2:])
+
+    def test_pick(self):
+        """picks should come from the top, and be the same for the same date"""
+        for fname in [self.txt, self.bin]:
+            with self.subTest(fname=fname):
+                picks = [puzzlepick(fname, min_score=9) for _ in range(20)]
+                dated = [puzzlepick(fname, top=3, date="2024-06-01") for _ in range(5)]
+
+                for puzzle in picks:
+                    self.assertIn(puzzle, self.puzzles[:2])
+                self.assertEqual(len(set(map(tuple, dated))), 1)
+                with self.assertRaises(ValueError):
+                    puzzlepick(fname, min_score=11)
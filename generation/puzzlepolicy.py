@@ -0,0 +1,177 @@
+"""Evaluate reveal policies (which letters are revealed for every puzzle) over a corpus
+i.e., for each policy, how many puzzles have only one solution with it, e.g.,
+  python puzzlepolicy.py -i puzzles_4x4_sorted.txt --top 10000 -j 4 -o policies.bin
+  policy            reveal       unique    fraction
+  none              0            8312      83.1%
+  opposite corners  1 12         8740      87.4%
+  ...
+Each puzzle is only solved once, with nothing revealed, and every policy is checked
+against the solutions it found (see puzzlesolve.differing_letters)
+With -o, which policies work for each puzzle are saved as one little-endian uint32 per
+puzzle, in the order of the puzzle list, where bit k is set if the k-th policy works
+"""
+
+import argparse
+from contextlib import nullcontext
+from itertools import chain, islice
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from puzzlecorpus import read_puzzles
+from puzzlesolve import differing_letters, reveal_mask
+
+CHUNK_SIZE = 1000
+# policies are bits of a uint32
+MAX_POLICIES = 32
+
+
+def default_policies(size: int) -> Dict[str, List[int]]:
+    """Reveal policies to compare for puzzles made of words of length size"""
+    n_letters = 4 * size - 4
+    top_right, bottom_left = size, n_letters - size + 1
+    return {
+        "none": [0],
+        "top left corner": [1],
+        "opposite corners": [1, n_letters],
+        "other opposite corners": [top_right, bottom_left],
+        "all corners": [1, top_right, bottom_left, n_letters],
+        "top middle": [2],
+        "left middle": [size + 1],
+        "everything": [-1],
+    }
+
+
+def parse_policy(policy: str) -> List[int]:
+    """Parse a policy from the command line, as comma-separated indices, e.g., "1,12" """
+    return [int(index) for index in policy.split(",")]
+
+
+def _evaluate_chunk(args: Tuple[List[List[str]], List[int]]) -> np.ndarray:
+    """For each puzzle (as words) in a chunk, a bitmask of which policies
+    (as reveal_masks) give it one solution
+    """
+    chunk, masks = args
+    works = np.zeros(len(chunk), dtype="<u4")
+    for i, words in enumerate(chunk):
+        differs = differing_letters(words)
+        works[i] = sum(
+            1 << k for k, mask in enumerate(masks) if all(d & mask for d in differs)
+        )
+    return works
+
+
+def evaluate(
+    puzzles_wordy: Iterable[List[str]],
+    policies: Dict[str, List[int]],
+    jobs: int = 1,
+    out_file: str = None,
+) -> Tuple[Dict[str, int], int]:
+    """Count the puzzles (as words) with one solution for each policy,
+    on jobs processes, saving which policies work for each puzzle to out_file if given
+
+    Returns:
+        Tuple[Dict[str, int], int]: (unique puzzles for each policy, puzzles)
+    """
+    if len(policies) > MAX_POLICIES:
+        raise ValueError(f"At most {MAX_POLICIES} policies can be evaluated at once")
+    puzzles_wordy = iter(puzzles_wordy)
+    first = next(puzzles_wordy, None)
+    if first is None:
+        return {name: 0 for name in policies}, 0
+    n_letters = 4 * len(first[0]) - 4
+    masks = [reveal_mask(reveal, n_letters) for reveal in policies.values()]
+    puzzles_wordy = chain([first], puzzles_wordy)
+
+    counts = np.zeros(len(policies), dtype=np.int64)
+    n_puzzles = 0
+    with (Pool(jobs) if jobs > 1 else nullcontext()) as pool, (
+        open(out_file, "wb") if out_file else nullcontext()
+    ) as f:
+        mapper = pool.imap if pool else map
+        while True:
+            # a few chunks per process in memory at once
+            chunks = [
+                list(islice(puzzles_wordy, CHUNK_SIZE)) for _ in range(max(jobs, 1) * 4)
+            ]
+            chunks = [(chunk, masks) for chunk in chunks if chunk]
+            if not chunks:
+                break
+            for works in mapper(_evaluate_chunk, chunks):
+                counts += ((works[:, None] >> np.arange(len(policies))) & 1).sum(axis=0)
+                n_puzzles += len(works)
+                if f:
+                    f.write(works.tobytes())
+    return dict(zip(policies, counts.tolist())), n_puzzles
+
+
+def main(
+    fname: str,
+    policies: List[str] = None,
+    top: int = None,
+    jobs: int = 1,
+    out_file: str = None,
+) -> Dict[str, int]:
+    """main
+    policies are comma-separated indices to reveal, or the default_policies if not given
+    """
+    puzzles_wordy = read_puzzles(fname)
+    if top is not None:
+        puzzles_wordy = islice(puzzles_wordy, top)
+    puzzles_wordy = iter(puzzles_wordy)
+    first = next(puzzles_wordy, None)
+    if first is None:
+        raise ValueError(f"No puzzles in {fname}")
+    if policies:
+        named = {policy: parse_policy(policy) for policy in policies}
+    else:
+        named = default_policies(len(first[0]))
+
+    counts, n_puzzles = evaluate(chain([first], puzzles_wordy), named, jobs, out_file)
+    width = max(len(name) for name in ["policy", *named]) + 2
+    print(f"{'policy':<{width}}{'reveal':<13}{'unique':<10}fraction")
+    for name, reveal in named.items():
+        reveal_str = " ".join(map(str, reveal))
+        print(
+            f"{name:<{width}}{reveal_str:<13}{counts[name]:<10}"
+            f"{counts[name] / n_puzzles:.1%}"
+        )
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-i",
+        "--input",
+        help="Ranked puzzles, as a binary corpus or comma-separated words",
+        required=True,
+    )
+    parser.add_argument(
+        "-p",
+        "--policy",
+        action="append",
+        help="Indices to reveal, comma-separated, e.g., 1,12. Can be given many times. "
+        "Defaults to corners, middles, ...",
+    )
+    parser.add_argument(
+        "-t",
+        "--top",
+        type=int,
+        help="Only evaluate this many puzzles at the top of the list",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes to solve puzzles with",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to save which policies work for each puzzle to",
+    )
+    args = parser.parse_args()
+    main(args.input, args.policy, args.top, args.jobs, args.output)
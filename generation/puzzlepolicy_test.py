@@ -0,0 +1,46 @@
+"""Tests for puzzlepolicy.py"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from puzzle import load_words
+from puzzlegen import generate
+from puzzlepolicy import default_policies, evaluate
+from puzzlesolve import default_solver
+
+
+class TestEvaluate(unittest.TestCase):
+    """Tests for evaluating reveal policies over many puzzles"""
+
+    def test_same_as_solving(self):
+        """evaluate should count, and save, which policies give each puzzle
+        one solution, the same as solving it with each policy"""
+        for size in [4, 3]:
+            puzzles = generate(load_words(str(size))[:120])[::10]
+            policies = default_policies(size)
+            solver = default_solver(size)
+            expected = [
+                [solver.is_unique(words, reveal) for reveal in policies.values()]
+                for words in puzzles
+            ]
+            for jobs in [1, 2]:
+                with self.subTest(size=size, jobs=jobs), tempfile.TemporaryDirectory() as d:
+                    out_file = os.path.join(d, "policies.bin")
+
+                    counts, n_puzzles = evaluate(puzzles, policies, jobs, out_file)
+
+                    self.assertEqual(n_puzzles, len(puzzles))
+                    self.assertEqual(
+                        list(counts.values()), np.sum(expected, axis=0).tolist()
+                    )
+                    works = np.fromfile(out_file, dtype="<u4")
+                    bits = [[bool(w >> k & 1) for k in range(len(policies))] for w in works]
+                    self.assertEqual(bits, expected)
+                    self.assertEqual(counts["everything"], len(puzzles))
+
+    def test_empty(self):
+        """evaluate should count no puzzles for no puzzles"""
+        counts, n_puzzles = evaluate([], {"corners": [1, 12]})
+
+        self.assertEqual((counts, n_puzzles), ({"corners": 0}, 0))
@@ -0,0 +1,214 @@
+"""Profile long runs (of puzzlegen.py and puzzlerank.py, with --profile), printing
+JSON lines to stderr, so a cron log says where the time went, e.g.,
+  {"event": "progress", "elapsed": 10.0, "counts": {"puzzles": 412000, ...}, ...}
+  {"event": "profile", "seconds": 24.1, "stages": {"load": {...}, ...}, ...}
+For each stage (load, generate, score, sort, write, ...) there is its wall time and
+CPU time (much less CPU than wall time means waiting on I/O or worker processes), and
+its peak traced memory (tracemalloc). Time in a stage inside another only counts for
+the inner one. Counters are, e.g., candidate words examined and pruned at each level
+of generating. With a cProfile file, the whole run is also profiled (only in the main
+process), to read with python -m pstats
+Tracing memory makes allocating slower, so runs are slower with --profile
+"""
+
+import cProfile
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, TextIO
+
+# seconds between progress lines
+PROGRESS_SECONDS = 10.0
+# items to take at a time from a tracked iterable, so it is not timed per item
+TRACK_BATCH = 10000
+
+
+class Profile:
+    """Stages, counters and progress of a run
+    e.g.,
+      with Profile() as profile:
+          with profile.stage("load"):
+              words = load_words("4")
+          for puzzle in profile.track(iter_puzzles(words), "generate", "puzzles"):
+              ...
+      prints {"event": "profile", "stages": {"load": {...}, "generate": {...}},
+              "counts": {"puzzles": ...}, "rates": {"puzzles_per_second": ...}, ...}
+    """
+
+    def __init__(
+        self,
+        out: TextIO = sys.stderr,
+        cprofile_fname: str = None,
+        memory: bool = True,
+        interval: float = PROGRESS_SECONDS,
+    ):
+        """
+        Args:
+            cprofile_fname (str, optional): File to dump cProfile stats to.
+                Defaults to None.
+            memory (bool, optional): Trace the peak memory of each stage.
+                Defaults to True.
+            interval (float, optional): Seconds between progress lines.
+                Defaults to PROGRESS_SECONDS.
+        """
+        self.out = out
+        self.cprofile_fname = cprofile_fname
+        self.memory = memory
+        self.interval = interval
+        self.counts = Counter()
+        # stage -> {"seconds", "cpu_seconds", "calls", "peak_mb"}
+        self.stages: Dict[str, Dict[str, float]] = {}
+        # counter -> stage it is counted in, for counts per second
+        self._rates: Dict[str, str] = {}
+        # open stages, innermost last, as [name, child seconds, child cpu seconds]
+        self._stack: List[list] = []
+        self._profiler = None
+        self._start = self._last_progress = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    def __enter__(self) -> "Profile":
+        self._start = self._last_progress = time.perf_counter()
+        self._start_cpu = time.process_time()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_fname:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.cprofile_fname)
+            self._profiler = None
+        report = self.report()
+        if exc is not None:
+            report["error"] = repr(exc)
+        self._emit({"event": "profile", **report})
+        if self.memory:
+            tracemalloc.stop()
+
+    def _emit(self, line: Dict):
+        print(json.dumps(line), file=self.out, flush=True)
+
+    def _note_peak(self, name: str):
+        if tracemalloc.is_tracing():
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            stats = self.stages[name]
+            stats["peak_mb"] = max(stats["peak_mb"], peak_mb)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the time (less that of stages inside it) and peak memory
+        of the with block to stage name
+        """
+        stats = self.stages.setdefault(
+            name, {"seconds": 0.0, "cpu_seconds": 0.0, "calls": 0, "peak_mb": 0.0}
+        )
+        if self._stack:
+            self._note_peak(self._stack[-1][0])
+        frame = [name, 0.0, 0.0]
+        self._stack.append(frame)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        start, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            cpu_seconds = time.process_time() - start_cpu
+            self._stack.pop()
+            self._note_peak(name)
+            stats["seconds"] += seconds - frame[1]
+            stats["cpu_seconds"] += cpu_seconds - frame[2]
+            stats["calls"] += 1
+            if self._stack:
+                parent = self._stack[-1]
+                parent[1] += seconds
+                parent[2] += cpu_seconds
+                parent_stats = self.stages[parent[0]]
+                parent_stats["peak_mb"] = max(parent_stats["peak_mb"], stats["peak_mb"])
+
+    def track(
+        self,
+        items: Iterable,
+        stage: str,
+        counter: str,
+        batch_size: int = TRACK_BATCH,
+    ) -> Iterator:
+        """Pass items through, timing how long they take to make in stage,
+        counting them in counter, and printing progress every interval seconds
+        """
+        self._rates[counter] = stage
+        items = iter(items)
+        while True:
+            with self.stage(stage):
+                batch = list(islice(items, batch_size))
+            if not batch:
+                return
+            self.counts[counter] += len(batch)
+            yield from batch
+            self.progress()
+
+    def progress(self, force: bool = False):
+        """Print the counters so far, if it has been interval seconds since last time"""
+        now = time.perf_counter()
+        if not force and now - self._last_progress < self.interval:
+            return
+        self._last_progress = now
+        self._emit(
+            {
+                "event": "progress",
+                "elapsed": round(now - self._start, 3),
+                "counts": dict(self.counts),
+                "rates": self.rates(),
+            }
+        )
+
+    def rates(self) -> Dict[str, float]:
+        """Each tracked counter per second of its stage, e.g., puzzles_per_second"""
+        rates = {}
+        for counter, stage in self._rates.items():
+            seconds = self.stages.get(stage, {}).get("seconds")
+            if seconds:
+                rate = self.counts[counter] / seconds
+                rates[f"{counter}_per_second"] = round(rate, 1)
+        return rates
+
+    def report(self) -> Dict:
+        """Everything profiled so far, as a dict ready for JSON"""
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        # kilobytes on Linux, bytes on macOS
+        rss_unit = 2**20 if sys.platform == "darwin" else 2**10
+        return {
+            "seconds": round(time.perf_counter() - self._start, 3),
+            "cpu_seconds": round(time.process_time() - self._start_cpu, 3),
+            "child_cpu_seconds": round(children.ru_utime + children.ru_stime, 3),
+            "peak_rss_mb": round(usage.ru_maxrss / rss_unit, 1),
+            "blocks_read": usage.ru_inblock,
+            "blocks_written": usage.ru_oublock,
+            "stages": {
+                name: {key: round(value, 3) for key, value in stats.items()}
+                for name, stats in self.stages.items()
+            },
+            "counts": dict(self.counts),
+            "rates": self.rates(),
+        }
+
+
+def profiled(profile: Optional[Profile], stage: str) -> ContextManager:
+    """profile.stage(stage), or nothing if there is no profile"""
+    return nullcontext() if profile is None else profile.stage(stage)
+
+
+def tracked(
+    profile: Optional[Profile], items: Iterable, stage: str, counter: str
+) -> Iterable:
+    """profile.track(items, stage, counter), or items if there is no profile"""
+    return items if profile is None else profile.track(items, stage, counter)
@@ -0,0 +1,91 @@
+"""Tests for puzzleprofile.py"""
+
+import io
+import json
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from collections import Counter
+from puzzle import load_words
+from puzzlegen import iter_puzzles
+from puzzleprofile import Profile
+
+
+class TestProfile(unittest.TestCase):
+    """Tests for profiling stages, counters and progress"""
+
+    def test_stages(self):
+        """time in a stage inside another should only count for the inner one"""
+        out = io.StringIO()
+
+        with Profile(out) as profile:
+            with profile.stage("outer"):
+                time.sleep(0.02)
+                with profile.stage("inner"):
+                    time.sleep(0.05)
+                    data = [0] * 1000000
+
+        report = json.loads(out.getvalue())
+        stages = report["stages"]
+        self.assertEqual(report["event"], "profile")
+        self.assertLess(stages["outer"]["seconds"], 0.05)
+        self.assertGreaterEqual(stages["inner"]["seconds"], 0.05)
+        self.assertGreater(stages["inner"]["peak_mb"], 7)
+        self.assertGreaterEqual(stages["outer"]["peak_mb"], stages["inner"]["peak_mb"])
+        self.assertEqual(len(data), 1000000)
+
+    def test_track(self):
+        """tracked items should pass through, counted, with progress lines"""
+        out = io.StringIO()
+
+        with Profile(out, interval=0) as profile:
+            items = list(profile.track(range(25), "make", "items", batch_size=10))
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(items, list(range(25)))
+        self.assertEqual([line["event"] for line in lines], ["progress"] * 3 + ["profile"])
+        self.assertEqual([line["counts"]["items"] for line in lines], [10, 20, 25, 25])
+        self.assertEqual(lines[-1]["stages"]["make"]["calls"], 4)
+        self.assertIn("items_per_second", lines[-1]["rates"])
+
+    def test_error(self):
+        """a run which fails should still print its profile, with the error"""
+        out = io.StringIO()
+
+        with self.assertRaises(ValueError):
+            with Profile(out) as profile:
+                with profile.stage("load"):
+                    raise ValueError("bad")
+
+        report = json.loads(out.getvalue())
+        self.assertIn("bad", report["error"])
+        self.assertEqual(report["stages"]["load"]["calls"], 1)
+
+    def test_cprofile(self):
+        """a cProfile file should be saved, readable by pstats"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "run.prof")
+
+            with Profile(io.StringIO(), fname, memory=False):
+                sorted(range(1000), key=str)
+
+            self.assertTrue(pstats.Stats(fname).total_calls)
+
+    def test_generate_counts(self):
+        """candidates examined less those pruned should be the puzzles generated,
+        counted the same with more than one job"""
+        all_words = load_words("4")[:150]
+        counts = Counter()
+        counts_jobs = Counter()
+
+        puzzles = list(iter_puzzles(all_words, counts=counts))
+        puzzles_jobs = list(iter_puzzles(all_words, jobs=2, counts=counts_jobs))
+
+        self.assertEqual(puzzles, puzzles_jobs)
+        self.assertEqual(counts, counts_jobs)
+        self.assertEqual(counts["word1_examined"], len(all_words))
+        self.assertEqual(
+            counts["word4_examined"] - counts["word4_pruned"], len(puzzles)
+        )
@@ -1,8 +1,23 @@
 """ranking ringram puzzles by different metrics"""
 
 import argparse
-from typing import List
+import heapq
+import os
+import tempfile
+from collections import Counter
+from contextlib import nullcontext
+from itertools import chain, islice
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 from puzzle import flatten_puzzle, puzzle_solved_to_words, words_to_puzzle_solved
+from puzzlecorpus import Corpus, CorpusWriter, is_corpus, read_puzzles, write_corpus
+from puzzleprofile import Profile, profiled, tracked
+from puzzlesignature import read_collisions
+from puzzlesolve import default_solver, difficulty, puzzle_clues
+
+# rough size of one puzzle (and its score) in memory while ranking
+PUZZLE_BYTES = 1000
+MEMORY_MB = 256
 
 
 def by_unique_letters(puzzle: List[List[str]]) -> int:
@@ -10,24 +25,296 @@ def by_unique_letters(puzzle: List[List[str]]) -> int:
     return len(set(flatten_puzzle(puzzle)))
 
 
-def main(puzzles_wordy: List[str], output: "" or "unique"):
-    """main"""
+class ByDifficulty:
+    """Rank by how hard a puzzle is to solve with reveal revealed, see Solver.effort
+    (a class, not a function, so it can be sent to other processes with its reveal)
+    """
+
+    def __init__(self, reveal: List[int]):
+        self.reveal = reveal
+
+    def __call__(self, puzzle: List[List[str]]) -> int:
+        words = puzzle_solved_to_words(puzzle)
+        solver = default_solver(len(words[0]), len(words[1]))
+        return difficulty(solver.effort(*puzzle_clues(words, self.reveal, solver.wordlist)))
+
+
+RANKINGS = {"unique": by_unique_letters, "difficulty": ByDifficulty}
+# rankings which need the revealed letters
+REVEAL_RANKINGS = {"difficulty"}
+# rankings with only a few possible scores (e.g., 1 to 12 unique letters),
+# which can be sorted in one pass by putting each puzzle in a bucket per score
+BUCKET_RANKINGS = {by_unique_letters}
+
+
+def ranking(output: str, reveal: List[int] = None) -> Callable:
+    """The key to rank puzzles by for output, e.g., "unique" """
+    if output in REVEAL_RANKINGS:
+        if reveal is None:
+            raise ValueError(f"Ranking by {output} needs letters to reveal")
+        return RANKINGS[output](reveal)
+    return RANKINGS[output]
+
+
+def ranking_metadata(output: str, reveal: List[int] = None) -> Dict:
+    """Metadata saved with puzzles ranked by output"""
+    if output in REVEAL_RANKINGS:
+        return {"sorted-by": output, "reveal": reveal}
+    return {"sorted-by": output}
+
+
+def filter_collisions(
+    puzzles_wordy: Iterable[List[str]], collisions_fname: str, max_collisions: int = 0
+) -> Iterator[List[str]]:
+    """Only the puzzles (as words) which share their clues with at most max_collisions
+    other puzzles, from the collision counts in collisions_fname (see puzzlesignature.py),
+    which must be for the same puzzles in the same order
+    """
+    collisions = read_collisions(collisions_fname)
+    n_puzzles = 0
+    for n_puzzles, words in enumerate(puzzles_wordy, 1):
+        if n_puzzles > len(collisions):
+            raise ValueError(f"More puzzles than collision counts in {collisions_fname}")
+        if collisions[n_puzzles - 1] <= max_collisions:
+            yield words
+    if n_puzzles != len(collisions):
+        raise ValueError(f"Fewer puzzles than collision counts in {collisions_fname}")
+
+
+def _score_chunk(args: Tuple[Callable, List[List[str]]]) -> List[int]:
+    """Score a chunk of puzzles (as words)"""
+    key, chunk = args
+    return [key(words_to_puzzle_solved(words)) for words in chunk]
+
+
+def _sort_run(args: Tuple[Callable, List[List[str]], str]) -> List[int]:
+    """Score and sort a chunk of puzzles (as words), highest first,
+    and spill it to run_fname as "score<tab>words" lines
+
+    Returns:
+        List[int]: the scores
+    """
+    key, chunk, run_fname = args
+    scores = _score_chunk((key, chunk))
+    order = sorted(range(len(chunk)), key=scores.__getitem__, reverse=True)
+    with open(run_fname, "w", encoding="utf-8") as f:
+        f.writelines(f"{scores[i]}\t{','.join(chunk[i])}\n" for i in order)
+    return scores
+
+
+def _read_run(run_fname: str) -> Iterator[Tuple[int, List[str]]]:
+    """Read a run written by _sort_run"""
+    with open(run_fname, "r", encoding="utf-8") as f:
+        for line in f:
+            score, words = line.rstrip("\n").split("\t")
+            yield int(score), words.split(",")
+
+
+def rank_stream(
+    puzzles_wordy: Iterable[List[str]],
+    key: Callable = by_unique_letters,
+    memory: int = MEMORY_MB,
+    jobs: int = 1,
+    words_seen: Dict[str, None] = None,
+    profile: Profile = None,
+) -> Iterator[Tuple[int, List[str]]]:
+    """Sort puzzles (as words) by key, highest first, in bounded memory
+    The same order as sorted(..., reverse=True), i.e., ties keep their input order
+    Puzzles are scored in chunks (on jobs processes) which fit in memory (in MB), then
+      for BUCKET_RANKINGS, put in one file per score, which are read back highest first
+      otherwise, sorted and spilled to a file per chunk, which are merged
+
+    Args:
+        words_seen (Dict[str, None], optional): filled with every word seen, in order
+        profile (Profile, optional): profile scoring (and sorting runs), and spilling
+
+    Yields:
+        Tuple[int, List[str]]: (score, puzzle as words)
+    """
+    chunk_size = max(1, memory * 2**20 // PUZZLE_BYTES // max(jobs, 1))
+    puzzles_wordy = iter(puzzles_wordy)
+    with tempfile.TemporaryDirectory() as tmpdir, (
+        Pool(jobs) if jobs > 1 else nullcontext()
+    ) as pool:
+        mapper = pool.map if pool else map
+        buckets = {}
+        runs = []
+        while True:
+            # at most one chunk per process in memory at once
+            chunks = [list(islice(puzzles_wordy, chunk_size)) for _ in range(max(jobs, 1))]
+            chunks = [chunk for chunk in chunks if chunk]
+            if not chunks:
+                break
+            if words_seen is not None:
+                words_seen.update((w, None) for chunk in chunks for p in chunk for w in p)
+
+            if key in BUCKET_RANKINGS:
+                with profiled(profile, "score"):
+                    chunk_scores = list(
+                        mapper(_score_chunk, [(key, chunk) for chunk in chunks])
+                    )
+                with profiled(profile, "spill"):
+                    for chunk, scores in zip(chunks, chunk_scores):
+                        for score, words in zip(scores, chunk):
+                            if score not in buckets:
+                                buckets[score] = open(  # pylint: disable=consider-using-with
+                                    os.path.join(tmpdir, f"bucket_{score}.txt"),
+                                    "w",
+                                    encoding="utf-8",
+                                )
+                            buckets[score].write(f"{score}\t{','.join(words)}\n")
+            else:
+                run_fnames = [
+                    os.path.join(tmpdir, f"run_{len(runs) + i}.txt")
+                    for i in range(len(chunks))
+                ]
+                # each run is scored, sorted and spilled together
+                with profiled(profile, "score"):
+                    list(
+                        mapper(
+                            _sort_run,
+                            [(key, c, f) for c, f in zip(chunks, run_fnames)],
+                        )
+                    )
+                runs.extend(run_fnames)
+
+        for f in buckets.values():
+            f.close()
+        if key in BUCKET_RANKINGS:
+            for score in sorted(buckets, reverse=True):
+                yield from _read_run(buckets[score].name)
+        else:
+            yield from heapq.merge(
+                *[_read_run(run) for run in runs], key=lambda x: x[0], reverse=True
+            )
+
+
+def main_stream(
+    fname: str,
+    output: "unique",
+    out_file: str = None,
+    memory: int = MEMORY_MB,
+    jobs: int = 1,
+    collisions: str = None,
+    max_collisions: int = 0,
+    reveal: List[int] = None,
+    profile: Profile = None,
+):
+    """rank puzzles from fname without holding them all in memory, see rank_stream
+    sorted puzzles are printed, or written to out_file,
+    as a binary corpus if it ends in .bin
+    with collisions, puzzles with more than max_collisions are left out, see filter_collisions
+    with profile, the load, score, spill, merge and write stages are profiled
+    """
+    words_seen = {}
+    puzzles_wordy = read_puzzles(fname)
+    if collisions:
+        puzzles_wordy = filter_collisions(puzzles_wordy, collisions, max_collisions)
+    puzzles_wordy = tracked(profile, puzzles_wordy, "load", "puzzles_read")
+    key = ranking(output, reveal)
+    ranked = rank_stream(puzzles_wordy, key, memory, jobs, words_seen, profile)
+    ranked = tracked(profile, ranked, "merge", "puzzles")
+    with profiled(profile, "write"):
+        if out_file and out_file.endswith(".bin"):
+            # every puzzle has been read (and every word seen) once the first is ranked
+            first = next(ranked, None)
+            ranked = chain([first] if first else [], ranked)
+            if is_corpus(fname):
+                with Corpus(fname) as corpus:
+                    all_words = corpus.words
+            else:
+                all_words = list(words_seen)
+            score_counts = Counter()
+            metadata = ranking_metadata(output, reveal)
+            with CorpusWriter(out_file, all_words, metadata) as writer:
+                for score, words in ranked:
+                    writer.write(words)
+                    score_counts[score] += 1
+                writer.metadata["score-counts"] = {
+                    str(k): n for k, n in sorted(score_counts.items())
+                }
+            return
+        with open(out_file, "w", encoding="utf-8") if out_file else nullcontext() as f:
+            for _, words in ranked:
+                print(",".join(words), file=f)
+
+
+def score_puzzles(
+    puzzles_wordy: List[List[str]], key: Callable, jobs: int = 1
+) -> List[int]:
+    """Score puzzles (as words) by key, on jobs processes"""
+    if jobs <= 1:
+        return _score_chunk((key, puzzles_wordy))
+    chunk_size = -(-len(puzzles_wordy) // (jobs * 4))
+    chunks = [
+        (key, puzzles_wordy[i : i + chunk_size])
+        for i in range(0, len(puzzles_wordy), chunk_size)
+    ]
+    with Pool(jobs) as pool:
+        return list(chain.from_iterable(pool.map(_score_chunk, chunks)))
+
+
+def main(
+    puzzles_wordy: List[str],
+    output: "" or "unique" or "difficulty",
+    out_file: str = None,
+    all_words: List[str] = None,
+    reveal: List[int] = None,
+    jobs: int = 1,
+    profile: Profile = None,
+):
+    """main
+    with out_file, sorted puzzles are written there instead of printed,
+    as a binary corpus (using the word table all_words) if it ends in .bin
+    with profile, the load, score, sort and write stages are profiled
+    """
     ranks = [by_unique_letters]
-    puzzles = [words_to_puzzle_solved(words) for words in puzzles_wordy]
+    with profiled(profile, "load"):
+        puzzles = [words_to_puzzle_solved(words) for words in puzzles_wordy]
+    if profile is not None:
+        profile.counts["puzzles"] += len(puzzles)
 
     if not output:
         print(f"Ranking by unique letters")
-    sorted_puzzles = sorted(puzzles, key=by_unique_letters, reverse=True)
-    if not output:
+        sorted_puzzles = sorted(puzzles, key=by_unique_letters, reverse=True)
         for i, puzzle in enumerate(sorted_puzzles[:10]):
             print(f"{i+1}. {by_unique_letters(puzzle)}")
             print(", ".join(puzzle_solved_to_words(puzzle)))
-    elif output == "unique":
-        for i, puzzle in enumerate(sorted_puzzles):
-            print(",".join(puzzle_solved_to_words(puzzle)))
+    else:
+        with profiled(profile, "score"):
+            scores = score_puzzles(puzzles_wordy, ranking(output, reveal), jobs)
+        with profiled(profile, "sort"):
+            order = sorted(range(len(puzzles)), key=scores.__getitem__, reverse=True)
+            sorted_puzzles = [puzzles[i] for i in order]
+    with profiled(profile, "write"):
+        if output and out_file and out_file.endswith(".bin"):
+            if all_words is None:
+                all_words = list(
+                    dict.fromkeys(w for words in puzzles_wordy for w in words)
+                )
+            score_counts = Counter(scores)
+            write_corpus(
+                (puzzle_solved_to_words(puzzle) for puzzle in sorted_puzzles),
+                out_file,
+                all_words,
+                {
+                    **ranking_metadata(output, reveal),
+                    "score-counts": {
+                        str(k): n for k, n in sorted(score_counts.items())
+                    },
+                },
+            )
+        elif output and out_file:
+            with open(out_file, "w", encoding="utf-8") as f:
+                for puzzle in sorted_puzzles:
+                    f.write(f"{','.join(puzzle_solved_to_words(puzzle))}\n")
+        elif output:
+            for i, puzzle in enumerate(sorted_puzzles):
+                print(",".join(puzzle_solved_to_words(puzzle)))
 
-    if not output:
-        print(f"Ranking by unique letters, skipping used words")
+    if output:
+        return
+    print(f"Ranking by unique letters, skipping used words")
     used_words = set()
     sorted_puzzles = sorted(puzzles, key=by_unique_letters, reverse=True)
     puzzles_freq_filtered = []
@@ -37,10 +324,8 @@ def main(puzzles_wordy: List[str], output: "" or "unique"):
             puzzles_freq_filtered.append(puzzle)
             used_words.update(words)
     for i, puzzle in enumerate(puzzles_freq_filtered[:10]):
-        if not output:
-            print(f"{i+1}. {by_unique_letters(puzzle)}")
-        if not output:
-            print(", ".join(puzzle_solved_to_words(puzzle)))
+        print(f"{i+1}. {by_unique_letters(puzzle)}")
+        print(", ".join(puzzle_solved_to_words(puzzle)))
 
 
 if __name__ == "__main__":
@@ -59,15 +344,107 @@ if __name__ == "__main__":
     parser.add_argument(
         "-o",
         "--output",
-        choices=["unique"],
-        help="type of metric to sort by and output puzzles",
+        choices=list(RANKINGS),
+        help="type of metric to sort by and output puzzles. difficulty needs --reveal",
+    )
+    parser.add_argument(
+        "-r",
+        "--reveal",
+        nargs="+",
+        type=int,
+        help="List of indices revealed, to rank by difficulty. -1 for all. 0 for none.",
+    )
+    parser.add_argument(
+        "-f",
+        "--out-file",
+        help="File to write sorted puzzles to, a binary corpus if it ends in .bin",
+    )
+    parser.add_argument(
+        "-s",
+        "--stream",
+        action="store_true",
+        help="Rank in bounded memory, spilling to temporary files (needs -i and -o)",
+    )
+    parser.add_argument(
+        "-m",
+        "--memory",
+        type=int,
+        default=MEMORY_MB,
+        help=f"Memory to rank in with --stream, in MB. Defaults to {MEMORY_MB}",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes to score puzzles with",
+    )
+    parser.add_argument(
+        "-c",
+        "--collisions",
+        help="Collision counts of the input puzzles, from puzzlesignature.py",
+    )
+    parser.add_argument(
+        "--max-collisions",
+        type=int,
+        default=0,
+        help="With --collisions, leave out puzzles sharing their clues with more than "
+        "this many others. Defaults to 0",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print progress, and the time and memory of each stage, as JSON to stderr",
+    )
+    parser.add_argument(
+        "--cprofile",
+        help="File to save cProfile stats to (implies --profile)",
     )
     args = parser.parse_args()
-    if args.input:
-        words = []
-        with open(args.input, "r", encoding="utf-8") as f:
-            for line in f:
-                words.append(line.strip().split(","))  # csv
-    else:
-        words = [args.words]
-    main(words, args.output)
+    if args.output in REVEAL_RANKINGS and not args.reveal:
+        parser.error(f"-o {args.output} needs --reveal")
+    if args.stream and not (args.input and args.output):
+        parser.error("--stream needs --input and --output")
+    if args.collisions and not args.input:
+        parser.error("--collisions needs --input")
+    profile = None
+    if args.profile or args.cprofile:
+        profile = Profile(cprofile_fname=args.cprofile)
+    with profile or nullcontext():
+        if args.stream:
+            main_stream(
+                args.input,
+                args.output,
+                args.out_file,
+                args.memory,
+                args.jobs,
+                args.collisions,
+                args.max_collisions,
+                args.reveal,
+                profile,
+            )
+        else:
+            all_words = None
+            with profiled(profile, "load"):
+                if args.input:
+                    # csv, or binary corpus
+                    words = read_puzzles(args.input)
+                    if args.collisions:
+                        words = filter_collisions(
+                            words, args.collisions, args.max_collisions
+                        )
+                    words = list(words)
+                    if is_corpus(args.input):
+                        with Corpus(args.input) as corpus:
+                            all_words = corpus.words
+                else:
+                    words = [args.words]
+            main(
+                words,
+                args.output,
+                args.out_file,
+                all_words,
+                args.reveal,
+                args.jobs,
+                profile,
+            )
@@ -0,0 +1,73 @@
+"""Tests for puzzlerank.py"""
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+import numpy as np
+from puzzle import words_to_puzzle_solved
+from puzzlegen import generate
+from puzzlegen_test import TestGenerate
+from puzzlerank import ByDifficulty, by_unique_letters, filter_collisions, rank_stream
+
+
+def by_first_letter(puzzle):
+    """A ranking with many possible scores, so it is merge sorted"""
+    return ord(puzzle[0][0]) * 100 + ord(puzzle[0][1])
+
+
+class TestRankStream(unittest.TestCase):
+    """Tests for ranking puzzles in bounded memory"""
+
+    puzzles = generate(TestGenerate.words_4) + generate(TestGenerate.words_3)
+
+    def test_same_as_sorted(self):
+        """rank_stream should give the same order as sorted, for any chunk size"""
+        for key in [by_unique_letters, by_first_letter, ByDifficulty([1, 12])]:
+            expected = sorted(
+                self.puzzles,
+                key=lambda words, key=key: key(words_to_puzzle_solved(words)),
+                reverse=True,
+            )
+            for memory, jobs in [(1, 1), (1, 2)]:
+                with self.subTest(key=key, jobs=jobs):
+                    # memory is in MB, so shrink the chunks to a few puzzles each
+                    with unittest.mock.patch("puzzlerank.PUZZLE_BYTES", 2**20 // 7):
+                        ranked = list(rank_stream(self.puzzles, key, memory, jobs))
+
+                    self.assertEqual([words for _, words in ranked], expected)
+                    self.assertEqual(
+                        [score for score, _ in ranked],
+                        [key(words_to_puzzle_solved(words)) for words in expected],
+                    )
+
+    def test_words_seen(self):
+        """rank_stream should collect every word it sees, in order"""
+        words_seen = {}
+
+        list(rank_stream(self.puzzles, words_seen=words_seen))
+
+        self.assertEqual(
+            list(words_seen),
+            list(dict.fromkeys(word for words in self.puzzles for word in words)),
+        )
+
+
+class TestFilterCollisions(unittest.TestCase):
+    """Tests for leaving out puzzles which share their clues"""
+
+    def test_filter_collisions(self):
+        """only puzzles with at most max_collisions should be kept, in order"""
+        puzzles = TestRankStream.puzzles[:5]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "collisions")
+            np.array([0, 2, 1, 0, 3], dtype="<u4").tofile(fname)
+
+            self.assertEqual(
+                list(filter_collisions(puzzles, fname)), [puzzles[0], puzzles[3]]
+            )
+            self.assertEqual(list(filter_collisions(puzzles, fname, 2)), puzzles[:4])
+            with self.assertRaises(ValueError):
+                list(filter_collisions(puzzles[:4], fname))
+            with self.assertRaises(ValueError):
+                list(filter_collisions(puzzles * 2, fname))
@@ -0,0 +1,294 @@
+"""Plan a season of puzzles, one a day, from the top of a ranked puzzle list
+with no word used again within a window of days, and no puzzle used before, e.g.,
+  python puzzleschedule.py -i puzzles_4x4_sorted.txt --min-score 10 --days 90 \\
+    --window 30 --history ../current.txt -r 1 12 -o schedule_4x4.txt
+which saves a puzzle for each date, one per line, e.g.,
+  2024-06-01 BACK,BEST,KIND,TOLD
+  2024-06-02 FELT,FORD,TANK,DISK
+Puzzles are picked uniformly at random (the same way for the same start date) from
+those still allowed. An inverted index of the puzzles each word is in keeps, for every
+puzzle, how many of its words were used in the window, so using (or forgetting) a word
+only touches the puzzles with that word in them
+"""
+
+import argparse
+import datetime
+import os
+import random
+from collections import deque
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from puzzlecorpus import read_puzzles
+from puzzlegen import transpose
+from puzzlehistory import History
+from puzzlepick import MAX_PICKS, open_puzzles, select_top
+from puzzlesolve import default_solver
+
+
+def word_index(ids: np.ndarray, n_words: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverted index of an (M, 4) array of word ids, as (offsets, puzzle ids),
+    where the puzzles with word w are puzzle_ids[offsets[w] : offsets[w + 1]]
+    """
+    flat = ids.ravel()
+    order = np.argsort(flat, kind="stable")
+    puzzle_ids = (order // ids.shape[1]).astype(np.int64)
+    offsets = np.zeros(n_words + 1, dtype=np.int64)
+    np.cumsum(np.bincount(flat, minlength=n_words), out=offsets[1:])
+    return offsets, puzzle_ids
+
+
+class Scheduler:
+    """Picks puzzles (given as an (M, 4) array of word ids) one day at a time
+    e.g.,
+      scheduler = Scheduler(ids, n_words, window=30)
+      scheduler.use(history_ids)  # puzzles from before, oldest first
+      scheduler.pick() -> index of the next puzzle
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        n_words: int,
+        window: int,
+        rng: random.Random = random,
+        is_allowed: Callable[[int], bool] = None,
+    ):
+        """
+        Args:
+            window (int): Puzzles (one a day) before a word can be used again.
+                0 for no limit.
+            is_allowed (Callable[[int], bool], optional): Checked for each puzzle
+                before it is picked, e.g., that it has one solution. Defaults to None.
+        """
+        self.ids = ids
+        self.window = window
+        self.rng = rng
+        self.is_allowed = is_allowed
+        self.offsets, self.puzzle_ids = word_index(ids, n_words)
+        # how many words of each puzzle were used in the window
+        self.blocked = np.zeros(len(ids), dtype=np.int32)
+        # puzzles used (or not allowed), which are never picked
+        self.used = np.zeros(len(ids), dtype=bool)
+        # word ids of each day in the window, oldest first
+        self._recent = deque()
+
+    def _block(self, word_ids: Iterable[int], change: int):
+        for word in word_ids:
+            puzzles = self.puzzle_ids[self.offsets[word] : self.offsets[word + 1]]
+            self.blocked[puzzles] += change
+
+    def use(self, word_ids: Tuple[int, ...], index: int = None):
+        """Use a puzzle (as word ids, and its index if it is in ids) for the next day"""
+        if index is not None:
+            self.used[index] = True
+        if self.window <= 0:
+            return
+        word_ids = [word for word in word_ids if word >= 0]
+        self._recent.append(word_ids)
+        self._block(word_ids, 1)
+        if len(self._recent) > self.window:
+            self._block(self._recent.popleft(), -1)
+
+    def available(self, index: int) -> bool:
+        """Whether a puzzle can be picked now"""
+        return not self.used[index] and self.blocked[index] == 0
+
+    def pick(self) -> int:
+        """Pick a puzzle uniformly at random from those which can be, and use it
+
+        Raises:
+            ValueError: if there are no puzzles left to pick
+        """
+        for _ in range(MAX_PICKS):
+            index = self.rng.randrange(len(self.ids))
+            if self.available(index) and self._allowed(index):
+                self.use(self.ids[index], index)
+                return index
+        # most are used or blocked, so pick from the rest directly
+        while True:
+            indices = np.flatnonzero(~self.used & (self.blocked == 0))
+            if not len(indices):
+                raise ValueError("No puzzles left to pick, try a smaller window")
+            index = int(indices[self.rng.randrange(len(indices))])
+            if self._allowed(index):
+                self.use(self.ids[index], index)
+                return index
+
+    def _allowed(self, index: int) -> bool:
+        if self.is_allowed is None or self.is_allowed(index):
+            return True
+        self.used[index] = True
+        return False
+
+
+def read_history(fnames: List[str]) -> List[List[str]]:
+    """Puzzles used before, oldest first, from files with one puzzle per line
+    as comma-separated words, optionally after a date (e.g., a schedule, or next.txt),
+    or puzzle histories (ending in .db, see puzzlehistory.py)
+    """
+    history = []
+    for fname in fnames:
+        if fname.endswith(".db"):
+            with History(fname) as puzzle_history:
+                history += [entry["words"] for entry in puzzle_history]
+            continue
+        with open(fname, "r", encoding="utf-8") as f:
+            history += [line.split()[-1].split(",") for line in f if line.strip()]
+    return history
+
+
+def schedule(
+    puzzles_wordy: Iterable[List[str]],
+    days: int,
+    window: int,
+    history: List[List[str]] = (),
+    rng: random.Random = random,
+    reveal: List[int] = None,
+) -> List[List[str]]:
+    """Plan days of puzzles from puzzles_wordy, see Scheduler
+    with reveal, only picks puzzles which have one solution with those letters revealed
+    history puzzles of another size (e.g., 3x3 puzzles in current.txt when planning
+    4x4 puzzles) are left out, so the window is days of puzzles of this size
+    """
+    word_ids: Dict[str, int] = {}
+    ids = np.array(
+        [
+            [word_ids.setdefault(word, len(word_ids)) for word in words]
+            for words in puzzles_wordy
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    words = list(word_ids)
+    is_allowed = None
+    if reveal is not None and len(ids):
+        solver = default_solver(len(words[ids[0, 0]]), len(words[ids[0, 1]]))
+
+        def is_allowed(index: int) -> bool:
+            return solver.is_unique([words[i] for i in ids[index]], reveal)
+
+    scheduler = Scheduler(ids, len(words), window, rng, is_allowed)
+    puzzle_index = {}
+    if len(ids):
+        size = [len(words[i]) for i in ids[0]]
+        history = [puzzle for puzzle in history if list(map(len, puzzle)) == size]
+    if history:
+        puzzle_index = {tuple(puzzle): i for i, puzzle in enumerate(ids.tolist())}
+    for puzzle in history:
+        # words not in the list can't block anything
+        puzzle_ids = tuple(word_ids.get(word, -1) for word in puzzle)
+        scheduler.use(puzzle_ids, puzzle_index.get(puzzle_ids))
+        # its transpose is the same grid, so is not new either
+        transposed = puzzle_index.get(tuple(transpose(puzzle_ids)))
+        if transposed is not None:
+            scheduler.used[transposed] = True
+    return [[words[i] for i in ids[scheduler.pick()]] for _ in range(days)]
+
+
+def main(
+    fname: str,
+    days: int,
+    window: int,
+    start: str = None,
+    history: List[str] = (),
+    top: int = None,
+    min_score: int = None,
+    reveal: List[int] = None,
+    out_file: str = None,
+):
+    """main
+    the schedule starts tomorrow unless start is given, and the same start date (and
+    puzzle list) always gives the same schedule
+    """
+    if start is None:
+        start = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+    start_date = datetime.date.fromisoformat(start)
+    with open_puzzles(fname) as puzzles:
+        if top is None:
+            top = select_top(puzzles.metadata, len(puzzles), min_score)
+    rng = random.Random(f"{start} {os.path.basename(fname)}")
+    puzzles_wordy = islice(read_puzzles(fname), top)
+    plan = schedule(puzzles_wordy, days, window, read_history(history), rng, reveal)
+    lines = [
+        f"{start_date + datetime.timedelta(days=day)} {','.join(words)}\n"
+        for day, words in enumerate(plan)
+    ]
+    if out_file:
+        with open(out_file, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+    else:
+        print("".join(lines), end="")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-i",
+        "--input",
+        help="Ranked puzzles, as a binary corpus or comma-separated words",
+        required=True,
+    )
+    parser.add_argument(
+        "-n",
+        "--days",
+        type=int,
+        required=True,
+        help="Number of days to plan",
+    )
+    parser.add_argument(
+        "-w",
+        "--window",
+        type=int,
+        default=30,
+        help="Days before a word can be used again. 0 for no limit",
+    )
+    parser.add_argument(
+        "-d",
+        "--start",
+        help="First date to plan, e.g., 2024-06-01. Defaults to tomorrow",
+    )
+    parser.add_argument(
+        "--history",
+        nargs="+",
+        default=[],
+        help="Files of puzzles used before, oldest first, e.g., an old schedule, "
+        "or a puzzle history (.db)",
+    )
+    parser.add_argument(
+        "-t",
+        "--top",
+        type=int,
+        help="Pick from this many puzzles at the top of the list",
+    )
+    parser.add_argument(
+        "-s",
+        "--min-score",
+        type=int,
+        help="Pick from puzzles with at least this many unique letters",
+    )
+    parser.add_argument(
+        "-r",
+        "--reveal",
+        nargs="+",
+        type=int,
+        help="Only pick puzzles with one solution when these indices are revealed",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to save the schedule to",
+    )
+    args = parser.parse_args()
+    main(
+        args.input,
+        args.days,
+        args.window,
+        args.start,
+        args.history,
+        args.top,
+        args.min_score,
+        args.reveal,
+        args.output,
+    )
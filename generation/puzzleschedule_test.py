@@ -0,0 +1,86 @@
+"""Tests for puzzleschedule.py"""
+
+import random
+import unittest
+import numpy as np
+from puzzle import load_words
+from puzzlegen import generate, transpose
+from puzzleschedule import schedule, word_index
+from puzzlesolve import default_solver
+
+
+class TestSchedule(unittest.TestCase):
+    """Tests for planning puzzles with no words reused in a window"""
+
+    puzzles = generate(load_words("4")[:300])
+
+    def test_word_index(self):
+        """word_index should give every puzzle each word is in"""
+        ids = np.array([[0, 1, 2, 3], [0, 4, 5, 1], [6, 4, 2, 7]])
+
+        offsets, puzzle_ids = word_index(ids, 9)
+
+        for word in range(9):
+            self.assertEqual(
+                sorted(puzzle_ids[offsets[word] : offsets[word + 1]].tolist()),
+                [i for i, puzzle in enumerate(ids.tolist()) if word in puzzle],
+            )
+
+    def test_no_words_reused_in_window(self):
+        """no word should be used again within the window, and no puzzle at all,
+        including those in the history"""
+        history = self.puzzles[:5]
+        for window in [0, 1, 10]:
+            with self.subTest(window=window):
+                plan = schedule(self.puzzles, 60, window, history, random.Random(0))
+
+                days = history + plan
+                self.assertEqual(len(plan), 60)
+                self.assertEqual(len(set(map(tuple, days))), len(days))
+                for day in range(len(history), len(days)):
+                    window_days = days[max(0, day - window) : day]
+                    recent = {word for words in window_days for word in words}
+                    self.assertFalse(recent & set(days[day]))
+
+    def test_history_transposes(self):
+        """a puzzle used before should not be picked as its transpose either"""
+        puzzles = generate(load_words("4")[:300], canonical=True)
+        history = [transpose(puzzle) for puzzle in puzzles[:-10]]
+
+        plan = schedule(puzzles, 10, 0, history, random.Random(0))
+
+        self.assertCountEqual(plan, puzzles[-10:])
+
+    def test_history_other_sizes(self):
+        """history puzzles of another size (e.g., 3x3 puzzles between 4x4 ones, as in
+        current.txt) should not take up the window"""
+        history = []
+        for words in self.puzzles[:10]:
+            history += [["HIT", "HUM", "TOP", "MAP"], words]
+
+        plan = schedule(self.puzzles, 60, 10, history, random.Random(0))
+
+        days = self.puzzles[:10] + plan
+        for day in range(10, len(days)):
+            recent = {word for words in days[day - 10 : day] for word in words}
+            self.assertFalse(recent & set(days[day]))
+
+    def test_same_for_same_seed(self):
+        """the same random state should give the same schedule"""
+        self.assertEqual(
+            schedule(self.puzzles, 20, 5, rng=random.Random("2024-06-01")),
+            schedule(self.puzzles, 20, 5, rng=random.Random("2024-06-01")),
+        )
+
+    def test_reveal(self):
+        """with reveal, only puzzles with one solution should be picked"""
+        solver = default_solver(4)
+
+        plan = schedule(self.puzzles[::20], 10, 3, rng=random.Random(0), reveal=[1, 12])
+
+        self.assertTrue(all(solver.is_unique(words, [1, 12]) for words in plan))
+
+    def test_not_enough_puzzles(self):
+        """planning more days than there are puzzles should fail"""
+        with self.assertRaises(ValueError):
+            schedule(self.puzzles[:10], 11, 0)
@@ -0,0 +1,290 @@
+"""A long-running local puzzle server, which loads word lists and puzzle lists once,
+and answers requests from memory, e.g., for the cron jobs and editors
+  python puzzleserver.py --preload puzzles_3x3_sorted.txt puzzles_4x4_sorted.txt
+then ask it with puzzleclient.py. Requests and responses are one JSON object per line,
+over a Unix socket (see puzzleclient.py), with the ops
+  ping                                      -> "pong"
+  pick (input, top, min_score, date, reveal) -> words, see puzzlepick.py
+  metrics (words)                           -> dots and dashes
+  validate (words, reveal)                  -> {"valid": ..., "error": ...}
+  solve (words, reveal)                     -> every solution, see puzzlesolve.py
+  yaml (lines, reveal, timings)             -> YAML document, see puzzleyaml.py
+Connections are served concurrently, and picking, solving and YAML (which can solve
+puzzles, for "auto" reveals) run on a pool of worker processes, each with its own
+warm word lists and puzzle lists
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from puzzle import RingGeometry
+from puzzleclient import SOCKET_FNAME
+from puzzlepick import open_puzzles, pick_puzzle
+from puzzlesolve import default_solver, puzzle_clues
+from puzzleyaml import (
+    WORDLIST,
+    dump,
+    main_batch,
+    read_jobs,
+    timed,
+    validate_reveal,
+    validate_words,
+)
+
+# ops which can take a while, so run on the worker pool
+POOL_OPS = {"pick", "solve", "yaml"}
+# puzzle lists opened so far, fname -> ((size, mtime), puzzles)
+_puzzle_lists: Dict[str, Tuple[Tuple[int, int], Sequence]] = {}
+
+
+def puzzle_list(fname: str) -> Sequence:
+    """Open a puzzle list (see puzzlepick.open_puzzles) once, or again if it changed"""
+    stat = os.stat(fname)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _puzzle_lists.get(fname)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    if cached is not None:
+        cached[1].close()
+    puzzles = open_puzzles(fname)
+    _puzzle_lists[fname] = (key, puzzles)
+    return puzzles
+
+
+def _check_words(words: List[str]) -> List[str]:
+    valid, error = validate_words(words)
+    if not valid:
+        raise ValueError(f"{error}. words: {words}")
+    return words
+
+
+def _check_reveal(reveal: Any, words: List[str]) -> List[int]:
+    if not isinstance(reveal, list):
+        raise ValueError(f"Reveal must be a list of indices. reveal: {reveal}")
+    valid, error = validate_reveal(reveal, RingGeometry.of_words(words).n_cells)
+    if not valid:
+        raise ValueError(f"{error}. reveal: {reveal}")
+    return reveal
+
+
+def op_ping() -> str:
+    """Check the server is running"""
+    return "pong"
+
+
+def op_pick(
+    input: str,  # pylint: disable=redefined-builtin
+    top: int = None,
+    min_score: int = None,
+    date: str = None,
+    reveal: List[int] = None,
+) -> List[str]:
+    """Pick a puzzle from the puzzle list in input, see puzzlepick.pick_puzzle"""
+    puzzles = puzzle_list(input)
+    if reveal is not None and len(puzzles):
+        _check_reveal(reveal, puzzles[0])
+    return pick_puzzle(puzzles, input, top, min_score, date, reveal)
+
+
+def op_metrics(words: List[str]) -> Dict[str, List[int]]:
+    """Dots and dashes of the puzzle made from words"""
+    return WORDLIST.get_metrics(_check_words(words))
+
+
+def op_validate(words: List[str], reveal: List[int] = None) -> Dict[str, Any]:
+    """Whether words make a puzzle, and reveal (if given) is in it"""
+    valid, error = validate_words(words)
+    if valid and isinstance(reveal, list):
+        valid, error = validate_reveal(reveal, RingGeometry.of_words(words).n_cells)
+    return {"valid": valid, "error": error}
+
+
+def op_solve(words: List[str], reveal: List[int]) -> List[List[str]]:
+    """Every solution of the puzzle made from words, with reveal revealed"""
+    solver = default_solver(len(_check_words(words)[0]), len(words[1]))
+    reveal = _check_reveal(reveal, words)
+    metrics, unsolved = puzzle_clues(words, reveal, solver.wordlist)
+    return list(solver.solve(metrics, unsolved))
+
+
+def op_yaml(lines: List[str], reveal: Any = None, timings: bool = False) -> Any:
+    """YAML document of many puzzles, one per line (see puzzleyaml.parse_job)
+    with timings, as {"yaml": document, "timings": seconds in each stage}
+    """
+    if not timings:
+        return dump(main_batch(read_jobs(lines, reveal)))
+    stage_timings = {}
+    with timed(stage_timings, "read"):
+        jobs = read_jobs(lines, reveal)
+    puzzles = main_batch(jobs, stage_timings)
+    with timed(stage_timings, "dump"):
+        document = dump(puzzles)
+    return {"yaml": document, "timings": stage_timings}
+
+
+OPS: Dict[str, Callable] = {
+    "ping": op_ping,
+    "pick": op_pick,
+    "metrics": op_metrics,
+    "validate": op_validate,
+    "solve": op_solve,
+    "yaml": op_yaml,
+}
+
+
+def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer a request, as {"result": ...}, or {"error": ...} if it can't be"""
+    try:
+        params = dict(request)
+        op = OPS[params.pop("op")]
+    except (KeyError, TypeError, ValueError):
+        return {"error": f"Unknown op, must be one of {sorted(OPS)}"}
+    try:
+        return {"result": op(**params)}
+    except (ValueError, TypeError, IndexError, OSError) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # a bug, or a payload no op expects, which should not stop the server
+        print(f"Error answering {request}", file=sys.stderr)
+        traceback.print_exc()
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def warm(preload: List[str]):
+    """Open puzzle lists, and load the word lists for their sizes, before any requests"""
+    for fname in preload:
+        puzzles = puzzle_list(os.path.abspath(fname))
+        if len(puzzles):
+            default_solver(len(puzzles[0][0]), len(puzzles[0][1]))
+
+
+class PuzzleServer:
+    """Serves requests (see handle) on a Unix socket, one JSON object per line
+    e.g.,
+      server = PuzzleServer("puzzleserver.sock", jobs=2)
+      asyncio.run(server.serve_forever())
+    With jobs 0, pool ops run on a thread instead of worker processes
+    """
+
+    def __init__(self, socket_fname: str = SOCKET_FNAME, jobs: int = 1, preload=()):
+        self.socket_fname = socket_fname
+        self.preload = list(preload)
+        self.jobs = jobs
+        self._server = None
+        self._executor: Executor = None
+
+    async def start(self):
+        """Warm up, and start listening"""
+        warm(self.preload)
+        if self.jobs > 0:
+            self._executor = ProcessPoolExecutor(
+                self.jobs, initializer=warm, initargs=(self.preload,)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(1)
+        if os.path.exists(self.socket_fname):
+            os.remove(self.socket_fname)
+        self._server = await asyncio.start_unix_server(
+            self._serve_connection, path=self.socket_fname
+        )
+
+    async def close(self):
+        """Stop listening, and shut down the worker pool"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if os.path.exists(self.socket_fname):
+            os.remove(self.socket_fname)
+
+    async def serve_forever(self):
+        """Start, and serve until cancelled (e.g., with Ctrl+C)"""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a request, on the worker pool if it can take a while"""
+        if isinstance(request, dict) and request.get("op") in POOL_OPS:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, handle, request)
+        return handle(request)
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.answer(json.loads(line))
+                except json.JSONDecodeError:
+                    response = {"error": "Requests must be one JSON object per line"}
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve_until_stopped(server: PuzzleServer):
+    """Serve until Ctrl+C or SIGTERM, then clean up (e.g., remove the socket)"""
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+
+
+def main(socket_fname: str = SOCKET_FNAME, jobs: int = 1, preload: List[str] = ()):
+    """main"""
+    server = PuzzleServer(socket_fname, jobs, preload)
+    print(f"Serving on {socket_fname}", flush=True)
+    try:
+        asyncio.run(_serve_until_stopped(server))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-s",
+        "--socket",
+        default=SOCKET_FNAME,
+        help="Unix socket to listen on",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes to pick, solve and make YAML with. "
+        "0 for a thread in the server",
+    )
+    parser.add_argument(
+        "-p",
+        "--preload",
+        nargs="+",
+        default=[],
+        help="Puzzle lists to open (and load the word lists for) when starting",
+    )
+    args = parser.parse_args()
+    main(args.socket, args.jobs, args.preload)
@@ -0,0 +1,139 @@
+"""Tests for puzzleserver.py and puzzleclient.py"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from puzzleclient import ServerError, request
+from puzzlepick import main as puzzlepick
+from puzzleserver import PuzzleServer, handle
+from puzzlesolve import main as puzzlesolve
+from puzzleyaml import main as puzzleyaml
+
+BIRD = ["BIRD", "BORN", "DOVE", "NOSE"]
+
+
+class TestServer(unittest.TestCase):
+    """Tests for answering requests over a socket"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        cls.puzzles_fname = os.path.join(cls.tmpdir.name, "puzzles.txt")
+        with open(cls.puzzles_fname, "w", encoding="utf-8") as f:
+            f.write("BIRD,BORN,DOVE,NOSE\nBACK,BEST,KIND,TOLD\nBACK,BIRD,KENT,DUST\n")
+        cls.socket_fname = os.path.join(cls.tmpdir.name, "puzzleserver.sock")
+        # serve from a thread, with pool ops on another thread (jobs 0)
+        cls.server = PuzzleServer(cls.socket_fname, jobs=0, preload=[cls.puzzles_fname])
+        cls.loop = asyncio.new_event_loop()
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+        asyncio.run_coroutine_threadsafe(cls.server.start(), cls.loop).result()
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.server.close(), cls.loop).result()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        cls.loop.close()
+        cls.tmpdir.cleanup()
+
+    def request(self, payload):
+        """Send a request to the test server"""
+        return request(payload, self.socket_fname)
+
+    def test_same_as_scripts(self):
+        """requests should give the same answers as the scripts"""
+        words = ["BIRD", "BORN", "DOVE", "NOSE"]
+        metrics = puzzleyaml(words, [0])
+        del metrics["letters"]
+
+        self.assertEqual(self.request({"op": "ping"}), "pong")
+        self.assertEqual(
+            self.request(
+                {"op": "pick", "input": self.puzzles_fname, "date": "2024-06-01"}
+            ),
+            puzzlepick(self.puzzles_fname, date="2024-06-01"),
+        )
+        self.assertEqual(
+            self.request({"op": "solve", "words": words, "reveal": [0]}),
+            puzzlesolve(words, [0]),
+        )
+        self.assertEqual(self.request({"op": "metrics", "words": words}), metrics)
+        self.assertIn(
+            "dots-top: [6, 2, 5, 6]",
+            self.request(
+                {
+                    "op": "yaml",
+                    "lines": ["BIRD,BORN,DOVE,NOSE 1 12", "HIT,HUM,TOP,MAP auto"],
+                }
+            ),
+        )
+
+    def test_concurrent(self):
+        """many clients at once should all be answered"""
+        payloads = [
+            {"op": "solve", "words": ["BACK", "BEST", "KIND", "TOLD"], "reveal": [0]},
+            {"op": "ping"},
+        ] * 8
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(self.request, payloads))
+
+        self.assertEqual(results[1::2], ["pong"] * 8)
+        self.assertTrue(all(results[0] == result for result in results[::2]))
+
+    def test_validate(self):
+        """validate should say what is wrong with words and reveals"""
+        self.assertEqual(
+            self.request({"op": "validate", "words": ["BIRD", "BORN", "DOVE", "NOSE"]}),
+            {"valid": True, "error": ""},
+        )
+        self.assertFalse(
+            self.request(
+                {"op": "validate", "words": ["HIT", "HUM", "TOP", "MAP"], "reveal": [9]}
+            )["valid"]
+        )
+
+    def test_errors(self):
+        """bad requests should be answered with an error, and not stop the server"""
+        for payload in [
+            {"op": "nope"},
+            {"op": "solve", "words": ["BIRD", "BORN", "DOVE", "HOSE"], "reveal": [0]},
+            {"op": "solve"},
+            {"op": "solve", "words": BIRD, "reveal": [99]},
+            {"op": "solve", "words": BIRD, "reveal": "auto"},
+            {"op": "pick", "input": self.puzzles_fname, "reveal": [99]},
+            {"op": "pick", "input": os.path.join(self.tmpdir.name, "missing.txt")},
+        ]:
+            with self.subTest(payload=payload):
+                with self.assertRaises(ServerError):
+                    self.request(payload)
+        self.assertEqual(self.request({"op": "ping"}), "pong")
+
+    def test_unexpected_errors(self):
+        """any exception from an op should be answered with an error"""
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(ServerError):
+                self.request({"op": "yaml", "lines": [123]})
+
+        self.assertIn("AttributeError", stderr.getvalue())
+        self.assertEqual(self.request({"op": "ping"}), "pong")
+
+    def test_handle(self):
+        """handle should answer requests without a server"""
+        self.assertEqual(handle({"op": "ping"}), {"result": "pong"})
+        self.assertIn("error", handle(["ping"]))
+
+    def test_yaml_timings(self):
+        """yaml with timings should also give the seconds spent in each stage"""
+        lines = ["BIRD,BORN,DOVE,NOSE 1 12"]
+
+        result = handle({"op": "yaml", "lines": lines, "timings": True})["result"]
+
+        self.assertEqual(result["yaml"], handle({"op": "yaml", "lines": lines})["result"])
+        self.assertIn("dump", result["timings"])
@@ -0,0 +1,197 @@
+"""Find ambiguous puzzles in a whole puzzle list at once
+Two puzzles with the same clues (dots/dashes, and revealed letters) are each a second
+solution of the other. So each puzzle gets a signature of its clues, e.g., for
+  BIRD,BORN,DOVE,NOSE with 1 and 12 revealed
+the bytes of
+  dots-top, dots-left, dashes-right, dashes-bottom, revealed letter codes
+  6 2 5 6   9 0 5 5    3 6 2 4       6 3 1 5        1 4
+and puzzles are grouped by signature to count, for each puzzle, how many others share
+its clues. Signatures are spilled to partition files by hash, and each partition is
+counted on its own, so memory stays bounded however many puzzles there are.
+Counts are saved as one little-endian uint32 per puzzle, in the order of the puzzle list
+  python puzzlesignature.py -i puzzles_4x4.txt -r 1 12 -o puzzles_4x4.collisions
+A puzzle list without transposes (as puzzlegen.py saves square puzzles) is still
+missing puzzles which can share clues, so then each puzzle's transpose is counted too,
+but given no count of its own. Lists without transposes are found by every puzzle being
+canonical (see puzzlegen.is_canonical), or say which with --transposes/--no-transposes
+"""
+
+import argparse
+import os
+import tempfile
+from itertools import islice
+from typing import List
+
+import numpy as np
+
+from puzzle import RingGeometry, get_puzzles_dashdot_metrics, words_to_codes
+from puzzlecorpus import read_puzzles
+from puzzlegen import is_canonical, transpose
+
+CHUNK_SIZE = 100000
+PARTITIONS = 64
+METRICS = ["dots-top", "dots-left", "dashes-right", "dashes-bottom"]
+# to hash signatures to partitions, as sum(byte * multiplier)
+HASH_MULTIPLIERS = (np.arange(1, 257, dtype=np.uint64) * 2654435761) % (1 << 32)
+# puzzle index of transposes, which are counted but not saved
+NO_INDEX = 0xFFFFFFFF
+
+
+def reveal_cells(reveal: List[int], n_cells: int) -> List[int]:
+    """Flat (0-based) cells revealed by reveal, as used by puzzle_to_puzzle_unsolved
+    e.g., reveal_cells([1, 12], 12) -> [0, 11]
+          reveal_cells([-1], 8) -> [0, 1, 2, 3, 4, 5, 6, 7]
+    """
+    if -1 in reveal:
+        return list(range(n_cells))
+    return sorted(set(i - 1 for i in reveal if 1 <= i <= n_cells))
+
+
+def signatures(
+    codes: np.ndarray, cells: List[int], geometry: RingGeometry = None
+) -> np.ndarray:
+    """Clue signatures of many puzzles, given as an (M, cells) array of letter codes
+    (see words_to_codes), as an (M, K) array of bytes, one row per puzzle
+    Puzzles are square unless geometry is given
+    """
+    metrics = get_puzzles_dashdot_metrics(codes, geometry)
+    return np.concatenate(
+        [metrics[name] for name in METRICS] + [codes[:, cells]], axis=1
+    ).astype(np.uint8)
+
+
+def count_collisions(
+    fname: str,
+    reveal: List[int],
+    out_fname: str,
+    chunk_size: int = CHUNK_SIZE,
+    partitions: int = PARTITIONS,
+    transposes: bool = None,
+) -> int:
+    """For every puzzle in fname, count the other puzzles with the same clues,
+    and save the counts to out_fname
+    with transposes, the transposes of the puzzles (not in fname) are counted as others
+    by default (None), they are if the puzzles are square and every one is canonical
+
+    Returns:
+        int: number of puzzles with at least one collision
+
+    Raises:
+        ValueError: if transposes, and the puzzles are not square
+    """
+    puzzles = read_puzzles(fname)
+    n_puzzles = 0
+    width = None
+    # until a puzzle which is not canonical is seen, with transposes None
+    canonical = transposes is not False
+    with tempfile.TemporaryDirectory() as tmpdir:
+        parts = [os.path.join(tmpdir, f"part_{p}.bin") for p in range(partitions)]
+        part_files = [open(part, "wb") for part in parts]  # pylint: disable=consider-using-with
+        # spill (puzzle index, signature) records to partition files by signature hash
+        while True:
+            chunk = list(islice(puzzles, chunk_size))
+            if not chunk:
+                break
+            indices = np.arange(n_puzzles, n_puzzles + len(chunk), dtype="<u4")
+            n_puzzles += len(chunk)
+            square = len(chunk[0][0]) == len(chunk[0][1])
+            if transposes and not square:
+                raise ValueError("Only square puzzles have transposes")
+            if canonical and transposes is None:
+                canonical = square and all(is_canonical(words) for words in chunk)
+            if canonical:
+                # not those which are their own transpose, which would count twice
+                transposed = [transpose(words) for words in chunk]
+                extra = [t for words, t in zip(chunk, transposed) if t != words]
+                chunk += extra
+                indices = np.concatenate(
+                    [indices, np.full(len(extra), NO_INDEX, dtype="<u4")]
+                )
+            codes = words_to_codes(chunk)
+            geometry = RingGeometry.of_words(chunk[0])
+            sigs = signatures(codes, reveal_cells(reveal, geometry.n_cells), geometry)
+            width = sigs.shape[1]
+            records = np.concatenate([indices.view(np.uint8).reshape(-1, 4), sigs], axis=1)
+            hashes = (sigs.astype(np.uint64) * HASH_MULTIPLIERS[:width]).sum(axis=1)
+            hashes %= partitions
+            for p in np.unique(hashes):
+                part_files[p].write(records[hashes == p].tobytes())
+        for f in part_files:
+            f.close()
+
+        if n_puzzles == 0:
+            open(out_fname, "wb").close()  # pylint: disable=consider-using-with
+            return 0
+
+        # count each partition on its own
+        out = np.memmap(out_fname, dtype="<u4", mode="w+", shape=(n_puzzles,))
+        n_ambiguous = 0
+        for part in parts:
+            records = np.fromfile(part, dtype=np.uint8).reshape(-1, 4 + width)
+            if not len(records):
+                continue
+            indices = records[:, :4].copy().view("<u4").ravel()
+            sigs = np.ascontiguousarray(records[:, 4:]).view(f"V{width}").ravel()
+            listed = indices != NO_INDEX
+            if not canonical:
+                # transposes spilled before a puzzle which is not canonical was seen
+                sigs, indices = sigs[listed], indices[listed]
+                listed = listed[listed]
+                if not len(sigs):
+                    continue
+            _, inverse, counts = np.unique(sigs, return_inverse=True, return_counts=True)
+            counts = counts[inverse] - 1
+            out[indices[listed]] = counts[listed]
+            n_ambiguous += int(np.sum(counts[listed] > 0))
+        out.flush()
+        del out
+    return n_ambiguous
+
+
+def read_collisions(fname: str) -> np.ndarray:
+    """Read collision counts saved by count_collisions, one per puzzle"""
+    return np.fromfile(fname, dtype="<u4")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-i",
+        "--input",
+        help="Puzzles, as a binary corpus or comma-separated words",
+        required=True,
+    )
+    parser.add_argument(
+        "-r",
+        "--reveal",
+        nargs="+",
+        type=int,
+        help="List of indices to reveal. -1 for all. 0 for none.",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to save the collision count of each puzzle to",
+        required=True,
+    )
+    transposes_group = parser.add_mutually_exclusive_group()
+    transposes_group.add_argument(
+        "-t",
+        "--transposes",
+        action="store_true",
+        default=None,
+        help="Also count each puzzle's transpose, for lists saved without them. "
+        "Defaults to if every puzzle is canonical (see puzzlegen.is_canonical)",
+    )
+    transposes_group.add_argument(
+        "--no-transposes",
+        action="store_false",
+        dest="transposes",
+        help="Don't count transposes, for full lists (e.g., puzzlegen.py --transposes)",
+    )
+    args = parser.parse_args()
+    n_ambiguous = count_collisions(
+        args.input, args.reveal, args.output, transposes=args.transposes
+    )
+    print(f"{n_ambiguous} puzzles share their clues with another puzzle")
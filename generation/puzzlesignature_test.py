@@ -0,0 +1,93 @@
+"""Tests for puzzlesignature.py"""
+
+import os
+import tempfile
+import unittest
+from collections import Counter
+from puzzle import load_words
+from puzzlecorpus import write_corpus
+from puzzlegen import generate, is_canonical
+from puzzlesignature import count_collisions, read_collisions, reveal_cells
+from puzzlesolve import Solver, puzzle_clues
+
+
+class TestSignature(unittest.TestCase):
+    """Tests for counting puzzles which share their clues"""
+
+    def test_reveal_cells(self):
+        """reveal_cells should give 0-based flat cells"""
+        self.assertEqual(reveal_cells([1, 12], 12), [0, 11])
+        self.assertEqual(reveal_cells([0], 12), [])
+        self.assertEqual(reveal_cells([-1], 8), list(range(8)))
+
+    def test_same_as_grouping_clues(self):
+        """count_collisions should count the other puzzles with the same clues,
+        which are the other solutions found by the solver"""
+        all_words = load_words("4")[:120]
+        puzzles = generate(all_words)
+        solver = Solver(all_words)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "puzzles.bin")
+            write_corpus(puzzles, fname, all_words)
+            for reveal in [[0], [1, 12]]:
+                with self.subTest(reveal=reveal):
+                    clues = [repr(puzzle_clues(words, reveal)) for words in puzzles]
+                    by_clues = Counter(clues)
+                    out_fname = os.path.join(tmpdir, "collisions")
+
+                    # small chunks and few partitions, to spill more than once
+                    n_ambiguous = count_collisions(
+                        fname, reveal, out_fname, chunk_size=7, partitions=3
+                    )
+
+                    collisions = read_collisions(out_fname)
+                    self.assertEqual(list(collisions), [by_clues[c] - 1 for c in clues])
+                    self.assertEqual(n_ambiguous, sum(collisions > 0))
+                    self.assertGreater(n_ambiguous, 0)
+                    for i in range(0, len(puzzles), 50):
+                        self.assertEqual(
+                            collisions[i],
+                            solver.count(*puzzle_clues(puzzles[i], reveal)) - 1,
+                        )
+
+    def test_transposes(self):
+        """counting a list without transposes (with transposes, or found to be) should
+        give the same counts as for the full list"""
+        all_words = load_words("4")[:120]
+        puzzles = generate(all_words)
+        canonical = [i for i, puzzle in enumerate(puzzles) if is_canonical(puzzle)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "puzzles.bin")
+            canonical_fname = os.path.join(tmpdir, "canonical.bin")
+            write_corpus(puzzles, fname, all_words)
+            write_corpus([puzzles[i] for i in canonical], canonical_fname, all_words)
+            out_fname = os.path.join(tmpdir, "collisions")
+            canonical_out_fname = os.path.join(tmpdir, "canonical.collisions")
+
+            count_collisions(fname, [1, 12], out_fname, transposes=False)
+            expected = read_collisions(out_fname)[canonical]
+
+            # by default, as every puzzle is canonical
+            for transposes in [True, None]:
+                with self.subTest(transposes=transposes):
+                    n_ambiguous = count_collisions(
+                        canonical_fname,
+                        [1, 12],
+                        canonical_out_fname,
+                        chunk_size=7,
+                        transposes=transposes,
+                    )
+
+                    collisions = read_collisions(canonical_out_fname)
+                    self.assertEqual(list(collisions), list(expected))
+                    self.assertEqual(n_ambiguous, sum(expected > 0))
+
+    def test_empty(self):
+        """count_collisions should write no counts for no puzzles"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "puzzles.txt")
+            open(fname, "w", encoding="utf-8").close()
+            out_fname = os.path.join(tmpdir, "collisions")
+
+            self.assertEqual(count_collisions(fname, [1, 12], out_fname), 0)
+            self.assertEqual(len(read_collisions(out_fname)), 0)
@@ -0,0 +1,453 @@
+"""Solve ringram puzzles
+i.e., find every way to fill in a puzzle with words from a word list,
+which fits its clues (the dots and dashes, and the revealed letters)
+e.g., to check the puzzle made from
+  ["BIRD", "BORN", "DOVE", "NOSE"]
+with the corners revealed has only one solution
+  python puzzlesolve.py -w BIRD BORN DOVE NOSE -r 1 12
+Words are found by their (dots, dashes), so each side only ever looks at words
+with the right number of dots and dashes, which have the revealed letters
+To see how hard a puzzle is, Solver.effort solves it like a person might, by
+crossing off words which can't fit until it gets stuck, and only then guessing
+  python puzzlesolve.py -w BIRD BORN DOVE NOSE -r 1 12 --effort
+Only puzzles of words there are word lists for (3 and 4 letters, see
+puzzle.word_lengths) can be solved
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from puzzle import (
+    LETTER_DASHES,
+    LETTER_DOTS,
+    WordList,
+    RingGeometry,
+    flatten_puzzle,
+    load_words,
+    puzzle_to_puzzle_unsolved,
+    words_to_puzzle_solved,
+)
+
+
+def side_clues(metrics: Dict[str, List[int]]) -> List[Tuple[int, int]]:
+    """(dots, dashes) of each word [top, left, right, bottom] of a puzzle, from its metrics
+    e.g., for BIRD, BORN, DOVE, NOSE -> [(9, 3), (6, 6), (6, 5), (5, 4)]
+    """
+    return [
+        (metrics["dots-left"][0], metrics["dashes-right"][0]),
+        (metrics["dots-top"][0], metrics["dashes-bottom"][0]),
+        (metrics["dots-top"][-1], metrics["dashes-bottom"][-1]),
+        (metrics["dots-left"][-1], metrics["dashes-right"][-1]),
+    ]
+
+
+def revealed_letters(unsolved: List[List[str]]) -> List[Dict[int, str]]:
+    """Revealed letters of each word [top, left, right, bottom], by position in the word
+    Corners are only given for the top or bottom word, as they share them with the sides
+    e.g., for BIRD, BORN, DOVE, NOSE with 1 and 12 revealed
+      -> [{0: "B"}, {}, {}, {3: "E"}]
+    """
+    geometry = RingGeometry.of_puzzle(unsolved)
+    revealed = [{}, {}, {}, {}]
+    for cell, letter in enumerate(flatten_puzzle(unsolved)):
+        if letter:
+            revealed[geometry.cell_word[cell]][int(geometry.cell_letter[cell])] = letter
+    return revealed
+
+
+def puzzle_clues(
+    words: List[str], reveal: List[int], wordlist: WordList = None
+) -> Tuple[Dict[str, List[int]], List[List[str]]]:
+    """The clues for a puzzle, as (metrics, unsolved puzzle)"""
+    if wordlist is None:
+        wordlist = WordList()
+    unsolved = puzzle_to_puzzle_unsolved(words_to_puzzle_solved(words), reveal)
+    return wordlist.get_metrics(words), unsolved
+
+
+# [top, left, right, bottom]
+TOP, LEFT, RIGHT, BOTTOM = range(4)
+# weight of each effort counter in the difficulty of a puzzle, see difficulty
+DIFFICULTY_WEIGHTS = {"guesses": 100, "rounds": 10, "remaining": 1}
+
+
+def difficulty(effort: Dict[str, int]) -> int:
+    """Difficulty of a puzzle from the effort to solve it (see Solver.effort),
+    higher is harder. Guessing is worst, then needing many rounds of crossing off words,
+    then having many words left to choose from once stuck
+    """
+    return sum(weight * effort[name] for name, weight in DIFFICULTY_WEIGHTS.items())
+
+
+def _group(words: Iterable[str], key: Callable) -> Dict:
+    grouped = defaultdict(list)
+    for word in words:
+        grouped[key(word)].append(word)
+    return grouped
+
+
+class Solver:
+    """Finds every solution of puzzles, from a word list
+    e.g.,
+      solver = Solver(load_words("4"))
+      metrics, unsolved = puzzle_clues(["BIRD", "BORN", "DOVE", "NOSE"], [1, 12])
+      solver.count(metrics, unsolved) -> 1
+    """
+
+    def __init__(self, all_words: List[str], repeats: bool = False):
+        """
+        Args:
+            repeats (bool, optional): Allow word repeats in solutions. Defaults to False.
+        """
+        self.wordlist = WordList(all_words)
+        self.repeats = repeats
+        # (dots, dashes, length) -> words, so words of many lengths can fill a rectangle
+        self.by_dots_dashes = _group(
+            all_words, lambda word: (*self.wordlist.dots_dashes(word), len(word))
+        )
+
+    def candidates(
+        self, clue: Tuple[int, int], revealed: Dict[int, str], length: int
+    ) -> List[str]:
+        """Words of length with (dots, dashes) clue, and the revealed letters"""
+        return [
+            word
+            for word in self.by_dots_dashes.get((*clue, length), [])
+            if all(word[i] == letter for i, letter in revealed.items())
+        ]
+
+    def _domains(
+        self, metrics: Dict[str, List[int]], unsolved: List[List[str]]
+    ) -> List[List[str]]:
+        """Candidates for each side [top, left, right, bottom] of a puzzle"""
+        cols, rows = len(metrics["dots-top"]), len(metrics["dots-left"])
+        return [
+            self.candidates(clue, revealed, length)
+            for clue, revealed, length in zip(
+                side_clues(metrics), revealed_letters(unsolved), [cols, rows, rows, cols]
+            )
+        ]
+
+    def solve(
+        self, metrics: Dict[str, List[int]], unsolved: List[List[str]]
+    ) -> Iterator[List[str]]:
+        """Yield every solution of a puzzle, as words [top, left, right, bottom]"""
+        middle_cols = range(1, len(metrics["dots-top"]) - 1)
+        middle_rows = range(1, len(metrics["dots-left"]) - 1)
+        tops, lefts, rights, bottoms = self._domains(metrics, unsolved)
+        lefts_by_first = _group(lefts, lambda word: word[0])
+        rights_by_first = _group(rights, lambda word: word[0])
+        bottoms_by_ends = _group(bottoms, lambda word: (word[0], word[-1]))
+        dots_left, dashes_right = metrics["dots-left"], metrics["dashes-right"]
+        dots_top, dashes_bottom = metrics["dots-top"], metrics["dashes-bottom"]
+
+        for top in tops:
+            for left in lefts_by_first.get(top[0], []):
+                if not self.repeats and left == top:
+                    continue
+
+                for right in rights_by_first.get(top[-1], []):
+                    if not self.repeats and right in (top, left):
+                        continue
+                    # middle rows are a letter from left and right
+                    if any(
+                        LETTER_DOTS[left[i]] + LETTER_DOTS[right[i]] != dots_left[i]
+                        or LETTER_DASHES[left[i]] + LETTER_DASHES[right[i]]
+                        != dashes_right[i]
+                        for i in middle_rows
+                    ):
+                        continue
+
+                    for bottom in bottoms_by_ends.get((left[-1], right[-1]), []):
+                        if not self.repeats and bottom in (top, left, right):
+                            continue
+                        # middle columns are a letter from top and bottom
+                        if any(
+                            LETTER_DOTS[top[i]] + LETTER_DOTS[bottom[i]] != dots_top[i]
+                            or LETTER_DASHES[top[i]] + LETTER_DASHES[bottom[i]]
+                            != dashes_bottom[i]
+                            for i in middle_cols
+                        ):
+                            continue
+
+                        yield [top, left, right, bottom]
+
+    def _constraints(self, metrics: Dict[str, List[int]]) -> List[Tuple]:
+        """Constraints between pairs of words of a puzzle, as (a, b, key_a, key_b),
+        where a word of a fits a word of b if key_a(word_a) == key_b(word_b)
+        """
+        middle_cols = range(1, len(metrics["dots-top"]) - 1)
+        middle_rows = range(1, len(metrics["dots-left"]) - 1)
+        dots_left, dashes_right = metrics["dots-left"], metrics["dashes-right"]
+        dots_top, dashes_bottom = metrics["dots-top"], metrics["dashes-bottom"]
+
+        def first(word):
+            return word[0]
+
+        def last(word):
+            return word[-1]
+
+        def middle_letters(word):
+            return tuple(
+                (LETTER_DOTS[word[i]], LETTER_DASHES[word[i]])
+                for i in range(1, len(word) - 1)
+            )
+
+        # what the middle letters of the word opposite must be
+        def row_needs(word):
+            return tuple(
+                (
+                    dots_left[i] - LETTER_DOTS[word[i]],
+                    dashes_right[i] - LETTER_DASHES[word[i]],
+                )
+                for i in middle_rows
+            )
+
+        def column_needs(word):
+            return tuple(
+                (
+                    dots_top[i] - LETTER_DOTS[word[i]],
+                    dashes_bottom[i] - LETTER_DASHES[word[i]],
+                )
+                for i in middle_cols
+            )
+
+        return [
+            (TOP, LEFT, first, first),
+            (TOP, RIGHT, last, first),
+            (LEFT, BOTTOM, last, first),
+            (RIGHT, BOTTOM, last, last),
+            (LEFT, RIGHT, row_needs, middle_letters),
+            (TOP, BOTTOM, column_needs, middle_letters),
+        ]
+
+    def _propagate(
+        self, domains: List[List[str]], constraints: List[Tuple], counters: Dict[str, int]
+    ) -> bool:
+        """Cross off words (in place) which fit no word on another side, until none are
+        Returns:
+            bool: False if a side has no words left
+        """
+        changed = True
+        while changed:
+            counters["rounds"] += 1
+            changed = False
+            for a, b, key_a, key_b in constraints:
+                for x, y, key_x, key_y in [(a, b, key_a, key_b), (b, a, key_b, key_a)]:
+                    keys = {key_y(word) for word in domains[y]}
+                    kept = [word for word in domains[x] if key_x(word) in keys]
+                    if len(kept) < len(domains[x]):
+                        domains[x] = kept
+                        changed = True
+            if not self.repeats:
+                # a word known to be on one side can't be on another
+                for i, domain in enumerate(domains):
+                    if len(domain) != 1:
+                        continue
+                    for j, other in enumerate(domains):
+                        if j != i and domain[0] in other:
+                            domains[j] = [word for word in other if word != domain[0]]
+                            changed = True
+            if not all(domains):
+                return False
+        return True
+
+    def _search(
+        self,
+        domains: List[List[str]],
+        constraints: List[Tuple],
+        counters: Dict[str, int],
+        solutions: List[List[str]],
+    ):
+        """Propagate, then guess a word for the side with the fewest words left"""
+        if not self._propagate(domains, constraints, counters):
+            return
+        if all(len(domain) == 1 for domain in domains):
+            solutions.append([domain[0] for domain in domains])
+            return
+        counters["branches"] += 1
+        side = min(
+            (i for i, domain in enumerate(domains) if len(domain) > 1),
+            key=lambda i: len(domains[i]),
+        )
+        for word in domains[side]:
+            counters["guesses"] += 1
+            guess = list(domains)
+            guess[side] = [word]
+            self._search(guess, constraints, counters, solutions)
+
+    def effort(
+        self, metrics: Dict[str, List[int]], unsolved: List[List[str]]
+    ) -> Dict[str, int]:
+        """Solve a puzzle by crossing off words which can't fit (propagation), and only
+        guessing when stuck, counting the effort it took. Always the same for the same puzzle
+        Returns:
+            Dict[str, int]: counters of
+              candidates: words fitting the clues of each side, summed over the sides
+              remaining: words left on each side after the first propagation, summed
+              rounds: passes over every constraint, while propagating
+              branches: times propagation got stuck and a guess was needed
+              guesses: words guessed
+              solutions: solutions found
+        """
+        domains = self._domains(metrics, unsolved)
+        constraints = self._constraints(metrics)
+        counters = {"candidates": sum(map(len, domains))}
+        counters.update(rounds=0, branches=0, guesses=0)
+        if self._propagate(domains, constraints, counters):
+            counters["remaining"] = sum(map(len, domains))
+            solutions = []
+            self._search(domains, constraints, counters, solutions)
+            counters["solutions"] = len(solutions)
+        else:
+            counters.update(remaining=0, solutions=0)
+        return counters
+
+    def count(
+        self,
+        metrics: Dict[str, List[int]],
+        unsolved: List[List[str]],
+        limit: int = None,
+    ) -> int:
+        """Count solutions of a puzzle, stopping at limit if given"""
+        n_solutions = 0
+        for _ in self.solve(metrics, unsolved):
+            n_solutions += 1
+            if limit is not None and n_solutions >= limit:
+                break
+        return n_solutions
+
+    def is_unique(self, words: List[str], reveal: List[int]) -> bool:
+        """Whether the puzzle made from words, with reveal revealed, has one solution"""
+        metrics, unsolved = puzzle_clues(words, reveal, self.wordlist)
+        return self.count(metrics, unsolved, limit=2) == 1
+
+
+def default_solver(size: int, side_size: int = None) -> Solver:
+    """Solver for words of length size, from the word lists, made once per process
+    With side_size, the left and right words are side_size letters long, e.g., for 4x5
+    puzzles default_solver(5, 4)
+
+    Raises:
+        ValueError: if there is no word list for size or side_size
+    """
+    return _default_solver(size, size if side_size is None else side_size)
+
+
+@lru_cache(maxsize=None)
+def _default_solver(size: int, side_size: int) -> Solver:
+    all_words = load_words(str(size))
+    if side_size != size:
+        all_words += load_words(str(side_size))
+    return Solver(all_words)
+
+
+def differing_letters(words: List[str], solver: Solver = None) -> Set[int]:
+    """Solve the puzzle made from words once, with nothing revealed, and give a bitmask
+    for each other solution of the letters (flat cells) where it differs from words
+    Revealing letters only crosses off the other solutions which differ there,
+    so the puzzle has one solution with a set of letters revealed if every mask has
+    one of them (see reveal_mask)
+    """
+    if solver is None:
+        solver = default_solver(len(words[0]), len(words[1]))
+    metrics, unsolved = puzzle_clues(words, [0], solver.wordlist)
+    answer = flatten_puzzle(words_to_puzzle_solved(words))
+    differs = set()
+    for solution in solver.solve(metrics, unsolved):
+        letters = flatten_puzzle(words_to_puzzle_solved(solution))
+        mask = sum(1 << i for i, (a, b) in enumerate(zip(letters, answer)) if a != b)
+        if mask:
+            differs.add(mask)
+    return differs
+
+
+def reveal_mask(reveal: List[int], n_letters: int) -> int:
+    """Bitmask of the letters (flat cells) revealed by reveal
+    e.g., reveal_mask([1, 12], 12) -> 0b100000000001
+    """
+    if -1 in reveal:
+        return (1 << n_letters) - 1
+    return sum(1 << (i - 1) for i in set(reveal) if 1 <= i <= n_letters)
+
+
+def minimal_reveals(words: List[str], solver: Solver = None) -> List[List[int]]:
+    """Smallest sets of letters to reveal (as indices for puzzle_to_puzzle_unsolved),
+    which make the puzzle made from words have only one solution, e.g., [[1, 7], [2, 12]]
+    or [[0]] if it has only one solution with nothing revealed
+    The puzzle is only solved once (see differing_letters), then sets of letters are
+    checked from smallest to largest
+    """
+    differs = differing_letters(words, solver)
+    if not differs:
+        return [[0]]
+    n_letters = len(flatten_puzzle(words_to_puzzle_solved(words)))
+    # only letters which differ in some solution are worth revealing
+    useful = [i for i in range(n_letters) if any(mask >> i & 1 for mask in differs)]
+    for n_reveal in range(1, len(useful) + 1):
+        found = []
+        for cells in combinations(useful, n_reveal):
+            revealed = sum(1 << i for i in cells)
+            if all(mask & revealed for mask in differs):
+                found.append([i + 1 for i in cells])
+        if found:
+            return found
+    raise ValueError(f"Puzzle {words} has no solution with every letter revealed")
+
+
+def main(
+    words: List[str], reveal: List[int], verbose: bool = False, effort: bool = False
+) -> List[List[str]]:
+    """main"""
+    solver = default_solver(len(words[0]), len(words[1]))
+    metrics, unsolved = puzzle_clues(words, reveal, solver.wordlist)
+    solutions = list(solver.solve(metrics, unsolved))
+    if effort:
+        counters = solver.effort(metrics, unsolved)
+        for name, n in counters.items():
+            print(f"{name}: {n}")
+        print(f"difficulty: {difficulty(counters)}")
+    if verbose:
+        for solution in solutions:
+            print(",".join(solution))
+        print(f"{len(solutions)} solution(s)")
+    return solutions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-w",
+        "--words",
+        nargs="+",
+        help="List of words in the puzzle",
+        required=True,
+    )
+    parser.add_argument(
+        "-r",
+        "--reveal",
+        nargs="+",
+        type=int,
+        help="List of indices to reveal. -1 for all. 0 for none.",
+        required=True,
+    )
+    parser.add_argument(
+        "-u",
+        "--unique",
+        action="store_true",
+        help="Exit with an error if the puzzle does not have exactly one solution",
+    )
+    parser.add_argument(
+        "-e",
+        "--effort",
+        action="store_true",
+        help="Print the effort to solve the puzzle by propagation, and its difficulty",
+    )
+    args = parser.parse_args()
+    found = main(args.words, args.reveal, verbose=True, effort=args.effort)
+    if args.unique and len(found) != 1:
+        sys.exit(1)
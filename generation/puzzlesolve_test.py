@@ -0,0 +1,190 @@
+"""Tests for puzzlesolve.py"""
+
+import unittest
+from collections import defaultdict
+from itertools import combinations
+from puzzle import WordList, load_words
+from puzzlegen import generate
+from puzzlegen_test import TestGenerate
+from puzzlesolve import (
+    Solver,
+    default_solver,
+    difficulty,
+    minimal_reveals,
+    puzzle_clues,
+    revealed_letters,
+    side_clues,
+)
+
+
+class TestClues(unittest.TestCase):
+    """Tests for reading clues from metrics and unsolved puzzles"""
+
+    def test_side_clues(self):
+        """side_clues should give the (dots, dashes) of each word"""
+        wordlist = WordList()
+        words = ["BIRD", "BORN", "DOVE", "NOSE"]
+        metrics, _ = puzzle_clues(words, [1, 12])
+
+        clues = side_clues(metrics)
+
+        self.assertEqual(clues, [wordlist.dots_dashes(word) for word in words])
+
+    def test_revealed_letters(self):
+        """revealed_letters should give the revealed letters of each word,
+        with corners only in the top or bottom word"""
+        for words, reveal, expected in [
+            (
+                ["BIRD", "BORN", "DOVE", "NOSE"],
+                [1, 12],
+                [{0: "B"}, {}, {}, {3: "E"}],
+            ),
+            (
+                ["BIRD", "BORN", "DOVE", "NOSE"],
+                [2, 6, 7],
+                [{1: "I"}, {2: "R"}, {1: "O"}, {}],
+            ),
+            (
+                ["HIT", "HUM", "TOP", "MAP"],
+                [3, 7],
+                [{2: "T"}, {}, {}, {1: "A"}],
+            ),
+        ]:
+            with self.subTest(words=words, reveal=reveal):
+                _, unsolved = puzzle_clues(words, reveal)
+
+                self.assertEqual(revealed_letters(unsolved), expected)
+
+
+class TestSolver(unittest.TestCase):
+    """Tests for finding every solution of a puzzle"""
+
+    def test_solutions_same_as_brute_force(self):
+        """Solver.solve should find exactly the generated puzzles with the same clues"""
+        for size in ["4", "3"]:
+            # enough words for some puzzles to have more than one solution
+            all_words = load_words(size)[:120]
+            solver = Solver(all_words)
+            puzzles = generate(all_words)
+            for reveal in [[0], [1, 12]]:
+                with self.subTest(size=size, reveal=reveal):
+                    by_clues = defaultdict(list)
+                    for words in puzzles:
+                        by_clues[repr(puzzle_clues(words, reveal))].append(words)
+
+                    for words in puzzles[::50]:
+                        clues = puzzle_clues(words, reveal)
+
+                        solutions = list(solver.solve(*clues))
+
+                        self.assertIn(words, solutions)
+                        self.assertEqual(solutions, by_clues[repr(clues)])
+                    self.assertTrue(any(len(group) > 1 for group in by_clues.values()))
+
+    def test_rectangles_same_as_brute_force(self):
+        """Solver.solve and Solver.effort should find exactly the generated 3x4 puzzles
+        with the same clues"""
+        tops, sides = load_words("4")[:150], load_words("3")[:150]
+        solver = Solver(tops + sides)
+        puzzles = generate(tops, side_words=sides)
+        by_clues = defaultdict(list)
+        for words in puzzles:
+            by_clues[repr(puzzle_clues(words, [0]))].append(words)
+
+        for words in puzzles[::100]:
+            with self.subTest(words=words):
+                clues = puzzle_clues(words, [0])
+
+                solutions = list(solver.solve(*clues))
+
+                self.assertEqual(solutions, by_clues[repr(clues)])
+                self.assertEqual(solver.effort(*clues)["solutions"], len(solutions))
+
+    def test_count_and_unique(self):
+        """Solver.count should count solutions, and is_unique check there is only one"""
+        solver = Solver(TestGenerate.words_3)
+        words = ["HIT", "HUM", "TOP", "MAP"]
+
+        n_solutions = solver.count(*puzzle_clues(words, [0]))
+
+        self.assertEqual(solver.count(*puzzle_clues(words, [-1])), 1)
+        self.assertTrue(solver.is_unique(words, [-1]))
+        self.assertEqual(solver.count(*puzzle_clues(words, [0]), limit=1), 1)
+        self.assertEqual(solver.is_unique(words, [0]), n_solutions == 1)
+
+    def test_default_solver_sizes(self):
+        """default_solver should only be made for word lengths with a word list"""
+        self.assertEqual(len(default_solver(4, 3).wordlist.words[0]), 4)
+        for size, side_size in [(5, 4), (4, 5), (5, 5)]:
+            with self.subTest(size=size, side_size=side_size):
+                with self.assertRaises(ValueError):
+                    default_solver(size, side_size)
+
+
+class TestEffort(unittest.TestCase):
+    """Tests for solving puzzles by propagation, counting the effort"""
+
+    def test_same_solutions_as_solve(self):
+        """Solver.effort should find as many solutions as Solver.solve"""
+        for size in ["4", "3"]:
+            all_words = load_words(size)[:120]
+            solver = Solver(all_words)
+            for reveal in [[0], [1, 12]]:
+                with self.subTest(size=size, reveal=reveal):
+                    for words in generate(all_words)[::25]:
+                        clues = puzzle_clues(words, reveal)
+
+                        effort = solver.effort(*clues)
+
+                        self.assertEqual(effort["solutions"], solver.count(*clues))
+                        self.assertLessEqual(effort["remaining"], effort["candidates"])
+                        self.assertEqual(effort, solver.effort(*clues))
+
+    def test_revealing_is_easier(self):
+        """a puzzle with every letter revealed should need no guesses,
+        and be no harder than one with fewer letters revealed"""
+        solver = Solver(load_words("4"))
+        words = ["BACK", "BEST", "KIND", "TOLD"]
+        efforts = [solver.effort(*puzzle_clues(words, r)) for r in [[-1], [1, 12], [0]]]
+
+        self.assertEqual(efforts[0]["guesses"], 0)
+        self.assertEqual(efforts[0]["solutions"], 1)
+        self.assertEqual(
+            [difficulty(effort) for effort in efforts],
+            sorted(difficulty(effort) for effort in efforts),
+        )
+
+
+class TestMinimalReveals(unittest.TestCase):
+    """Tests for finding the fewest letters to reveal for one solution"""
+
+    def test_same_as_brute_force(self):
+        """minimal_reveals should give every smallest set of letters which
+        make the solution unique, as found by solving with each set revealed"""
+        for size, n_letters in [("4", 12), ("3", 8)]:
+            all_words = load_words(size)[:120]
+            solver = Solver(all_words)
+            for words in generate(all_words)[::40]:
+                with self.subTest(words=words):
+                    reveals = minimal_reveals(words, solver)
+
+                    if reveals == [[0]]:
+                        self.assertTrue(solver.is_unique(words, [0]))
+                        continue
+                    indices = range(1, n_letters + 1)
+                    expected = [
+                        list(cells)
+                        for cells in combinations(indices, len(reveals[0]))
+                        if solver.is_unique(words, list(cells))
+                    ]
+                    self.assertEqual(reveals, expected)
+                    for cells in combinations(indices, len(reveals[0]) - 1):
+                        self.assertFalse(solver.is_unique(words, list(cells) or [0]))
+
+    def test_minimal_reveals(self):
+        """minimal_reveals should use the whole word list by default"""
+        self.assertEqual(
+            minimal_reveals(["FELT", "FORD", "TANK", "DISK"]),
+            [[1, 7], [1, 9], [3, 7], [3, 9]],
+        )
+        self.assertEqual(minimal_reveals(["ABS", "ACE", "SIM", "ELM"]), [[4]])
@@ -0,0 +1,212 @@
+"""Update a binary corpus (ranked or not) for an edited word list, without generating
+or ranking it all again, e.g., after adding and removing some words
+  python puzzleupdate.py -i puzzles_4x4_sorted.bin
+which
+  drops the puzzles with removed words (found with an index of the puzzles each word
+    is in, see puzzleschedule.word_index)
+  generates only the puzzles with added words (see puzzlegen.puzzles_with_word)
+  scores them (if the corpus is ranked), and puts each where a full run would,
+    by binary search in the puzzles with the same score
+A corpus without transposes (see puzzlegen.is_canonical) stays without them
+so the work is for the puzzles which change, and the rest of the corpus is copied
+The result is the same as generating (and ranking) with the new word list
+"""
+
+import argparse
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from puzzle import load_words
+from puzzlecorpus import Corpus, CorpusWriter
+from puzzlegen import index_words, is_canonical, puzzles_with_word
+from puzzlerank import ranking, score_puzzles
+from puzzleschedule import word_index
+
+
+def puzzles_with_words(added: List[str], all_words: List[str]) -> List[List[str]]:
+    """Every puzzle (from all_words) with any of the added words in it, once each"""
+    words_by_first, words_by_first_last = index_words(all_words)
+    words_by_last = {}
+    for word in all_words:
+        words_by_last.setdefault(word[-1], []).append(word)
+    added_set = set(added)
+    puzzles = []
+    for word in added:
+        for position in range(4):
+            for puzzle in puzzles_with_word(
+                word, position, words_by_first, words_by_last, words_by_first_last
+            ):
+                # only once, for the first added word in it
+                if not any(w in added_set for w in puzzle[:position]):
+                    puzzles.append(puzzle)
+    return puzzles
+
+
+def _order_keys(ids: np.ndarray) -> np.ndarray:
+    """Keys in generation order (i.e., by word1, then word2, ...) of word ids"""
+    ids = ids.astype(np.uint64)
+    return (ids[:, 0] << 48) | (ids[:, 1] << 32) | (ids[:, 2] << 16) | ids[:, 3]
+
+
+def without_transposes(ids: np.ndarray, words: List[str]) -> bool:
+    """Whether the puzzles (as an (M, 4) array of ids in words) were generated
+    without transposes, i.e., every one of them is canonical (see is_canonical)
+    """
+    if not len(ids):
+        return False
+    order = np.argsort(np.array(words))
+    ranks = np.empty(len(words), dtype=np.int64)
+    ranks[order] = np.arange(len(words))
+    ranks = ranks[ids]
+    after = (ranks[:, 0] > ranks[:, 1]) | (
+        (ranks[:, 0] == ranks[:, 1]) & (ranks[:, 2] > ranks[:, 3])
+    )
+    return not np.any(after)
+
+
+def update(
+    ids: np.ndarray,
+    old_words: List[str],
+    new_words: List[str],
+    metadata: Dict,
+) -> Tuple[np.ndarray, Dict]:
+    """The puzzles (as an (M, 4) array of ids in old_words, in generation order, or
+    ranked with score-counts in metadata) as they would be for new_words
+
+    Returns:
+        Tuple[np.ndarray, Dict]: (ids in new_words, metadata)
+
+    Raises:
+        ValueError: if the puzzles are not in the order of new_words
+    """
+    new_ids = {word: i for i, word in enumerate(new_words)}
+    old_set = set(old_words)
+    added = [word for word in new_words if word not in old_set]
+    removed = [i for i, word in enumerate(old_words) if word not in new_ids]
+    canonical = without_transposes(ids, old_words)
+
+    # scores of the old puzzles, from how many there are of each score
+    ranked = "sorted-by" in metadata
+    if ranked:
+        score_counts = {int(k): n for k, n in metadata["score-counts"].items()}
+        block_scores = sorted(score_counts, reverse=True)
+        scores = np.repeat(block_scores, [score_counts[k] for k in block_scores])
+    else:
+        scores = np.zeros(len(ids), dtype=np.int64)
+
+    # drop puzzles with removed words, and renumber the rest
+    offsets, puzzle_ids = word_index(ids.astype(np.int64), len(old_words))
+    keep = np.ones(len(ids), dtype=bool)
+    for word in removed:
+        keep[puzzle_ids[offsets[word] : offsets[word + 1]]] = False
+    renumber = np.array([new_ids.get(word, 0) for word in old_words], dtype=np.int64)
+    ids = renumber[ids[keep]]
+    scores = scores[keep]
+    keys = _order_keys(ids)
+    same_score = scores[1:] == scores[:-1]
+    if np.any(keys[1:][same_score] < keys[:-1][same_score]):
+        raise ValueError("Puzzles are not in word list order, generate them again")
+
+    # new puzzles, sorted (highest score first, then in generation order)
+    puzzles = puzzles_with_words(added, new_words)
+    if canonical:
+        puzzles = [puzzle for puzzle in puzzles if is_canonical(puzzle)]
+    added_ids = np.array(
+        [[new_ids[word] for word in puzzle] for puzzle in puzzles], dtype=np.int64
+    ).reshape(-1, 4)
+    added_keys = _order_keys(added_ids)
+    if ranked:
+        key = ranking(metadata["sorted-by"], metadata.get("reveal"))
+        added_scores = np.array(score_puzzles(puzzles, key), dtype=np.int64)
+    else:
+        added_scores = np.zeros(len(puzzles), dtype=np.int64)
+    order = np.lexsort((added_keys, -added_scores))
+    added_ids, added_keys, added_scores = (
+        added_ids[order],
+        added_keys[order],
+        added_scores[order],
+    )
+
+    # where each goes among the puzzles with the same score
+    positions = np.empty(len(added_ids), dtype=np.int64)
+    for score in np.unique(added_scores):
+        block = np.flatnonzero(scores == score)
+        start = block[0] if len(block) else np.searchsorted(-scores, -score)
+        new = added_scores == score
+        positions[new] = start + np.searchsorted(keys[block], added_keys[new])
+    ids = np.insert(ids, positions, added_ids, axis=0)
+
+    metadata = dict(metadata)
+    if ranked:
+        scores = np.insert(scores, positions, added_scores)
+        values, counts = np.unique(scores, return_counts=True)
+        metadata["score-counts"] = {str(k): int(n) for k, n in zip(values, counts)}
+    return ids, metadata
+
+
+def main(fname: str, words_fname: str = None, out_file: str = None) -> Dict[str, int]:
+    """main
+    the corpus in fname is updated for the word list in words_fname (by default, the
+    word list of its size), and saved to out_file (by default, over fname),
+    as comma-separated words unless it ends in .bin
+
+    Returns:
+        Dict[str, int]: how many words were added and removed, and puzzles before/after
+    """
+    with Corpus(fname) as corpus:
+        old_words = corpus.words
+        metadata = corpus.metadata
+        ids = corpus.id_array()
+        word_length = corpus.word_length
+    if words_fname is None:
+        new_words = load_words(str(word_length))
+    else:
+        with open(words_fname, "r", encoding="utf-8") as f:
+            new_words = [line.strip() for line in f if line.strip()]
+    new_ids, metadata = update(ids, old_words, new_words, metadata)
+
+    out_file = out_file or fname
+    tmp_fname = f"{out_file}.tmp"
+    if out_file.endswith(".bin"):
+        with CorpusWriter(tmp_fname, new_words, metadata) as writer:
+            writer.write_id_array(new_ids)
+    else:
+        with open(tmp_fname, "w", encoding="utf-8") as f:
+            f.writelines(
+                f"{','.join(new_words[i] for i in puzzle)}\n" for puzzle in new_ids
+            )
+    os.replace(tmp_fname, out_file)
+    return {
+        "added": len(set(new_words) - set(old_words)),
+        "removed": len(set(old_words) - set(new_words)),
+        "before": len(ids),
+        "after": len(new_ids),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-i",
+        "--input",
+        required=True,
+        help="Binary corpus to update, e.g., puzzles_4x4_sorted.bin",
+    )
+    parser.add_argument(
+        "-w",
+        "--words",
+        help="New word list, one word per line. Defaults to the word list of its size",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to save to, a binary corpus if it ends in .bin. Defaults to --input",
+    )
+    args = parser.parse_args()
+    changes = main(args.input, args.words, args.output)
+    print(
+        f"{changes['added']} words added, {changes['removed']} removed, "
+        f"{changes['before']} puzzles before, {changes['after']} after"
+    )
@@ -0,0 +1,87 @@
+"""Tests for puzzleupdate.py"""
+
+import os
+import tempfile
+import unittest
+from puzzle import load_words
+from puzzlecorpus import Corpus, write_corpus
+from puzzlegen import generate
+from puzzlerank import main as puzzlerank
+from puzzleupdate import main as puzzleupdate
+from puzzleupdate import puzzles_with_words
+
+WORDS = load_words("4")[:150]
+# words added to, and removed from, the old word list
+ADDED = WORDS[3::50]
+REMOVED = WORDS[7::100]
+OLD_WORDS = [word for word in WORDS if word not in ADDED]
+NEW_WORDS = [word for word in WORDS if word not in REMOVED]
+
+
+class TestUpdate(unittest.TestCase):
+    """Tests for updating a corpus for an edited word list"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.words_fname = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.words_fname, "w", encoding="utf-8") as f:
+            f.write("\n".join(NEW_WORDS))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def save(self, all_words, fname, ranked, canonical=False):
+        """Generate (and rank) puzzles from all_words to a corpus"""
+        puzzles = generate(all_words, canonical=canonical)
+        fname = os.path.join(self.tmpdir.name, fname)
+        if ranked:
+            puzzlerank(puzzles, "unique", fname, all_words)
+        else:
+            write_corpus(puzzles, fname, all_words, {"size": "4x4"})
+        return fname
+
+    def test_same_as_generating_again(self):
+        """updating should give the same corpus as generating (and ranking) again"""
+        for ranked in [False, True]:
+            for canonical in [False, True]:
+                with self.subTest(ranked=ranked, canonical=canonical):
+                    old_fname = self.save(OLD_WORDS, "old.bin", ranked, canonical)
+                    new_fname = self.save(NEW_WORDS, "new.bin", ranked, canonical)
+
+                    changes = puzzleupdate(old_fname, self.words_fname)
+
+                    with Corpus(old_fname) as updated, Corpus(new_fname) as expected:
+                        self.assertEqual(updated.words, expected.words)
+                        self.assertEqual(updated.metadata, expected.metadata)
+                        self.assertEqual(list(updated), list(expected))
+                    self.assertEqual(changes["added"], len(ADDED))
+                    self.assertEqual(changes["removed"], len(REMOVED))
+
+    def test_text_output(self):
+        """the updated puzzles can be saved as comma-separated words"""
+        old_fname = self.save(OLD_WORDS, "old.bin", True)
+        new_fname = self.save(NEW_WORDS, "new.bin", True)
+        out_fname = os.path.join(self.tmpdir.name, "new.txt")
+
+        puzzleupdate(old_fname, self.words_fname, out_fname)
+
+        with open(out_fname, encoding="utf-8") as f, Corpus(new_fname) as expected:
+            self.assertEqual([line.strip().split(",") for line in f], list(expected))
+
+    def test_puzzles_with_words(self):
+        """every puzzle with an added word should be made once"""
+        puzzles = puzzles_with_words(ADDED, WORDS)
+
+        self.assertCountEqual(
+            puzzles,
+            [p for p in generate(WORDS) if any(w in ADDED for w in p)],
+        )
+
+    def test_out_of_order(self):
+        """a word list in another order can't be updated for"""
+        old_fname = self.save(OLD_WORDS, "old.bin", False)
+        with open(self.words_fname, "w", encoding="utf-8") as f:
+            f.write("\n".join(NEW_WORDS[::-1]))
+
+        with self.assertRaises(ValueError):
+            puzzleupdate(old_fname, self.words_fname)
@@ -18,16 +18,53 @@ to the yaml:
       ["" ,         "" ],
       ["" , "", "", "E"],
     ]
+Many puzzles can be made at once, from a file (or - for stdin) with one puzzle per line,
+as comma-separated words and, optionally, the letters to reveal, e.g.,
+  HIT,HUM,TOP,MAP auto
+  BIRD,BORN,DOVE,NOSE 1 12
+which gives the whole yaml document, e.g., for website/_data/puzzles.yaml
+Past puzzles (rows of a puzzle history, see puzzlehistory.py archive) are made into an
+archive of pages of PAGE_SIZE puzzles, as data files in a directory, i.e.,
+page_1.yaml, page_2.yaml, ..., and index.yaml (how many pages and puzzles there are).
+The history is only ever added to, so full pages never change, and only the last page
+(if it was not full) and new pages are written, see write_archive
 """
 import argparse
-from typing import List, Tuple
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple, Union
 import yaml
 from puzzle import (
-    get_puzzle_dashdot_metrics,
+    RingGeometry,
+    WordList,
     puzzle_to_puzzle_unsolved,
     puzzle_to_str,
     words_to_puzzle_solved,
 )
+from puzzlesolve import minimal_reveals
+
+# dot/dash counts of every word seen so far
+WORDLIST = WordList()
+# reveal as few letters as make the solution unique, see puzzlesolve.minimal_reveals
+AUTO_REVEAL = "auto"
+# libyaml's dumper if PyYAML was built with it, which is much faster
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+# puzzles per archive page
+PAGE_SIZE = 50
+ARCHIVE_INDEX = "index.yaml"
+
+
+@contextmanager
+def timed(timings: Optional[Dict[str, float]], stage: str) -> Iterator[None]:
+    """Add the seconds spent in the with block to timings[stage], if timings is given"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
 
 
 def validate_words(words: List[str]) -> Tuple[bool, str]:
@@ -45,9 +82,9 @@ def validate_words(words: List[str]) -> Tuple[bool, str]:
     # if any word has non-alphabetic characters
     if any(not word.isalpha() for word in words):
         return False, "All words must be alphabetic"
-    # if any word is a different length to the others
-    if len(set(len(word) for word in words)) > 1:
-        return False, "All words must be the same length"
+    # if top and bottom, or left and right, are different lengths
+    if len(words[0]) != len(words[3]) or len(words[1]) != len(words[2]):
+        return False, "Top and bottom, and left and right, must be the same length"
     # if any word is not all caps
     if any(word != word.upper() for word in words):
         return False, "All words must be all caps"
@@ -66,11 +103,12 @@ def validate_words(words: List[str]) -> Tuple[bool, str]:
     return True, ""
 
 
-def validate_reveal(reveal: List[int]) -> Tuple[bool, str]:
+def validate_reveal(reveal: List[int], n_letters: int = 12) -> Tuple[bool, str]:
     """Validate reveal for puzzle generation
 
     Args:
         reveal (List[int]): List of reveal indices
+        n_letters (int, optional): Letters in the puzzle. Defaults to 12 (4x4).
 
     Returns:
         Tuple[bool, str]: (valid, error)
@@ -80,39 +118,178 @@ def validate_reveal(reveal: List[int]) -> Tuple[bool, str]:
         # if not an integer
         if not isinstance(index, int):
             return False, "All reveal indices must be integers"
-        # if not in grid (1-12)
-        if not -1 <= index <= 12:
+        # if not in grid (e.g., 1-12)
+        if not -1 <= index <= n_letters:
             return (
                 False,
-                "All reveal indices must be between (inc.) 1 and 12, or 0 for none, or -1 for all",
+                f"All reveal indices must be between (inc.) 1 and {n_letters}, "
+                "or 0 for none, or -1 for all",
             )
     return True, ""
 
 
-def main(words: List[str], reveal: List[int], verbose: bool = False):
-    """main"""
+def parse_reveal(reveal: List[str]) -> Union[List[int], str]:
+    """Parse reveal from the command line, as indices, or "auto"
+
+    Raises:
+        ValueError: if reveal is not all integers, or "auto"
+    """
+    if reveal == [AUTO_REVEAL]:
+        return AUTO_REVEAL
+    return [int(index) for index in reveal]
+
+
+def parse_job(
+    line: str, default_reveal: Union[List[int], str] = None
+) -> Tuple[List[str], Union[List[int], str]]:
+    """Parse a line of a batch, as (words, reveal), e.g.,
+      "BIRD,BORN,DOVE,NOSE 1 12" -> (["BIRD", "BORN", "DOVE", "NOSE"], [1, 12])
+      "HIT,HUM,TOP,MAP auto" -> (["HIT", "HUM", "TOP", "MAP"], "auto")
+    Lines without letters to reveal use default_reveal
+
+    Raises:
+        ValueError: if the reveal is not valid, or there is none
+    """
+    words, *reveal = line.split()
+    if not reveal:
+        if default_reveal is None:
+            raise ValueError(f"No letters to reveal for {words}")
+        return words.split(","), default_reveal
+    return words.split(","), parse_reveal(reveal)
+
+
+def read_jobs(
+    f: TextIO, default_reveal: Union[List[int], str] = None
+) -> List[Tuple[List[str], Union[List[int], str]]]:
+    """Read a batch of (words, reveal), one per line (see parse_job), skipping blanks"""
+    return [parse_job(line, default_reveal) for line in f if line.strip()]
+
+
+def dump(data: List[Dict]) -> str:
+    """The yaml document of many puzzles"""
+    return yaml.dump(data, Dumper=YAML_DUMPER, default_flow_style=None)
+
+
+def main_batch(
+    jobs: List[Tuple[List[str], Union[List[int], str]]],
+    timings: Dict[str, float] = None,
+) -> List[Dict]:
+    """main, for many (words, reveal) at once, adding up the time of each stage
+    in timings if given
+    """
+    return [main(words, reveal, timings=timings) for words, reveal in jobs]
+
+
+def archive_page(out_dir: str, page: int) -> str:
+    """File of an archive page (numbered from 1), e.g., "archive/page_3.yaml" """
+    return os.path.join(out_dir, f"page_{page}.yaml")
+
+
+def write_archive(
+    n_puzzles: int,
+    read_rows: Callable[[int, int], List[Dict]],
+    out_dir: str,
+    page_size: int = PAGE_SIZE,
+    timings: Dict[str, float] = None,
+) -> List[int]:
+    """Write n_puzzles past puzzles to out_dir as pages of page_size puzzles, each with
+    its date, puzzle code and words, oldest first
+    read_rows(start, stop) gives the start-th to (stop - 1)-th puzzles, as dicts with
+    "date", "code", "words" and "reveal" (e.g., puzzlehistory.History.puzzles)
+    Pages already written full (for the same page_size) are left as they are
+
+    Returns:
+        List[int]: the pages written
+    """
+    index_fname = os.path.join(out_dir, ARCHIVE_INDEX)
+    n_written = 0
+    if os.path.exists(index_fname):
+        with open(index_fname, "r", encoding="utf-8") as f:
+            index = yaml.safe_load(f) or {}
+        if index.get("page-size") == page_size:
+            n_written = index.get("puzzles", 0)
+    n_pages = -(-n_puzzles // page_size)
+    # the last page written, if it was not full, then every new page
+    pages = list(range(n_written // page_size + 1, n_pages + 1))
+    os.makedirs(out_dir, exist_ok=True)
+    for page in pages:
+        entries = read_rows((page - 1) * page_size, min(page * page_size, n_puzzles))
+        data = [
+            {
+                "date": entry["date"],
+                "code": entry["code"],
+                "words": entry["words"],
+                **main(entry["words"], entry["reveal"], timings=timings),
+            }
+            for entry in entries
+        ]
+        with timed(timings, "dump"):
+            document = dump(data)
+        with open(archive_page(out_dir, page), "w", encoding="utf-8") as f:
+            f.write(document)
+    # last, so a run stopped part way writes its pages again
+    with open(index_fname, "w", encoding="utf-8") as f:
+        f.write(dump({"pages": n_pages, "puzzles": n_puzzles, "page-size": page_size}))
+    return pages
+
+
+def print_timings(timings: Dict[str, float], file: TextIO = sys.stderr):
+    """Print the seconds spent in each stage, and in total"""
+    width = max(len(stage) for stage in [*timings, "total"]) + 2
+    for stage, seconds in timings.items():
+        print(f"{stage:<{width}}{seconds:.4f}s", file=file)
+    print(f"{'total':<{width}}{sum(timings.values()):.4f}s", file=file)
+
+
+def main(
+    words: List[str],
+    reveal: Union[List[int], str],
+    verbose: bool = False,
+    wordlist: WordList = None,
+    timings: Dict[str, float] = None,
+):
+    """main
+    metrics are added up from the cached dot/dash counts in wordlist (by default WORDLIST)
+    with reveal "auto", the first of the smallest sets of letters which make the solution
+    unique is revealed (see puzzlesolve.minimal_reveals)
+    the time of each stage is added up in timings if given
+    """
+    if wordlist is None:
+        wordlist = WORDLIST
     # validate input
-    words_valid, words_error = validate_words(words)
-    reveal_valid, reveal_error = validate_reveal(reveal)
+    with timed(timings, "validate"):
+        words_valid, words_error = validate_words(words)
     if not words_valid:
         raise ValueError(f"{words_error}. words: {words}")
+    if reveal == AUTO_REVEAL:
+        with timed(timings, "auto reveal"):
+            reveal = minimal_reveals(words)[0]
+        if verbose:
+            print(f"Revealing: {reveal}")
+    with timed(timings, "validate"):
+        reveal_valid, reveal_error = validate_reveal(
+            reveal, RingGeometry.of_words(words).n_cells
+        )
     if not reveal_valid:
         raise ValueError(f"{reveal_error}. reveal: {reveal}")
 
     # create solved puzzle
-    solved = words_to_puzzle_solved(words)
+    with timed(timings, "puzzle"):
+        solved = words_to_puzzle_solved(words)
     if verbose:
         print("Solved:")
         print(puzzle_to_str(solved))
 
     # create unsolved puzzle
-    unsolved = puzzle_to_puzzle_unsolved(solved, reveal)
+    with timed(timings, "puzzle"):
+        unsolved = puzzle_to_puzzle_unsolved(solved, reveal)
     if verbose:
         print()
         print("Unsolved:")
         print(puzzle_to_str(unsolved))
 
-    metrics = get_puzzle_dashdot_metrics(solved)
+    with timed(timings, "metrics"):
+        metrics = wordlist.get_metrics(words)
     if verbose:
         print()
         print("Metrics:")
@@ -141,25 +318,57 @@ def main(words: List[str], reveal: List[int], verbose: bool = False):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         "-w",
         "--words",
         nargs="+",
         help="List of words to convert to puzzle",
-        required=True,
+    )
+    source.add_argument(
+        "-i",
+        "--input",
+        help="File (or - for stdin) of many puzzles, one per line, as comma-separated "
+        "words and, optionally, indices to reveal",
     )
     parser.add_argument(
         "-r",
         "--reveal",
         nargs="+",
-        type=int,
-        help="List of indices to reveal. -1 for all. 0 for none.",
-        required=True,
+        help="List of indices to reveal. -1 for all. 0 for none. "
+        "auto for as few as make the solution unique. "
+        "With --input, for lines without their own.",
     )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Print verbose output"
     )
+    parser.add_argument(
+        "-t",
+        "--timings",
+        action="store_true",
+        help="Print the time spent in each stage to stderr",
+    )
     args = parser.parse_args()
+    if args.words and args.reveal is None:
+        parser.error("the following arguments are required: -r/--reveal")
+    try:
+        reveal = None if args.reveal is None else parse_reveal(args.reveal)
+    except ValueError:
+        parser.error(f"argument -r/--reveal: invalid reveal: {args.reveal}")
 
-    data = main(args.words, args.reveal, args.verbose)
-    print(yaml.dump([data], default_flow_style=None))
+    stage_timings = {} if args.timings else None
+    if args.words:
+        puzzles = [main(args.words, reveal, args.verbose, timings=stage_timings)]
+    else:
+        with timed(stage_timings, "read"):
+            if args.input == "-":
+                batch = read_jobs(sys.stdin, reveal)
+            else:
+                with open(args.input, "r", encoding="utf-8") as f:
+                    batch = read_jobs(f, reveal)
+        puzzles = main_batch(batch, stage_timings)
+    with timed(stage_timings, "dump"):
+        document = dump(puzzles)
+    print(document)
+    if stage_timings is not None:
+        print_timings(stage_timings)
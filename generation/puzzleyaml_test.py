@@ -1,6 +1,11 @@
 """Tests for puzzleyaml.py"""
 
+import io
+import os
+import tempfile
 import unittest
+import yaml
+from puzzleyaml import dump, main_batch, parse_job, read_jobs, write_archive
 from puzzleyaml import main as puzzleyaml
 
 
@@ -23,6 +28,14 @@ class TestYamlGeneration(unittest.TestCase):
 
         self.assertEqual(actual_data, expected_data)
 
+    def test_auto_reveal(self):
+        """auto should reveal as few letters as make the solution unique"""
+        data = puzzleyaml(["FELT", "FORD", "TANK", "DISK"], "auto")
+
+        self.assertEqual(
+            data["letters"], [["F", "", "", ""], ["", ""], ["R", ""], ["", "", "", ""]]
+        )
+
     def test_bad_inputs_4x4(self):
         """Test various bad inputs"""
         words = ["BIRD", "BORN", "DOVE", "NOSE"]
@@ -34,7 +47,7 @@ class TestYamlGeneration(unittest.TestCase):
         # words not in caps
         with self.assertRaises(ValueError):
             puzzleyaml(["BIRD", "BORN", "dove"], reveal)
-        # words not all the same length
+        # left and right not the same length
         with self.assertRaises(ValueError):
             puzzleyaml(["BIRD", "BORN", "DOVES", "NOSE"], reveal)
 
@@ -61,3 +74,109 @@ class TestYamlGeneration(unittest.TestCase):
         actual_data = puzzleyaml(words, reveal)
 
         self.assertEqual(actual_data, expected_data)
+
+    def test_main_3x4(self):
+        """Rectangular puzzles should work the same way"""
+        words = ["ABLE", "AND", "EFT", "DUST"]
+        reveal = [1, 10]
+        expected_data = {
+            "dots-top": [4, 5, 6, 4],
+            "dots-left": [8, 4, 7],
+            "dashes-right": [3, 2, 3],
+            "dashes-bottom": [3, 2, 1, 2],
+            "letters": [["A", "", "", ""], ["", ""], ["", "", "", "T"]],
+        }
+
+        actual_data = puzzleyaml(words, reveal)
+
+        self.assertEqual(actual_data, expected_data)
+        # only 10 letters to reveal
+        with self.assertRaises(ValueError):
+            puzzleyaml(words, [12])
+
+
+class TestBatch(unittest.TestCase):
+    """Test making many puzzles at once"""
+
+    def test_parse_job(self):
+        """lines should be words, then the letters to reveal, or the default"""
+        self.assertEqual(
+            parse_job("BIRD,BORN,DOVE,NOSE 1 12\n"),
+            (["BIRD", "BORN", "DOVE", "NOSE"], [1, 12]),
+        )
+        self.assertEqual(
+            parse_job("HIT,HUM,TOP,MAP auto"), (["HIT", "HUM", "TOP", "MAP"], "auto")
+        )
+        self.assertEqual(
+            parse_job("HIT,HUM,TOP,MAP", [-1]), (["HIT", "HUM", "TOP", "MAP"], [-1])
+        )
+        with self.assertRaises(ValueError):
+            parse_job("HIT,HUM,TOP,MAP")
+        with self.assertRaises(ValueError):
+            parse_job("HIT,HUM,TOP,MAP 1 two")
+
+    def test_main_batch(self):
+        """a batch should give the same puzzles as one at a time, in one document,
+        with the time of each stage"""
+        lines = io.StringIO(
+            "HIT,HUM,TOP,MAP auto\nFELT,FORD,TANK,DISK auto\n\n"
+            "HIT,HUM,TOP,MAP -1\nBIRD,BORN,DOVE,NOSE\n"
+        )
+        jobs = read_jobs(lines, [1, 12])
+        timings = {}
+
+        puzzles = main_batch(jobs, timings)
+
+        self.assertEqual(len(puzzles), 4)
+        self.assertEqual(puzzles, [puzzleyaml(*job) for job in jobs])
+        self.assertEqual(yaml.safe_load(dump(puzzles)), puzzles)
+        self.assertEqual(puzzles[3], puzzleyaml(["BIRD", "BORN", "DOVE", "NOSE"], [1, 12]))
+        self.assertEqual(
+            set(timings), {"validate", "auto reveal", "puzzle", "metrics"}
+        )
+
+
+class TestArchive(unittest.TestCase):
+    """Tests for the archive pages of past puzzles"""
+
+    def test_only_new_pages(self):
+        """only the last page (if not full) and new pages should be written,
+        with the same puzzles as making every page again"""
+        puzzles = [
+            ["BIRD", "BORN", "DOVE", "NOSE"],
+            ["HIT", "HUM", "TOP", "MAP"],
+            ["FELT", "FORD", "TANK", "DISK"],
+        ]
+        rows = [
+            {
+                "date": f"2024-06-0{day + 1}",
+                "code": f"code{day}",
+                "words": puzzles[day % 3],
+                "reveal": [1],
+            }
+            for day in range(7)
+        ]
+
+        def read_rows(start, stop):
+            return rows[start:stop]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out_dir = os.path.join(tmpdir, "archive")
+            self.assertEqual(write_archive(5, read_rows, out_dir, 2), [1, 2, 3])
+            self.assertEqual(write_archive(5, read_rows, out_dir, 2), [3])
+            self.assertEqual(write_archive(7, read_rows, out_dir, 2), [3, 4])
+
+            pages = []
+            for page in range(1, 5):
+                fname = os.path.join(out_dir, f"page_{page}.yaml")
+                with open(fname, encoding="utf-8") as f:
+                    pages += yaml.safe_load(f)
+            with open(os.path.join(out_dir, "index.yaml"), encoding="utf-8") as f:
+                index = yaml.safe_load(f)
+
+        self.assertEqual(index, {"pages": 4, "puzzles": 7, "page-size": 2})
+        self.assertEqual([page["date"] for page in pages], [r["date"] for r in rows])
+        self.assertEqual(pages[1]["words"], puzzles[1])
+        expected = {"date": "2024-06-01", "code": "code0", "words": puzzles[0]}
+        expected.update(puzzleyaml(puzzles[0], [1]))
+        self.assertEqual(pages[0], expected)
@@ -13,30 +13,52 @@ date > /dev/stderr
 SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 
 # the puzzles are sorted by letter uniqueness, so we don't want the bottom of that
-SELECT_TOP_FROM_THREES=48640
-SELECT_TOP_FROM_FOURS=221438
+# so pick from puzzles with all 8 letters different (3x3), or at least 10 different (4x4)
+MIN_UNIQUE_THREES=8
+MIN_UNIQUE_FOURS=10
+# only pick puzzles with one solution when these letters are revealed
+# so update.sh (which reveals as few letters as it can) never needs to reveal more
+THREE_REVEAL="1 8"
+FOUR_REVEAL="1 12"
 
 # generate these files with the python in /generation
 # i.e. (and the same with 4x4s),
 # python puzzlegen.py -n 3
 # python puzzlerank.py -i puzzles_3x3.txt -o unique > puzzles_3x3_sorted.txt
 # probably on a good machine (on my server, process gets killed, presumably memory problems)
-maxrand=32767
+py=$SCRIPT_DIR/generation/env/bin/python
+# ask the puzzle server (generation/puzzleserver.py), as it has the puzzle lists loaded
+# (puzzleclient.py only imports the standard library, so it is a light python start-up)
+# and if it is not running (or its socket was left behind), pick directly
+pick() {
+  $py $SCRIPT_DIR/generation/puzzleclient.py pick "$@" \
+    || $py $SCRIPT_DIR/generation/puzzlepick.py "$@"
+}
+# picks are for tomorrow, and the same date always gives the same picks
+tomorrow=$(date -d tomorrow +%F)
+
+# planned puzzles for a date, from a schedule (made with generation/puzzleschedule.py)
+# i.e. (and the same with 3x3s),
+# python puzzleschedule.py -i puzzles_4x4_sorted.txt --min-score 10 --days 90 \
+#   --history ../current.txt -r 1 12 -o schedule_4x4.txt
+scheduled() {
+  if [ -f "$1" ]; then
+    grep "^$2 " "$1" | cut -d' ' -f2
+  fi
+}
 
 # 3x3
-rangeswithin=$((($SELECT_TOP_FROM_THREES / $maxrand) + 1))
-rangerange=$(($SELECT_TOP_FROM_THREES / rangeswithin))
-three_select=$((1 + $RANDOM % $rangerange + $RANDOM % $rangeswithin * $rangerange))
-echo "selecting line $three_select of $SELECT_TOP_FROM_THREES" > /dev/stderr
-threepuzzle=$(awk 'NR == '"${three_select}"' {print} NR > '"${three_select}"' {exit}' $SCRIPT_DIR/generation/puzzles_3x3_sorted.txt)
+threepuzzle=$(scheduled $SCRIPT_DIR/generation/schedule_3x3.txt $tomorrow)
+if [ -z "$threepuzzle" ]; then
+  threepuzzle=$(pick -i $SCRIPT_DIR/generation/puzzles_3x3_sorted.txt --min-score $MIN_UNIQUE_THREES --date $tomorrow --reveal $THREE_REVEAL)
+fi
 echo "selected: $threepuzzle" > /dev/stderr
 
 # 4x4
-rangeswithin=$((($SELECT_TOP_FROM_FOURS / $maxrand) + 1))
-rangerange=$(($SELECT_TOP_FROM_FOURS / rangeswithin))
-four_select=$((1 + $RANDOM % $rangerange + $RANDOM % $rangeswithin * $rangerange))
-echo "selecting line $four_select of $SELECT_TOP_FROM_FOURS" > /dev/stderr
-fourpuzzle=$(awk 'NR == '"${four_select}"' {print} NR > '"${four_select}"' {exit}' $SCRIPT_DIR/generation/puzzles_4x4_sorted.txt)
+fourpuzzle=$(scheduled $SCRIPT_DIR/generation/schedule_4x4.txt $tomorrow)
+if [ -z "$fourpuzzle" ]; then
+  fourpuzzle=$(pick -i $SCRIPT_DIR/generation/puzzles_4x4_sorted.txt --min-score $MIN_UNIQUE_FOURS --date $tomorrow --reveal $FOUR_REVEAL)
+fi
 echo "selected: $fourpuzzle" > /dev/stderr
 
 # save generated to file (next puzzles)
@@ -6,8 +6,9 @@ set -e
 echo [update.sh] > /dev/stderr
 date > /dev/stderr
 
-THREE_REVEAL="1 8"
-FOUR_REVEAL="1 12"
+# reveal as few letters as make each puzzle's solution unique
+THREE_REVEAL="auto"
+FOUR_REVEAL="auto"
 
 SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 
@@ -22,21 +23,37 @@ next4x4=$(echo "${next}" | tail -n1)
 current3x3=$(echo "${current}" | head -n1)
 current4x4=$(echo "${current}" | tail -n1)
 
-yaml=""
 echo "generating yaml..."
 
 py=$SCRIPT_DIR/generation/env/bin/python
-gen=$SCRIPT_DIR/generation/puzzleyaml.py
-yaml="${yaml}$( $py $gen -w $(echo $next3x3 | sed 's/,/ /g') -r $THREE_REVEAL )\n"
-yaml="${yaml}$( $py $gen -w $(echo $next4x4 | sed 's/,/ /g') -r $FOUR_REVEAL )\n"
-yaml="${yaml}$( $py $gen -w $(echo $current3x3 | sed 's/,/ /g') -r -1 )\n"
-yaml="${yaml}$( $py $gen -w $(echo $current4x4 | sed 's/,/ /g') -r -1 )\n"
+# all the puzzles in one go, one per line as "words reveal"
+jobs=$(printf "%s\n" \
+  "${next3x3} ${THREE_REVEAL}" \
+  "${next4x4} ${FOUR_REVEAL}" \
+  "${current3x3} -1" \
+  "${current4x4} -1")
+# ask the puzzle server (generation/puzzleserver.py), as it is warm
+# (puzzleclient.py only imports the standard library, so it is a light python start-up)
+# and if it is not running (or its socket was left behind), make the yaml directly
+yaml=$(echo "${jobs}" | $py $SCRIPT_DIR/generation/puzzleclient.py yaml --timings -i -) \
+  || yaml=$(echo "${jobs}" | $py $SCRIPT_DIR/generation/puzzleyaml.py --timings -i -)
 
 echo "generated yaml"
-echo -e "${yaml}" > /dev/stderr
+echo "${yaml}" > /dev/stderr
 
 echo "moving yaml to website..."
-echo -e "${yaml}" > $SCRIPT_DIR/website/_data/puzzles.yaml
+echo "${yaml}" > $SCRIPT_DIR/website/_data/puzzles.yaml
+
+# keep every puzzle that has run (see generation/puzzlehistory.py), i.e., yesterday's
+# (current), whose day is over, so the archive never has the answer to today's puzzles
+# and the archive pages of them (only the last page and new pages are written)
+echo "adding to history..."
+history=$SCRIPT_DIR/generation/history.db
+printf "%s\n" \
+  "${current3x3} ${THREE_REVEAL}" \
+  "${current4x4} ${FOUR_REVEAL}" \
+  | $py $SCRIPT_DIR/generation/puzzlehistory.py -f $history add -d $(date -d yesterday +%F) -i -
+$py $SCRIPT_DIR/generation/puzzlehistory.py -f $history archive -o $SCRIPT_DIR/website/_data/archive
 
 echo "installing npm"
 export NVM_DIR="/usr/alifeee/nvm"